@@ -1 +1,2 @@
 from .coordinator import *
+from .daemon import *
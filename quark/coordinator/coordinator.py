@@ -1,12 +1,63 @@
 import glob
+import json
+import multiprocessing
+import multiprocessing.util
 import os
 import time
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List
 
 import yaml
 from invoke import Context, task
+from invoke.exceptions import Exit, Failure
 from quark_utility import *
 
+from .daemon import RuntimeDaemon, farm_worker, query_environment
+
+# Where quark-runtime stores per-label results, relative to the project root
+RESULTS_DIR = "build/benchmarks"
+
+# Placement and resident runtime owned by the current pool worker, see _init_worker
+_WORKER_PLACEMENT = None
+_WORKER_DAEMON = None
+
+
+def _init_worker(placement_slots, trace_enabled: bool, isolate: bool):
+    """Claim a disjoint placement for this pool worker and pin it there."""
+    global _WORKER_PLACEMENT, _WORKER_DAEMON
+    if trace_enabled:
+        enable_trace()
+    _WORKER_PLACEMENT = placement_slots.get()
+    place_on_node(_WORKER_PLACEMENT)
+
+    if not isolate:
+        _WORKER_DAEMON = RuntimeDaemon(
+            Context(),
+            cpus=format_cpu_list(_WORKER_PLACEMENT.cpus),
+            numa_node=_WORKER_PLACEMENT.node,
+        )
+        _WORKER_DAEMON.start()
+        # Pool workers skip atexit, finalizers still run when the pool shuts down
+        multiprocessing.util.Finalize(
+            _WORKER_DAEMON, _WORKER_DAEMON.stop, exitpriority=10
+        )
+
+
+def _run_task_in_worker(task_file: str, run_info: dict):
+    """Dispatch one task from a pool worker, confined to the worker's CPUs."""
+    if _WORKER_DAEMON is not None:
+        _WORKER_DAEMON.run_task(task_file, run_info)
+    else:
+        run(
+            Context(),
+            task_file,
+            cpus=format_cpu_list(_WORKER_PLACEMENT.cpus),
+            numa_node=_WORKER_PLACEMENT.node,
+            sweep_id=run_info["sweep_id"],
+            fingerprint=run_info["fingerprint"],
+        )
+    return task_file
+
 
 class BenchCoordinator:
     def __init__(self, arguments, config_dir: str):
@@ -15,6 +66,25 @@ class BenchCoordinator:
         self.config_dir = config_dir
         self.config_files = []
         self.matching_files = []
+        self.labels = {}
+        self.daemon = None
+        # Sequential tasks run on one NUMA node too, so they never span sockets
+        self.placement = None
+        self.config_index = ConfigIndex()
+        self.configs = {}
+        self.environment = {}
+        self.fingerprints = {}
+        # Every run of this invocation is stored under the same sweep id
+        self.sweep_id = new_sweep_id()
+        self.journal = None
+        self.failures = []
+        if arguments.resume:
+            # A resumed sweep keeps its id and the task selection it started with
+            self.journal = SweepJournal.load(arguments.resume)
+            self.sweep_id = self.journal.sweep_id
+            self.config_dir = self.journal.config_dir
+            self.arguments.label = self.journal.label
+            print(f"Resume sweep {self.sweep_id}: {self.journal.counts()}")
         self.collect_config_files()
         self.filter_config_files()
 
@@ -28,51 +98,598 @@ class BenchCoordinator:
             os.path.join(self.config_dir, "**", "*.yml"), recursive=True
         )
         TRACE(self.config_files)
+        # Only files changed since the last run are parsed and validated again
+        self.configs = self.config_index.refresh(self.config_files)
+        self.config_index.prune()
+        self.config_index.save()
 
     def filter_config_files(self):
         TRACE("Filter task configuration files")
         if not self.arguments.label:
-            self.matching_files = self.config_files
+            self.matching_files = [
+                config for config in self.config_files if config in self.configs
+            ]
             return
 
         self.matching_files = [
             config
             for config in self.config_files
-            if ConfigBuilder.load_config(config).label == self.arguments.label
+            if config in self.configs
+            and self.configs[config].label == self.arguments.label
         ]
 
     def decode(self, file: str):
         TRACE(f"Load config file: {file}")
-        return ConfigBuilder.load_config(file)
+        if file in self.configs:
+            return self.configs[file]
+        return self.config_index.get(file)
 
     def run_benchmark(self, task_file, idx, total_tasks):
         config = self.decode(task_file)
         label = config.label
+        self.labels[task_file] = label
         print(f"\nProcessing task {idx}/{total_tasks}: {label}")
-        run(self.arguments.ctx, task_file)
+        if self.daemon is not None:
+            self.daemon.run_task(task_file, self.run_info(task_file))
+        else:
+            run(
+                self.arguments.ctx,
+                task_file,
+                cpus=format_cpu_list(self.placement.cpus),
+                numa_node=self.placement.node,
+                sweep_id=self.sweep_id,
+                fingerprint=self.fingerprints[task_file],
+            )
+        self.record_fingerprint(task_file)
 
     def run_benchmarks(self):
-        total_tasks = len(self.config_files)
         if not self.matching_files:
             print(f"No task found with label: {self.arguments.label}")
+            return
+
+        if self.arguments.jobs <= 1 and not self.arguments.farm:
+            self.placement = place_jobs(1)[0]
+            TRACE(f"Run tasks sequentially on {self.placement.to_dict()}")
+            if not self.arguments.isolate:
+                self.daemon = RuntimeDaemon(
+                    self.arguments.ctx,
+                    cpus=format_cpu_list(self.placement.cpus),
+                    numa_node=self.placement.node,
+                )
+                self.daemon.start()
+        try:
+            pending_files = self.plan_tasks()
+            if not pending_files and self.journal is not None:
+                print(f"Nothing left to run in sweep {self.sweep_id}")
+                return
+            if not pending_files:
+                print("All tasks are up to date, use --force to rerun them")
+                return
+            scheduled_files = self.schedule(pending_files)
+            self.update_journal(pending_files, scheduled_files)
+            total_tasks = len(scheduled_files)
+            if not scheduled_files:
+                print("No task fits in the time budget")
+            elif self.arguments.farm:
+                self.run_benchmarks_farm(scheduled_files)
+            elif self.arguments.jobs > 1:
+                self.run_benchmarks_parallel(scheduled_files, self.arguments.jobs)
+            else:
+                for idx, task_file in enumerate(scheduled_files):
+                    self.run_tracked(task_file, idx + 1, total_tasks)
+        finally:
+            if self.daemon is not None:
+                self.daemon.stop()
+                self.daemon = None
+
+    def runtime_environment(self) -> dict:
+        """Environment of the quark-runtime that executes the tasks."""
+        if self.daemon is not None:
+            environment = self.daemon.environment()
         else:
-            for idx, task_file in enumerate(self.matching_files):
-                self.run_benchmark(task_file, idx + 1, total_tasks)
+            environment = query_environment(self.arguments.ctx)
+        # quark itself lives in the coordinator's environment, not the runtime's
+        environment["quark_version"] = package_versions(["quark"])["quark"]
+        return environment
+
+    def plan_tasks(self) -> List[str]:
+        """Fingerprint the matching tasks and return those that need to run."""
+        self.environment = self.runtime_environment()
+        TRACE(f"Runtime environment = {self.environment}")
+
+        pending_files = []
+        for task_file in self.matching_files:
+            config = self.decode(task_file)
+            self.labels[task_file] = config.label
+            self.fingerprints[task_file] = task_fingerprint(config, self.environment)
+            if self.journal is not None:
+                if self.is_resumable(task_file):
+                    pending_files.append(task_file)
+                continue
+            if not self.arguments.force and self.is_up_to_date(task_file):
+                print(f"Skip task {config.label}: result is up to date")
+                continue
+            pending_files.append(task_file)
+        return pending_files
+
+    def is_resumable(self, task_file: str) -> bool:
+        """Whether a resumed sweep still has to run `task_file`."""
+        label = self.labels[task_file]
+        status = self.journal.status(task_file)
+        if status == TaskStatusEnum.UNKNOWN:
+            TRACE(f"Skip task {label}: not part of sweep {self.sweep_id}")
+            return False
+        if task_file not in self.journal.unfinished():
+            print(f"Skip task {label}: already {status.value} in this sweep")
+            return False
+        # Attempts interrupted by a crash or reboot do not count as failures
+        if self.journal.failures(task_file) > self.arguments.retries:
+            print(f"Skip task {label}: failed {self.journal.failures(task_file)} times")
+            self.failures.append(task_file)
+            return False
+        return True
+
+    def update_journal(self, pending_files: List[str], scheduled_files: List[str]):
+        """Record the plan of this invocation in the sweep journal."""
+        resumed = self.journal is not None
+        if not resumed:
+            self.journal = SweepJournal(
+                self.sweep_id, self.config_dir, self.arguments.label
+            )
+        pending, scheduled = set(pending_files), set(scheduled_files)
+        for task_file in self.matching_files:
+            label = self.labels[task_file]
+            if task_file in scheduled:
+                self.journal.add(task_file, label, TaskStatusEnum.PENDING)
+            elif task_file in pending:
+                self.journal.add(task_file, label, TaskStatusEnum.DEFERRED)
+            elif not resumed:
+                self.journal.add(task_file, label, TaskStatusEnum.UP_TO_DATE)
+        self.journal.save()
+        TRACE(f"Sweep journal written to {self.journal.path}")
+
+    def task_failed(self, task_file: str, error: Exception) -> bool:
+        """Record a failed attempt, returns whether the task should be retried."""
+        print(f"Task {self.labels[task_file]} ({task_file}) failed: {error}")
+        self.journal.fail(task_file, f"{type(error).__name__}: {error}")
+        if self.journal.failures(task_file) <= self.arguments.retries:
+            print(f"Retry task {self.labels[task_file]}")
+            return True
+        self.failures.append(task_file)
+        return False
+
+    def run_tracked(self, task_file: str, idx: int, total_tasks: int):
+        """Run one task with retries, journaling every attempt."""
+        while True:
+            self.journal.start(task_file)
+            try:
+                self.run_benchmark(task_file, idx, total_tasks)
+            except Exception as e:
+                if self.task_failed(task_file, e):
+                    continue
+                return
+            self.journal.finish(task_file)
+            return
+
+    def schedule(self, task_files: List[str]) -> List[str]:
+        """Order tasks by predicted duration and policy, deferring what misses the budget."""
+        with ResultsStore(self.store_path()) as store:
+            model = DurationModel(store)
+            tasks = [
+                ScheduledTask(
+                    key=task_file,
+                    label=self.labels[task_file],
+                    estimate=model.estimate(
+                        self.decode(task_file), self.fingerprints[task_file]
+                    ),
+                    tags=self.decode(task_file).tags,
+                )
+                for task_file in task_files
+            ]
+
+        time_budget = None
+        if self.arguments.time_budget:
+            time_budget = parse_duration(self.arguments.time_budget)
+        planned, deferred = schedule_tasks(
+            tasks,
+            policy=SchedulePolicyEnum.from_string(self.arguments.schedule),
+            priority_tags=[tag for tag in self.arguments.priority.split(",") if tag],
+            time_budget=time_budget,
+            workers=max(self.arguments.jobs, self.arguments.local_workers, 1),
+        )
+
+        def describe(task: ScheduledTask) -> dict:
+            return {
+                "label": task.label,
+                "task": task.key,
+                "predicted_seconds": task.estimate.seconds,
+                "source": task.estimate.source,
+            }
+
+        schedule_file = os.path.join(RESULTS_DIR, "schedule.json")
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(schedule_file, "w") as file:
+            json.dump(
+                {
+                    "sweep_id": self.sweep_id,
+                    "policy": self.arguments.schedule,
+                    "time_budget": time_budget,
+                    "planned": [describe(task) for task in planned],
+                    "deferred": [describe(task) for task in deferred],
+                },
+                file,
+                indent=4,
+                ensure_ascii=False,
+            )
+
+        total = sum(task.estimate.seconds for task in planned)
+        print(
+            f"Scheduled {len(planned)} tasks ({self.arguments.schedule}), "
+            f"predicted {total:.0f}s of task time"
+        )
+        for task in planned:
+            TRACE(
+                f"  {task.label}: {task.estimate.seconds:.1f}s ({task.estimate.source})"
+            )
+        if deferred:
+            print(
+                f"Deferred {len(deferred)} tasks that do not fit in "
+                f"{self.arguments.time_budget} (see {schedule_file}):"
+            )
+            for task in deferred:
+                print(f"  {task.label}: predicted {task.estimate.seconds:.0f}s")
+        return [task.key for task in planned]
+
+    def run_info(self, task_file: str) -> dict:
+        """Metadata the runtime stores with each run of `task_file`."""
+        return {"sweep_id": self.sweep_id, "fingerprint": self.fingerprints[task_file]}
+
+    def fingerprint_file(self, label: str) -> str:
+        return os.path.join(RESULTS_DIR, f"{label}.fingerprint.json")
+
+    def is_up_to_date(self, task_file: str) -> bool:
+        """Whether the stored result was produced with the same fingerprint."""
+        label = self.labels[task_file]
+        try:
+            with open(self.fingerprint_file(label), "r") as file:
+                record = json.load(file)
+        except (OSError, ValueError):
+            return False
+
+        if record.get("fingerprint") != self.fingerprints[task_file]:
+            return False
+        # The result must be exactly the file the fingerprint was recorded for
+        result_file = os.path.join(RESULTS_DIR, f"{label}.json")
+        if file_digest(result_file) != record.get("result_digest"):
+            return False
+        if self.arguments.stale_after:
+            age = time.time() - record.get("created", 0)
+            if age > parse_duration(self.arguments.stale_after):
+                TRACE(f"Result of {label} is stale ({age:.0f}s old)")
+                return False
+        return True
+
+    def record_fingerprint(self, task_file: str):
+        """Store the task fingerprint next to the result the task just produced."""
+        label = self.labels[task_file]
+        result_file = os.path.join(RESULTS_DIR, f"{label}.json")
+        try:
+            with open(result_file, "r") as file:
+                json.load(file)
+        except (OSError, ValueError):
+            TRACE(f"No valid result for task {label}, fingerprint not recorded")
+            return
+
+        record = {
+            "fingerprint": self.fingerprints[task_file],
+            "created": time.time(),
+            "result_digest": file_digest(result_file),
+            "task": task_file,
+            "environment": self.environment,
+        }
+        with open(self.fingerprint_file(label), "w") as file:
+            json.dump(record, file, indent=4, ensure_ascii=False)
+
+    def run_benchmarks_parallel(self, task_files: List[str], jobs: int):
+        """
+        Run tasks concurrently in a process pool, one disjoint placement per worker.
+
+        Args:
+            task_files (List[str]): Task files to run.
+            jobs (int): Number of pool workers, each confined to one NUMA node.
+        """
+        placements = place_jobs(jobs)
+        TRACE(
+            f"Run {len(task_files)} tasks on {jobs} workers: "
+            f"{[placement.to_dict() for placement in placements]}"
+        )
+
+        mp_context = multiprocessing.get_context()
+        placement_slots = mp_context.Queue()
+        for placement in placements:
+            placement_slots.put(placement)
+
+        total_tasks = len(task_files)
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(placement_slots, is_trace_enabled(), self.arguments.isolate),
+        ) as pool:
+
+            def submit(task_file: str):
+                self.journal.start(task_file)
+                future = pool.submit(
+                    _run_task_in_worker, task_file, self.run_info(task_file)
+                )
+                futures[future] = task_file
+
+            futures = {}
+            for task_file in task_files:
+                submit(task_file)
+
+            finished = 0
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task_file = futures.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        if self.task_failed(task_file, e):
+                            submit(task_file)
+                        continue
+                    self.record_fingerprint(task_file)
+                    self.journal.finish(task_file)
+                    finished += 1
+                    print(
+                        f"Finished task {finished}/{total_tasks}: {self.labels[task_file]}"
+                    )
+
+    def run_benchmarks_farm(self, task_files: List[str]):
+        """
+        Serve tasks to farm workers over TCP and collect their results.
+
+        Workers on other nodes join with `quark-runtime --farm-worker
+        --coordinator=<host:port>`, `--local-workers` also starts some on this host.
+        """
+        tasks = [
+            FarmTask(
+                id=str(idx),
+                label=self.labels[task_file],
+                config=self.decode(task_file).model_dump(mode="json"),
+                run_info=self.run_info(task_file),
+            )
+            for idx, task_file in enumerate(task_files)
+        ]
+        queue = FarmQueue(
+            tasks,
+            heartbeat_timeout=self.arguments.heartbeat_timeout,
+            # Expired leases keep the default budget, a silent worker is not
+            # a failed task
+            max_failures=self.arguments.retries + 1,
+        )
+        for task_file in task_files:
+            self.journal.start(task_file)
+        server = FarmServer(parse_address(self.arguments.farm), queue)
+        host, port = server.address
+        print(f"Farm coordinator serving {len(tasks)} tasks on {host}:{port}")
+
+        workers = []
+        if self.arguments.local_workers:
+            for placement in place_jobs(self.arguments.local_workers):
+                workers.append(
+                    farm_worker(
+                        self.arguments.ctx,
+                        f"127.0.0.1:{port}",
+                        cpus=format_cpu_list(placement.cpus),
+                        numa_node=placement.node,
+                    )
+                )
+        workers_alive = None
+        if workers:
+            # Without remote workers, the farm cannot finish once these exited
+            def workers_alive():
+                return any(not worker.runner.process_is_finished for worker in workers)
+
+        try:
+            server.serve_until_done(workers_alive=workers_alive)
+        finally:
+            for worker in workers:
+                try:
+                    worker.join()
+                except Failure as e:
+                    TRACE(f"Local farm worker exited abnormally: {e}")
+
+        with ResultsStore(self.store_path()) as store:
+            for task_file, farm_task in zip(task_files, tasks):
+                result = queue.results.get(farm_task.id)
+                if result is None:
+                    self.failures.append(task_file)
+                    errors = farm_task.errors or ["not finished"]
+                    self.journal.fail(task_file, errors[-1])
+                    continue
+                for run in result["runs"]:
+                    store.import_run(run)
+                result_file = os.path.join(RESULTS_DIR, f"{farm_task.label}.json")
+                os.makedirs(RESULTS_DIR, exist_ok=True)
+                with open(result_file, "w") as file:
+                    json.dump(result["results"], file, indent=4, ensure_ascii=False)
+                self.record_fingerprint(task_file)
+                self.journal.finish(task_file)
+
+    def merge_results(self):
+        """Collect the per-label result files of this run into one summary file."""
+        merged = {}
+        for task_file, label in self.labels.items():
+            result_file = os.path.join(RESULTS_DIR, f"{label}.json")
+            if not os.path.exists(result_file):
+                TRACE(f"No result file for task {label}")
+                continue
+            with open(result_file, "r") as file:
+                merged[label] = json.load(file)
+
+        if not merged:
+            return merged
+
+        summary_file = os.path.join(RESULTS_DIR, "summary.json")
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(summary_file, "w") as file:
+            json.dump(merged, file, indent=4, ensure_ascii=False)
+
+        print(f"\nSummary of {len(merged)} tasks (saved to {summary_file}):")
+        print(f"  All runs are stored in {self.store_path()} as sweep {self.sweep_id}")
+        for label, results in merged.items():
+            # Sweeps report one entry per grid point
+            entries = results.get("sweep") or [{"label": label, "results": results}]
+            for entry in entries:
+                point = entry["results"]
+                line = (
+                    f"  {entry['label']}: mean={point.get('mean_time')} "
+                    f"median={point.get('median_time')} samples={point.get('samples')}"
+                )
+                if point.get("precision") is not None:
+                    line += (
+                        f" precision=±{point['precision']:.2%} "
+                        f"({point.get('stop_reason')})"
+                    )
+                counters = point.get("counters") or {}
+                if "cycles" in counters:
+                    # Cycles per call do not depend on the clock frequency
+                    line += f" cycles={counters['cycles']['median']:.0f}"
+                if "ipc" in counters:
+                    line += f" ipc={counters['ipc']:.2f}"
+                if point.get("warmup_reason") not in (None, "warmup_samples"):
+                    line += (
+                        f" warmup={point['warmup_samples']} "
+                        f"({point['warmup_reason']})"
+                    )
+                print(line)
+        return merged
+
+    def store_path(self) -> str:
+        return os.path.join(RESULTS_DIR, ResultsStore.DEFAULT_NAME)
+
+    def current_runs(self, store: ResultsStore) -> Dict[str, dict]:
+        """
+        Latest stored runs of the matching tasks, by label.
+
+        Tasks skipped as up to date are represented by the newest invocation that
+        ran them with the same fingerprint.
+        """
+        runs = {}
+        for fingerprint in self.fingerprints.values():
+            matches = store.query(fingerprint=fingerprint)
+            if not matches:
+                continue
+            latest_sweep = matches[0]["sweep_id"]
+            runs.update(
+                store.latest_per_label(
+                    [run for run in matches if run["sweep_id"] == latest_sweep]
+                )
+            )
+        return runs
+
+    def check_baseline(self) -> dict:
+        """Compare the runs of this invocation with the baseline and write a verdict."""
+        policy = RegressionPolicy(
+            threshold=self.arguments.threshold, alpha=self.arguments.alpha
+        )
+        with ResultsStore(self.store_path()) as store:
+            baseline_runs = store.resolve(self.arguments.baseline)
+            verdict = check_regressions(
+                store, self.current_runs(store), baseline_runs, policy
+            )
+        verdict["baseline"] = self.arguments.baseline
+        verdict["sweep_id"] = self.sweep_id
+
+        verdict_file = os.path.join(RESULTS_DIR, "verdict.json")
+        write_verdict(verdict, verdict_file)
+        print(f"\nComparison with baseline {self.arguments.baseline}:")
+        for entry in verdict["tasks"]:
+            detail = ""
+            if "median_ratio" in entry:
+                low, high = entry["ratio_ci"]
+                detail = (
+                    f" median ratio {entry['median_ratio']:.3f} "
+                    f"[{low:.3f}, {high:.3f}] p={entry['p_value']:.4f}"
+                )
+            print(f"  {entry['label']}: {entry['verdict']}{detail}")
+        print(f"Verdict {verdict['status']} (saved to {verdict_file})")
+        return verdict
+
+    def tag_runs(self, tag: str):
+        with ResultsStore(self.store_path()) as store:
+            runs = self.current_runs(store)
+            store.tag(tag, [run["run_id"] for run in runs.values()])
+        print(f"Tagged {len(runs)} runs as {tag}")
+
+    def report_sweep(self):
+        """Tell how to resume the sweep if it did not run to completion."""
+        if self.journal is None:
+            return
+        unfinished = self.journal.unfinished()
+        if self.failures:
+            labels = [self.labels[task_file] for task_file in self.failures]
+            print(f"{len(labels)} tasks failed: {labels}")
+        if unfinished:
+            print(
+                f"Sweep {self.sweep_id} has {len(unfinished)} unfinished tasks "
+                f"{self.journal.counts()}, continue it with "
+                f"`quark bench --resume {self.sweep_id}` "
+                "(failed tasks only run again within --retries)"
+            )
 
     def bench(self):
         self.run_benchmarks()
+        self.merge_results()
+        self.report_sweep()
+
+        verdict = None
+        if self.arguments.baseline:
+            verdict = self.check_baseline()
+        # A failing build must not move the tag it may be gated against next time
+        if self.arguments.tag and (verdict is None or verdict["status"] == "pass"):
+            self.tag_runs(self.arguments.tag)
+        if verdict is not None and verdict["status"] == "fail":
+            raise Exit(
+                f"Performance regression in {', '.join(verdict['regressions'])}",
+                code=1,
+            )
+        if self.failures:
+            raise Exit(f"{len(self.failures)} tasks failed", code=1)
 
 
 @task
 @with_venv
-def run(ctx: Context, task_file: str, num_iterations: int = 10):
+def run(
+    ctx: Context,
+    task_file: str,
+    num_iterations: int = 10,
+    cpus: str = "",
+    numa_node: int = -1,
+    sweep_id: str = "",
+    fingerprint: str = "",
+):
     """
     Run the benchmark by executing the workload with the data provider and timing it.
 
     Args:
         num_iterations (int): The number of iterations to run the benchmark for.
+        cpus (str): Optional CPU list (e.g. '0-3') the runtime pins itself to.
+        numa_node (int): Optional NUMA node the runtime binds its memory to.
+        sweep_id (str): Bench invocation the run is stored under.
+        fingerprint (str): Task fingerprint stored with the run.
     """
     TRACE("Dispatch task {}".format(task_file))
     cmd = f"quark-runtime --bench --task={task_file} --trace"
+    if cpus:
+        cmd += f" --cpus={cpus}"
+    if numa_node >= 0:
+        cmd += f" --numa-node={numa_node}"
+    if sweep_id:
+        cmd += f" --sweep-id={sweep_id}"
+    if fingerprint:
+        cmd += f" --fingerprint={fingerprint}"
     TRACE("Running cmd = {}".format(cmd))
     ctx.run(cmd)
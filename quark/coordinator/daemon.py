@@ -0,0 +1,157 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+from invoke import Context, task
+from invoke.exceptions import Failure
+from quark_utility import *
+
+
+class RuntimeDaemon:
+    """
+    Handle on a resident `quark-runtime --serve` process reached over a Unix socket.
+
+    Tasks sent through `run_task` are executed in-process by the daemon, which keeps
+    framework imports and constructed workloads warm between tasks.
+    """
+
+    def __init__(
+        self,
+        ctx: Context,
+        cpus: str = "",
+        numa_node: int = -1,
+        socket_path: str = None,
+        startup_timeout: float = 300.0,
+    ):
+        self.ctx = ctx
+        self.cpus = cpus
+        self.numa_node = numa_node
+        self.socket_path = socket_path or os.path.join(
+            tempfile.gettempdir(), f"quark-runtime-{os.getpid()}.sock"
+        )
+        self.startup_timeout = startup_timeout
+        self.client = MessageClient(self.socket_path)
+        self.promise = None
+
+    def is_alive(self) -> bool:
+        return self.promise is not None and not self.promise.runner.process_is_finished
+
+    def start(self):
+        TRACE(f"Start quark-runtime daemon on {self.socket_path}")
+        self.promise = serve(
+            self.ctx, self.socket_path, cpus=self.cpus, numa_node=self.numa_node
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.client.wait_ready(timeout=1.0):
+                return
+            if not self.is_alive():
+                break
+        self.stop()
+        raise RuntimeError(
+            f"quark-runtime daemon failed to start on {self.socket_path}"
+        )
+
+    def run_task(self, task_file: str, run_info: dict = None) -> dict:
+        """Run one task file in the daemon and return its results."""
+        if not self.is_alive():
+            self.start()
+        try:
+            response = self.client.request(
+                "run", task=os.path.abspath(task_file), run_info=run_info or {}
+            )
+        except OSError as e:
+            # The daemon died mid-task (e.g. a crashing plugin), replace it
+            self.stop()
+            raise RuntimeError(
+                f"quark-runtime daemon died while running {task_file}"
+            ) from e
+
+        if response["status"] != "ok":
+            TRACE(response.get("traceback", ""))
+            raise RuntimeError(f"Task {task_file} failed: {response['error']}")
+        return response["results"]
+
+    def environment(self) -> dict:
+        """Return the runtime environment as seen by the daemon."""
+        if not self.is_alive():
+            self.start()
+        return self.client.request("environment")["environment"]
+
+    def stop(self):
+        TRACE(f"Stop quark-runtime daemon on {self.socket_path}")
+        if self.is_alive():
+            try:
+                self.client.request("shutdown")
+            except OSError:
+                pass
+        if self.promise is not None:
+            try:
+                self.promise.join()
+            except Failure as e:
+                TRACE(f"quark-runtime daemon exited abnormally: {e}")
+            self.promise = None
+
+
+@task
+@with_venv
+def serve(ctx: Context, socket_path: str, cpus: str = "", numa_node: int = -1):
+    """
+    Launch a resident quark-runtime in the background and return its promise.
+
+    Args:
+        socket_path (str): Unix socket the daemon listens on.
+        cpus (str): Optional CPU list (e.g. '0-3') the daemon pins itself to.
+        numa_node (int): Optional NUMA node the daemon binds its memory to.
+    """
+    cmd = f"quark-runtime --serve --socket={socket_path} --trace"
+    if cpus:
+        cmd += f" --cpus={cpus}"
+    if numa_node >= 0:
+        cmd += f" --numa-node={numa_node}"
+    TRACE("Running cmd = {}".format(cmd))
+    # Asynchronous runs capture output by default, stream it like a regular run
+    return ctx.run(
+        cmd,
+        asynchronous=True,
+        out_stream=sys.stdout,
+        err_stream=sys.stderr,
+        env={"PYTHONUNBUFFERED": "1"},
+    )
+
+
+@task
+@with_venv
+def query_environment(ctx: Context) -> dict:
+    """Query the runtime environment from a one-off quark-runtime process."""
+    result = ctx.run("quark-runtime --environment", hide=True)
+    # quark_utility prints a banner on import, the JSON document is the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@task
+@with_venv
+def farm_worker(ctx: Context, coordinator: str, cpus: str = "", numa_node: int = -1):
+    """
+    Launch a farm worker in the background and return its promise.
+
+    Args:
+        coordinator (str): host:port of the farm coordinator.
+        cpus (str): Optional CPU list (e.g. '0-3') the worker pins itself to.
+        numa_node (int): Optional NUMA node the worker binds its memory to.
+    """
+    cmd = f"quark-runtime --farm-worker --coordinator={coordinator} --trace"
+    if cpus:
+        cmd += f" --cpus={cpus}"
+    if numa_node >= 0:
+        cmd += f" --numa-node={numa_node}"
+    TRACE("Running cmd = {}".format(cmd))
+    return ctx.run(
+        cmd,
+        asynchronous=True,
+        out_stream=sys.stdout,
+        err_stream=sys.stderr,
+        env={"PYTHONUNBUFFERED": "1"},
+    )
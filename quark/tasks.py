@@ -3,6 +3,7 @@ import json
 import os
 import sys
 import tempfile
+import time
 from dataclasses import dataclass
 from functools import wraps
 from pathlib import Path
@@ -187,15 +188,87 @@ class Argument:
     label: str = ""
     config_dir: str = "experiments"
     ctx: Context = None
-
-
-@task
-def bench(ctx, task="", task_dir=""):
+    jobs: int = 1
+    isolate: bool = False
+    force: bool = False
+    stale_after: str = ""
+    baseline: str = ""
+    threshold: float = 0.05
+    alpha: float = 0.05
+    tag: str = ""
+    farm: str = ""
+    local_workers: int = 0
+    heartbeat_timeout: float = 30.0
+    schedule: str = "shortest"
+    priority: str = ""
+    time_budget: str = ""
+    resume: str = ""
+    retries: int = 0
+
+
+@task(
+    help={
+        "jobs": "Number of tasks to run concurrently, each on its own CPU set",
+        "isolate": "Start a fresh quark-runtime process per task instead of a daemon",
+        "force": "Rerun tasks even if their stored result is up to date",
+        "stale-after": "Rerun tasks whose result is older than this, e.g. '12h' or '7d'",
+        "baseline": "Fail if tasks got slower than this tag, sweep id or run id",
+        "threshold": "Relative slowdown of the median tolerated by --baseline",
+        "alpha": "Significance level of the --baseline comparison",
+        "tag": "Tag the runs of this invocation, e.g. to use them as a baseline",
+        "farm": "Serve the tasks to farm workers on this host:port instead",
+        "local-workers": "Farm workers to start on this host, on loopback",
+        "heartbeat-timeout": "Seconds without heartbeat before a farm task is requeued",
+        "schedule": "Task order: 'shortest' (default), 'priority' or 'fifo'",
+        "priority": "Comma-separated task tags, most urgent first, for --schedule=priority",
+        "time-budget": "Only run tasks predicted to fit in this time, e.g. '2h'",
+        "resume": "Continue the sweep with this id, skipping its finished tasks",
+        "retries": "Times a failed task is run again, also across --resume",
+    }
+)
+def bench(
+    ctx,
+    task="",
+    task_dir="",
+    jobs=1,
+    isolate=False,
+    force=False,
+    stale_after="",
+    baseline="",
+    threshold=0.05,
+    alpha=0.05,
+    tag="",
+    farm="",
+    local_workers=0,
+    heartbeat_timeout=30.0,
+    schedule="shortest",
+    priority="",
+    time_budget="",
+    resume="",
+    retries=0,
+):
     enable_trace()
     print("Starting benchmark collection and execution...")
     arg = Argument()
     arg.label = task
     arg.ctx = ctx
+    arg.jobs = jobs
+    arg.isolate = isolate
+    arg.force = force
+    arg.stale_after = stale_after
+    arg.baseline = baseline
+    arg.threshold = float(threshold)
+    arg.alpha = float(alpha)
+    arg.tag = tag
+    # Local workers alone make a single-host farm on an ephemeral loopback port
+    arg.farm = farm or ("127.0.0.1:0" if local_workers else "")
+    arg.local_workers = int(local_workers)
+    arg.heartbeat_timeout = float(heartbeat_timeout)
+    arg.schedule = schedule
+    arg.priority = priority
+    arg.time_budget = time_budget
+    arg.resume = resume
+    arg.retries = int(retries)
     print(task_dir)
     if task_dir is not "":
         arg.config_dir = task_dir
@@ -204,6 +277,57 @@ def bench(ctx, task="", task_dir=""):
     coordinator.bench()
 
 
+@task(
+    help={
+        "task": "Only runs of this label",
+        "since": "Only runs newer than this, e.g. '12h' or '7d'",
+        "sweep": "Only runs of this bench invocation",
+        "export": "Write the latest summary per label to this JSON file",
+    }
+)
+def results(
+    ctx,
+    task="",
+    framework="",
+    model="",
+    device="",
+    since="",
+    sweep="",
+    limit=20,
+    export="",
+):
+    """
+    Query the benchmark runs stored in the results database.
+    """
+    filters = {
+        "label": task or None,
+        "framework": framework or None,
+        "model": model or None,
+        "device": device or None,
+        "sweep_id": sweep or None,
+    }
+    if since:
+        filters["since"] = time.time() - parse_duration(since)
+
+    store_path = os.path.join("build", "benchmarks", ResultsStore.DEFAULT_NAME)
+    if not os.path.exists(store_path):
+        print(f"No results store at {store_path}, run `quark bench` first")
+        return
+    with ResultsStore(store_path) as store:
+        if export:
+            view = store.export_json(export, **filters)
+            print(f"Exported {len(view)} labels to {export}")
+            return
+        for row in store.query(limit=limit, **filters):
+            summary = row["summary"] or {}
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["timestamp"]))
+            print(
+                f"{stamp} {row['run_id'][:12]} {row['label']} "
+                f"[{row['framework']}/{row['model']}/{row['device']}] "
+                f"median={summary.get('median_time')} samples={summary.get('samples')}"
+            )
+
+
 @task
 @with_torch_venv
 def quark_engine_test(ctx):
@@ -423,6 +547,7 @@ namespace = Collection(
     clean,
     test,
     bench,
+    results,
     unittest,
     get_plugins,
     pull_plugins,
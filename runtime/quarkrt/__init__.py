@@ -1,5 +1,6 @@
 from .data_utils import *
 from .executor import *
 from .runner import *
+from .server import *
 from .timer import *
 from .workload import *
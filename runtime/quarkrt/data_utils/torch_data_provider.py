@@ -38,11 +38,16 @@ class TorchDataProvider(DataProviderBase):
             isinstance(x, int) for x in self.input_shape
         )
         # TODO: compare and determine the rng method
+        if self.data_type == DtypeEnum.BFLOAT16:
+            # numpy has no bfloat16, round from float32 in torch
+            numpy_dtype = np.float32
+        else:
+            numpy_dtype = self.data_type.to_numpy()
         inputs_data = np.random.rand(self.batch_size, *self.input_shape).astype(
-            self.data_type.to_numpy()
+            numpy_dtype
         )
         labels_data = np.random.randint(0, 10, size=self.batch_size)
-        inputs = torch.from_numpy(inputs_data)
+        inputs = torch.from_numpy(inputs_data).to(self.data_type.to_torch())
         labels = torch.from_numpy(labels_data)
         return inputs, labels
 
@@ -88,5 +93,7 @@ class TorchDataProvider(DataProviderBase):
     def get_data(self):
         """Get a batch of data."""
         if self.dataset is not None:
-            return next(self._iterator)
+            # ToTensor yields float32 images
+            inputs, labels = next(self._iterator)
+            return inputs.to(self.data_type.to_torch()), labels
         return self.generate_synthetic_data()
@@ -1,6 +1,7 @@
 from .executor_base import *
 from .executor_builder import *
 from .iree_executor import *
+from .phases import *
 
 if TF_SUPPORTED:
     from .tf_executor import *
@@ -5,6 +5,8 @@ from quark_utility import *
 from quarkrt.data_utils import DataProviderBase
 from quarkrt.workload import WorkloadBase
 
+from .phases import PhaseRecorder
+
 
 @dataclass
 class ExecutorBase(ABC):
@@ -13,6 +15,10 @@ class ExecutorBase(ABC):
     config: BenchmarkConfig = field(default=None)
     run_mode: RunModeEnum = field(default=RunModeEnum.INFERENCE)
     device_info: dict = field(default_factory=dict)
+    # Per-phase timings of execute, read by the timer as a probe
+    phases: PhaseRecorder = field(init=False, default_factory=PhaseRecorder)
+    # How prepare set up the last task, e.g. execution mode and compile time
+    setup: dict = field(init=False, default_factory=dict)
 
     def __post_init__(self):
         TRACE(
@@ -46,6 +52,10 @@ class ExecutorBase(ABC):
         """Retrieve device-specific information."""
         pass
 
+    def prepare(self, workload: WorkloadBase, data_provider: DataProviderBase):
+        """Hoist per-task setup out of execute, called once before timing."""
+        pass
+
     @abstractmethod
     def execute(self):
         """Execute the workload using data from the data provider."""
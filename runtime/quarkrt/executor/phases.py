@@ -0,0 +1,143 @@
+import time
+from typing import Any, Dict, List, Tuple
+
+from quark_utility import *
+
+__all__ = [
+    "PHASES",
+    "PhaseRecorder",
+]
+
+# Phases of one execute call, in the order they run
+PHASES = ("data", "transfer", "forward", "loss", "backward", "optimizer")
+
+_UNIT_SCALE = {"sec": 1.0, "ms": 1e3, "us": 1e6}
+
+
+class _Phase:
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder: "PhaseRecorder", name: str):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        if self.recorder.use_cuda:
+            self.start = self.recorder._event()
+        else:
+            self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        recorder = self.recorder
+        if recorder.use_cuda:
+            recorder._pending.append((self.name, self.start, recorder._event()))
+        else:
+            elapsed = (time.perf_counter_ns() - self.start) * 1e-9
+            recorder._current[self.name] = (
+                recorder._current.get(self.name, 0.0) + elapsed
+            )
+        return False
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class PhaseRecorder:
+    """
+    Time the named phases of execute calls, as a probe of the task's timer.
+
+    Executors wrap each phase in `with recorder.phase(name)`. Phases are only
+    recorded between start() and stop() of the timer run, and what warmup
+    recorded is discarded at start_measurement(). After each timed sample the
+    phases are added per call to a StreamingStats each, next to their total.
+    On CPU, phases are read with time.perf_counter_ns. On GPU they are CUDA
+    events on the device timeline, read once the timer synchronised, so
+    phases do not serialise the device.
+    """
+
+    def __init__(self, use_cuda: bool = False):
+        self.use_cuda = use_cuda
+        self.active = False
+        self.stats: Dict[str, StreamingStats] = {}
+        self.total = StreamingStats()
+        self._current: Dict[str, float] = {}
+        self._pending: List[Tuple[str, Any, Any]] = []
+
+    def _event(self):
+        import torch
+
+        event = torch.cuda.Event(enable_timing=True)
+        event.record()
+        return event
+
+    def phase(self, name: str):
+        if not self.active:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def reset(self):
+        self.stats = {}
+        self.total = StreamingStats()
+        self._current = {}
+        self._pending = []
+
+    def start(self):
+        self.reset()
+        self.active = True
+
+    def start_measurement(self):
+        self.reset()
+
+    def sample(self, calls: int = 1):
+        if self._pending:
+            # The timer synchronised already, this returns at once
+            self._pending[-1][2].synchronize()
+            for name, start, end in self._pending:
+                elapsed = start.elapsed_time(end) * 1e-3
+                self._current[name] = self._current.get(name, 0.0) + elapsed
+            self._pending = []
+        if not self._current:
+            return
+        for name, elapsed in self._current.items():
+            self.stats.setdefault(name, StreamingStats()).add(elapsed / calls)
+        self.total.add(sum(self._current.values()) / calls)
+        self._current = {}
+
+    def stop(self):
+        self.active = False
+
+    def summary(self, unit="sec") -> Dict[str, Dict[str, float]]:
+        """
+        Distribution of every recorded phase and of their sum per call.
+
+        `share` is the fraction of the mean total a phase takes.
+        """
+        if unit not in _UNIT_SCALE:
+            raise ValueError("Unsupported unit. Use 'sec', 'ms', or 'us'.")
+        unit_scale = _UNIT_SCALE[unit]
+        if not self.total.count:
+            return {}
+        summary = {}
+        names = [name for name in PHASES if name in self.stats]
+        names += sorted(set(self.stats) - set(PHASES))
+        for name in names + ["total"]:
+            stats = self.total if name == "total" else self.stats[name]
+            summary[name] = {
+                "mean": stats.mean * unit_scale,
+                "median": stats.quantile(0.5) * unit_scale,
+                "p90": stats.quantile(0.9) * unit_scale,
+                "p99": stats.quantile(0.99) * unit_scale,
+                "min": stats.min * unit_scale,
+                "max": stats.max * unit_scale,
+                "share": stats.mean / self.total.mean if self.total.mean > 0 else None,
+            }
+        return summary
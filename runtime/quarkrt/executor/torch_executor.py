@@ -1,6 +1,11 @@
 # executor/torch_executor.py
 
+import contextlib
+import copy
+import functools
+import time
 from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
 
 import torch
 from quark_utility import *
@@ -10,15 +15,78 @@ from quarkrt.workload import WorkloadBase
 from .executor_base import ExecutorBase
 
 
+@dataclass
+class ExecutionPlan:
+    """Setup of a workload resolved once, reused by every execute call."""
+
+    workload: WorkloadBase
+    device: torch.device
+    model: torch.nn.Module
+    loss_fn: Optional[Any] = None
+    optimizer: Optional[torch.optim.Optimizer] = None
+    # Inputs staged on the device, for the data provider they were drawn from
+    data_provider: Optional[DataProviderBase] = None
+    inputs: Optional[torch.Tensor] = None
+    labels: Optional[torch.Tensor] = None
+    # Grad mode the inference forward runs under
+    grad_context: Callable[[], Any] = torch.no_grad
+    # Mixed precision of forward and loss, torch.autocast when configured
+    autocast: Callable[[], Any] = contextlib.nullcontext
+    # Layout of 4-D inputs, channels_last in that execution mode
+    memory_format: Optional[torch.memory_format] = None
+
+    def stage(self, tensor: torch.Tensor) -> torch.Tensor:
+        """Copy a tensor to the device of the plan, in its memory format."""
+        if self.memory_format is not None and tensor.dim() == 4:
+            return tensor.to(self.device, memory_format=self.memory_format)
+        return tensor.to(self.device)
+
+
+def _output_drift(
+    reference: torch.Tensor, output: torch.Tensor, tolerance: float
+) -> Dict[str, Any]:
+    """
+    Numeric drift of `output` from a float32 `reference` of the same inputs.
+
+    The error is made relative to the largest reference output, so outputs
+    close to zero do not blow it up. For 2-D outputs, the fraction of rows
+    whose argmax, e.g. the predicted class, is unchanged is reported too.
+    """
+    if not isinstance(output, torch.Tensor) or output.shape != reference.shape:
+        raise ValueError("Drift check needs one output tensor of the reference shape")
+    reference = reference.detach().double()
+    error = (output.detach().double() - reference).abs()
+    scale = reference.abs().max().item() or 1.0
+    drift = {
+        "max_abs_error": error.max().item(),
+        "mean_abs_error": error.mean().item(),
+        "max_rel_error": error.max().item() / scale,
+        "tolerance": tolerance,
+        "top1_agreement": None,
+    }
+    drift["within_tolerance"] = drift["max_rel_error"] <= tolerance
+    if reference.dim() == 2:
+        agreement = output.argmax(dim=1) == reference.argmax(dim=1)
+        drift["top1_agreement"] = agreement.double().mean().item()
+    return drift
+
+
 @dataclass
 class TorchExecutor(ExecutorBase):
     available_devices: dict[DeviceEnum, torch.device] = field(
         init=False, default_factory=dict
     )
+    # id(workload) -> ExecutionPlan, see prepare
+    plans: Dict[int, ExecutionPlan] = field(init=False, default_factory=dict)
 
     def __post_init__(self):
         super().__post_init__()
         self.load_available_devices()
+        num_threads = configured_num_threads()
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        device = self.get_device()
+        self.phases.use_cuda = device is not None and device.type == "cuda"
         assert self._validate()
 
     def load_available_devices(self):
@@ -36,53 +104,198 @@ class TorchExecutor(ExecutorBase):
                 return torch_device
         return None
 
-    # TODO: simplify this function with pre/post execution
-    def execute(self, workload: WorkloadBase, data_provider: DataProviderBase):
-        """Execute the workload using data from the data provider."""
+    def prepare(
+        self, workload: WorkloadBase, data_provider: DataProviderBase
+    ) -> ExecutionPlan:
+        """
+        Resolve everything execute needs that does not change between calls.
+
+        Places the model on the device in the mode of the task, builds the loss
+        and the optimizer once so optimizer state carries over between steps,
+        and stages synthetic inputs on the device. Inputs of real datasets are
+        still fetched and copied by every call, that is the input pipeline.
+
+        Weights take the dtype of the dataset, or stay float32 whatever the
+        dataset dtype when forward and loss run under autocast. A channels_last
+        or reduced precision model is a copy, the cached workload is shared with
+        tasks in other modes and keeps its float32 weights, which also serve as
+        reference of the drift check.
+        Last, the execution mode is applied, and the time it takes to trace or
+        compile is kept in `setup`, apart from the steady-state latency.
+        """
         assert workload is not None, "Workload must be provided"
         assert data_provider is not None, "Data provider must be provided"
 
+        started = time.perf_counter()
         device = self.get_device()
         if device is None:
             raise RuntimeError(
                 f"Requested device {self.config.experiment.executor.device} is not available."
             )
 
-        # TRACE(f"Executing model = {workload.workload}")
-
-        # Move model to the correct device if necessary
-        model = workload.workload
-        if next(model.parameters()).device != device:
-            model = model.to(device)
-
-        # Load input data
-        input_data, label_data = data_provider.get_data()
-        input_data, label_data = input_data.to(device), label_data.to(device)
-
-        # Inference mode
+        # Module.to moves parameters in place, also fine for parameterless ops
+        model = workload.workload.to(device)
+        plan = ExecutionPlan(workload=workload, device=device, model=model)
+        mode = self.config.experiment.executor.execution_mode
+        converted = {}
+        if mode == ExecutionModeEnum.CHANNELS_LAST:
+            plan.memory_format = converted["memory_format"] = torch.channels_last
+        executor = self.config.experiment.executor
+        dtype = self.config.dataset.dtype.to_torch()
+        if dtype != torch.float32 and executor.autocast is None:
+            converted["dtype"] = dtype
+        if converted:
+            # Convert a copy, the workload is cached for tasks in other modes too
+            model = plan.model = copy.deepcopy(model).to(**converted)
         if self.run_mode == RunModeEnum.INFERENCE:
             model.eval()
-            with torch.no_grad():
-                return model(input_data)
-
-        # Training mode
         elif self.run_mode == RunModeEnum.TRAINING:
             model.train()
+        else:
+            unreachable()
+
+        if getattr(data_provider, "data_source", None) == DataSourceEnum.SYNTHETIC:
+            inputs, labels = data_provider.get_data()
+            plan.data_provider = data_provider
+            plan.inputs, plan.labels = plan.stage(inputs), labels.to(device)
 
+        if executor.autocast is not None:
+            plan.autocast = functools.partial(
+                torch.autocast,
+                device_type=device.type,
+                dtype=executor.autocast.to_torch(),
+            )
+        drift = None
+        if executor.drift is not None:
+            inputs, _ = self._example_batch(plan, data_provider)
+            reference = self._eval_forward(plan, workload.workload, inputs.float())
+            output = self._eval_forward(plan, model, inputs, plan.autocast)
+            drift = _output_drift(reference, output, executor.drift.tolerance)
+
+        if self.run_mode == RunModeEnum.TRAINING:
             # Default to CrossEntropyLoss if not specified
-            loss_fn = getattr(workload, "loss_fn", torch.nn.CrossEntropyLoss())
-            optimizer = getattr(workload, "optimizer", torch.optim.SGD)(
+            plan.loss_fn = getattr(workload, "loss_fn", torch.nn.CrossEntropyLoss())
+            plan.optimizer = getattr(workload, "optimizer", torch.optim.SGD)(
                 model.parameters(), lr=0.01
             )
 
-            output = model(input_data)
-            loss = loss_fn(output, label_data)
+        compile_time = self._apply_execution_mode(plan, mode, data_provider)
+        self.plans = {id(workload): plan}
+        self.setup = {
+            "execution_mode": mode.value,
+            "prepare_time": time.perf_counter() - started,
+            # Tracing or compiling, first call included, None when eager
+            "compile_time": compile_time,
+            "dtype": self.config.dataset.dtype.value,
+            "autocast": executor.autocast.value if executor.autocast else None,
+            "drift": drift,
+        }
+        TRACE(
+            f"Prepared {self.run_mode.value} plan of {self.config.label} on {device}"
+            f" in {mode.value} mode"
+        )
+        return plan
+
+    def _apply_execution_mode(
+        self,
+        plan: ExecutionPlan,
+        mode: ExecutionModeEnum,
+        data_provider: DataProviderBase,
+    ) -> Optional[float]:
+        """Switch the plan to `mode`, return seconds spent tracing or compiling."""
+        if mode == ExecutionModeEnum.INFERENCE_MODE:
+            plan.grad_context = torch.inference_mode
+        if mode not in (
+            ExecutionModeEnum.TORCHSCRIPT_TRACE,
+            ExecutionModeEnum.TORCHSCRIPT_SCRIPT,
+            ExecutionModeEnum.COMPILE,
+        ):
+            return None
 
-            optimizer.zero_grad()
+        # Traced and compiled for the shapes of the first batch
+        inputs, labels = self._example_batch(plan, data_provider)
+        started = time.perf_counter()
+        if mode == ExecutionModeEnum.COMPILE:
+            options = self.config.experiment.executor.compile or CompileConfig()
+            plan.model = torch.compile(
+                plan.model,
+                backend=options.backend,
+                mode=options.mode,
+                fullgraph=options.fullgraph,
+            )
+        else:
+            with torch.no_grad():
+                if mode == ExecutionModeEnum.TORCHSCRIPT_TRACE:
+                    scripted = torch.jit.trace(plan.model, inputs)
+                else:
+                    scripted = torch.jit.script(plan.model)
+                # Inlines parameters as constants, the model is eval only by now
+                plan.model = torch.jit.freeze(scripted)
+
+        # Compilation is lazy, the first call pays for it
+        if plan.optimizer is None:
+            with plan.grad_context(), plan.autocast():
+                plan.model(inputs)
+        else:
+            with plan.autocast():
+                loss = plan.loss_fn(plan.model(inputs), labels)
             loss.backward()
-            optimizer.step()
+            plan.optimizer.zero_grad()
+        if plan.device.type == "cuda":
+            torch.cuda.synchronize(plan.device)
+        compile_time = time.perf_counter() - started
+        TRACE(f"{mode.value} of {self.config.label} took {compile_time:.3f}s")
+        return compile_time
 
-            return output
+    def _example_batch(self, plan: ExecutionPlan, data_provider: DataProviderBase):
+        """The staged batch of the plan, or else one batch on the device."""
+        if plan.inputs is not None:
+            return plan.inputs, plan.labels
+        inputs, labels = data_provider.get_data()
+        return plan.stage(inputs), labels.to(plan.device)
 
+    def _eval_forward(self, plan, model, inputs, autocast=contextlib.nullcontext):
+        # Eval mode keeps dropout and batch statistics out of the comparison
+        training = model.training
+        model.eval()
+        with torch.no_grad(), autocast():
+            output = model(inputs)
+        model.train(training)
+        if plan.device.type == "cuda":
+            torch.cuda.synchronize(plan.device)
+        return output
+
+    def execute(self, workload: WorkloadBase, data_provider: DataProviderBase):
+        """Run one step of the workload, preparing its plan on first use."""
+        plan = self.plans.get(id(workload))
+        if plan is None or plan.workload is not workload:
+            plan = self.prepare(workload, data_provider)
+
+        phases = self.phases
+        if plan.data_provider is data_provider:
+            input_data, label_data = plan.inputs, plan.labels
         else:
-            unreachable()
+            with phases.phase("data"):
+                input_data, label_data = data_provider.get_data()
+            with phases.phase("transfer"):
+                input_data = plan.stage(input_data)
+                label_data = label_data.to(plan.device)
+
+        # Inference mode
+        if plan.optimizer is None:
+            with plan.grad_context(), plan.autocast(), phases.phase("forward"):
+                return plan.model(input_data)
+
+        # Training mode, backward runs outside autocast
+        with plan.autocast():
+            with phases.phase("forward"):
+                output = plan.model(input_data)
+            with phases.phase("loss"):
+                loss = plan.loss_fn(output, label_data)
+        with phases.phase("backward"):
+            plan.optimizer.zero_grad()
+            loss.backward()
+        with phases.phase("optimizer"):
+            plan.optimizer.step()
+
+        return output
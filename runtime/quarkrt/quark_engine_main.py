@@ -1,11 +1,12 @@
 import argparse
+import json
 import sys
 import warnings
 from pathlib import Path
 
 from quark_utility import *
-from quarkrt import (DataProviderBuilder, ExecutorBuilder, Runner,
-                     WorkloadBuilder)
+from quarkrt import (DataProviderBuilder, ExecutorBuilder, FarmWorker, Runner,
+                     RuntimeServer, SweepRunner, WorkloadBuilder)
 
 warnings.filterwarnings("ignore")
 
@@ -44,6 +45,57 @@ def parse_args():
     parser.add_argument(
         "--tensorflow", action="store_true", help="Enable tensorflow support"
     )
+    parser.add_argument(
+        "--cpus",
+        type=str,
+        default=None,
+        help="Pin the task to a CPU list such as '0-3,8' and size thread pools to it",
+    )
+    parser.add_argument(
+        "--numa-node",
+        type=int,
+        default=None,
+        help="Bind memory to this NUMA node, used together with --cpus",
+    )
+    parser.add_argument(
+        "--environment",
+        action="store_true",
+        help="Print the runtime environment used for task fingerprints as JSON",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Stay resident and run task files sent over a Unix socket",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default="/tmp/quark-runtime.sock",
+        help="Unix socket path used with --serve",
+    )
+    parser.add_argument(
+        "--farm-worker",
+        action="store_true",
+        help="Pull and run tasks from the farm coordinator given by --coordinator",
+    )
+    parser.add_argument(
+        "--coordinator",
+        type=str,
+        default="127.0.0.1:7700",
+        help="host:port of the farm coordinator used with --farm-worker",
+    )
+    parser.add_argument(
+        "--sweep-id",
+        type=str,
+        default=None,
+        help="Id of the bench invocation this run belongs to, stored with the results",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        type=str,
+        default=None,
+        help="Task fingerprint computed by the coordinator, stored with the results",
+    )
     return parser.parse_args()
     return parser.parse_args()
 
@@ -51,11 +103,6 @@ def parse_args():
 def main():
     args = parse_args()
 
-    if args.task:
-        TRACE(f"task = {args.task}")
-        config = ConfigBuilder.load_config(args.task)
-        TRACE(f"config = \n{config}")
-
     if args.trace:
         enable_trace()
     else:
@@ -76,6 +123,33 @@ def main():
     else:
         disable_tf_support()
 
+    if args.cpus and args.numa_node is not None:
+        place_on_node(Placement(node=args.numa_node, cpus=parse_cpu_list(args.cpus)))
+    elif args.cpus:
+        pin_to_cpus(parse_cpu_list(args.cpus))
+
+    if args.environment:
+        print(json.dumps(collect_environment()))
+        return
+
+    if args.serve:
+        RuntimeServer(args.socket).serve()
+        return
+
+    if args.farm_worker:
+        FarmWorker(parse_address(args.coordinator)).serve()
+        return
+
+    if args.task:
+        TRACE(f"task = {args.task}")
+        index = ConfigIndex()
+        config = index.get(args.task)
+        if config is None:
+            raise SystemExit(
+                f"Configuration error in {args.task}: {index.error(args.task)}"
+            )
+        TRACE(f"config = \n{config}")
+
     # data = DataProviderBuilder.build(config)
     # TRACE(f"DATA = {data}\n")
     #
@@ -85,7 +159,16 @@ def main():
     # executor = ExecutorBuilder.build(config)
     # TRACE(f"EX = {executor}\n")
 
-    runner = Runner(config)
+    run_info = {}
+    if args.sweep_id:
+        run_info["sweep_id"] = args.sweep_id
+    if args.fingerprint:
+        run_info["fingerprint"] = args.fingerprint
+
+    if config.sweep is not None:
+        runner = SweepRunner(config, run_info=run_info)
+    else:
+        runner = Runner(config, run_info=run_info)
     runner.run()
     # results = runner.get_results()
     # print(f"Summary for task {config.label}: {results}")
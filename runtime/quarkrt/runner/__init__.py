@@ -1 +1,3 @@
+from .load_generator import *
 from .runner import *
+from .sweep_runner import *
@@ -0,0 +1,237 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+from quark_utility import *
+
+__all__ = [
+    "LoadGenerator",
+    "DynamicBatcher",
+]
+
+
+class LoadGenerator:
+    """
+    Open-loop load generator issuing calls of `func` at scheduled arrival times.
+
+    Unlike the timer, which calls back to back, requests arrive on their own
+    schedule whether or not earlier ones finished, and wait in the queue of a
+    pool of `workers` threads. Every request records when it was scheduled,
+    issued, started and finished, so queueing delay is part of its latency.
+    """
+
+    def __init__(self, func, *args, workers: int = 1, drain_timeout: float = 10.0):
+        self.func = func
+        self.args = args
+        self.workers = workers
+        self.drain_timeout = drain_timeout
+
+    def run(
+        self,
+        arrivals: np.ndarray,
+        offered_rate: float,
+        duration: Optional[float] = None,
+    ) -> LoadLevel:
+        """
+        Issue one request per offset in `arrivals`, in seconds from now.
+
+        `duration` is the window the arrivals were drawn for, by default up to
+        the last arrival.
+        """
+        count = len(arrivals)
+        self.submitted = np.full(count, np.nan)
+        self.started = np.full(count, np.nan)
+        self.finished = np.full(count, np.nan)
+        self.errors: List[BaseException] = []
+
+        self._open(count)
+        origin = time.perf_counter()
+        try:
+            for idx, offset in enumerate(arrivals):
+                delay = origin + offset - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                self.submitted[idx] = time.perf_counter()
+                self._submit(idx)
+            self._drain()
+        finally:
+            self._close()
+
+        if self.errors:
+            raise self.errors[0]
+        level = summarize_load(
+            offered_rate,
+            origin + np.asarray(arrivals),
+            self.submitted,
+            self.started,
+            self.finished,
+            origin=origin,
+            duration=duration,
+        )
+        TRACE(
+            f"Load {offered_rate:.1f}/s: achieved {level.achieved_rate:.1f}/s, "
+            f"{level.dropped} dropped of {level.requests}"
+        )
+        return level
+
+    def _open(self, count: int):
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.futures = []
+
+    def _request(self, idx: int):
+        self.started[idx] = time.perf_counter()
+        self.func(*self.args)
+        self.finished[idx] = time.perf_counter()
+
+    def _submit(self, idx: int):
+        self.futures.append(self.pool.submit(self._request, idx))
+
+    def _drain(self):
+        wait(self.futures, timeout=self.drain_timeout)
+
+    def _close(self):
+        # Requests still queued are dropped, running ones are let finish
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        for future in self.futures:
+            if not future.cancelled() and future.exception() is not None:
+                self.errors.append(future.exception())
+
+
+class DynamicBatcher(LoadGenerator):
+    """
+    Serving simulation, single-sample requests batched in front of an executor.
+
+    Requests enter a thread-safe queue. Each of `workers` batcher threads takes
+    the oldest request, then keeps collecting until the batch holds
+    max_batch_size requests or max_wait seconds passed since the oldest one
+    was enqueued, and hands collate(samples) to `execute`. A request finishes
+    with its batch, its queueing time includes the wait for the batch to fill.
+
+    Args:
+        execute (Callable): Runs one collated batch, e.g. through an executor.
+        samples (Sequence): Single-sample inputs, request i uses sample i modulo.
+        collate (Callable): Turns a list of samples into one batch.
+        max_batch_size (int): Largest batch dispatched.
+        max_wait (float): Seconds the oldest request may wait for a fuller batch.
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[Any], Any],
+        samples: Sequence[Any],
+        collate: Callable[[List[Any]], Any],
+        max_batch_size: int = 8,
+        max_wait: float = 0.005,
+        workers: int = 1,
+        drain_timeout: float = 10.0,
+    ):
+        super().__init__(execute, workers=workers, drain_timeout=drain_timeout)
+        if not samples:
+            raise ValueError("Dynamic batching needs at least one sample")
+        self.samples = samples
+        self.collate = collate
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+    def run(
+        self,
+        arrivals: np.ndarray,
+        offered_rate: float,
+        duration: Optional[float] = None,
+    ) -> LoadLevel:
+        level = super().run(arrivals, offered_rate, duration)
+        sizes = np.asarray(self.batch_sizes)
+        level.batches = {
+            "count": len(sizes),
+            "mean_size": float(sizes.mean()) if len(sizes) else None,
+            # Batch size -> number of batches dispatched with it
+            "sizes": {int(k): v for k, v in sorted(Counter(sizes.tolist()).items())},
+            "full_fraction": (
+                float(np.mean(sizes == self.max_batch_size)) if len(sizes) else None
+            ),
+        }
+        return level
+
+    def _open(self, count: int):
+        self.queue: queue.Queue = queue.Queue()
+        self.batch_sizes: List[int] = []
+        self.remaining = count
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.stopping = threading.Event()
+        if count == 0:
+            self.done.set()
+        self.threads = [
+            threading.Thread(target=self._serve, daemon=True)
+            for _ in range(self.workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def _submit(self, idx: int):
+        self.queue.put(idx)
+
+    def _drain(self):
+        self.done.wait(timeout=self.drain_timeout)
+
+    def _close(self):
+        # Batcher threads drop what is still queued and exit on the sentinels
+        self.stopping.set()
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+    def _collect(self) -> Optional[List[int]]:
+        first = self.queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = self.submitted[first] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                idx = self.queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    idx = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if idx is None:
+                # Keep the sentinel for this thread's next round
+                self.queue.put(None)
+                break
+            batch.append(idx)
+        return batch
+
+    def _serve(self):
+        while True:
+            batch = self._collect()
+            if batch is None or self.stopping.is_set():
+                return
+            started = time.perf_counter()
+            try:
+                self.func(
+                    self.collate(
+                        [self.samples[idx % len(self.samples)] for idx in batch]
+                    )
+                )
+            except BaseException as e:
+                self.errors.append(e)
+                self.stopping.set()
+                self.done.set()
+                return
+            finished = time.perf_counter()
+            self.started[batch] = started
+            self.finished[batch] = finished
+            with self.lock:
+                self.batch_sizes.append(len(batch))
+                self.remaining -= len(batch)
+                if self.remaining == 0:
+                    self.done.set()
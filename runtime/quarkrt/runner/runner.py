@@ -1,5 +1,6 @@
 import json
 import os
+import time
 from dataclasses import asdict, dataclass, field
 
 import yaml
@@ -9,6 +10,30 @@ from quarkrt.executor import ExecutorBase, ExecutorBuilder
 from quarkrt.timer import *
 from quarkrt.workload import WorkloadBase, WorkloadBuilder
 
+from .load_generator import DynamicBatcher, LoadGenerator
+
+
+def workload_key(config: BenchmarkConfig) -> str:
+    """Identify tasks that can share one constructed workload."""
+    return "{}:{}".format(
+        config.workload.model_dump_json(), config.experiment.run_mode.value
+    )
+
+
+def _format_ms(seconds) -> str:
+    return "-" if seconds is None else f"{seconds * 1e3:.3f}ms"
+
+
+class _BatchData:
+    """Data provider handing one prepared batch to an executor."""
+
+    def __init__(self, inputs, labels):
+        self.inputs = inputs
+        self.labels = labels
+
+    def get_data(self):
+        return self.inputs, self.labels
+
 
 # TODO: clear out unused fields, like timer_type
 @dataclass
@@ -21,12 +46,39 @@ class Runner:
     results: dict = field(default_factory=dict)
     timer: TimerBase = field(default=None)
     logging_path: str = field(default="build/benchmarks/")
+    # Axis values when this task is one grid point of a sweep
+    sweep_point: dict = field(default_factory=dict)
+    # Coordinator metadata stored with the run, e.g. sweep_id and fingerprint
+    run_info: dict = field(default_factory=dict)
+    # Operator table of the optional profiling pass, see ProfilerConfig
+    profile: dict = field(default_factory=dict)
+    # Memory footprint of the timed iterations, see MemoryConfig
+    memory: dict = field(default_factory=dict)
+    # Open-loop latency under load and its saturation knee, see LoadConfig
+    load: dict = field(default_factory=dict)
 
     def __post_init__(self):
         TRACE("Create Benchmark for task {}".format(self.config.label))
-        self.timer = TimerBuilder.build(self.config.experiment.timer)
+        # Wall time includes building the workload, it is what a scheduler waits for
+        self.started = time.perf_counter()
+        self.timer = TimerBuilder.build(
+            self.config.experiment.timer,
+            sampling=self.config.experiment.sampling,
+            device=self.config.experiment.executor.device,
+        )
+        memory = self.config.experiment.memory
+        if memory is not None:
+            self.memory_probe = MemoryProbe(
+                interval=memory.interval,
+                trace_python=memory.tracemalloc,
+                device=self.config.experiment.executor.device,
+            )
+            self.timer.add_probe(self.memory_probe)
         self.executor = ExecutorBuilder.build(self.config)
-        self.workload = WorkloadBuilder.build(self.config)
+        self.timer.add_probe(self.executor.phases)
+        # A prebuilt workload can be handed in to skip model construction
+        if self.workload is None:
+            self.workload = WorkloadBuilder.build(self.config)
         self.data_provider = DataProviderBuilder.build(self.config)
         self.results = {}
         assert self._validate()
@@ -56,10 +108,23 @@ class Runner:
         # self.executor.set_data_provider(self.data_provider)
         TRACE("Start Benchmarking on task {}".format(self.config.label))
 
-        # Initialize timer and run the workload
-
+        # Setup outside the timed calls, then time the steady-state step
+        self.executor.prepare(self.workload, self.data_provider)
         self.timer.run(self.executor.execute, self.workload, self.data_provider)
-        print(self.timer.summary(unit="ms"))
+        summary = self.timer.summary(unit="ms")
+        # The warmup curve and the sketch are for the store, not for the console
+        print({k: v for k, v in summary.items() if k not in ("warmup_times", "sketch")})
+        self._report_setup()
+        self._report_phases()
+
+        if self.config.experiment.memory is not None:
+            self._report_memory()
+
+        if self.config.experiment.load is not None:
+            self._run_load()
+
+        if self.config.experiment.profiler is not None:
+            self._profile()
 
         # Store summary of the benchmark run
         self._store_summary()
@@ -97,14 +162,205 @@ class Runner:
 
         # Create a Summary object
         record = Record(config=self.config, summary=self.timer.summary())
+        # Runs are only comparable when they were placed on the same cores
+        record.summary["placement"] = current_placement()
+        record.summary["wall_time"] = time.perf_counter() - self.started
+        if self.executor.setup:
+            record.summary["execution"] = self.executor.setup
+        phases = self.executor.phases.summary()
+        if phases:
+            record.summary["phases"] = phases
+        if self.memory:
+            record.summary["memory"] = self.memory
+        if self.load:
+            record.summary["load"] = self.load
+        if self.profile:
+            record.summary["profile"] = self.profile
         TRACE(f"Bench Record:\n{record.stringify()}")
 
         self.results.update(record.summary)
+        if self.sweep_point:
+            self.results["sweep_point"] = self.sweep_point
+        self.results["run_id"] = self._append_to_store(record)
         self._save_results()
 
+    def _report_setup(self):
+        """Print what tracing or compiling cost and the drift of the precision."""
+        setup = self.executor.setup
+        if setup.get("compile_time") is not None:
+            print(
+                f"{setup['execution_mode']} of {self.config.label}: "
+                f"compiled in {setup['compile_time']:.3f}s, first call included"
+            )
+        drift = setup.get("drift")
+        if drift:
+            precision = setup["autocast"] or setup["dtype"]
+            print(
+                f"Drift of {precision} from float32 on {self.config.label}: "
+                f"max relative error {drift['max_rel_error']:.2e}"
+                + (
+                    ""
+                    if drift["within_tolerance"]
+                    else f", exceeds tolerance {drift['tolerance']:.0e}"
+                )
+            )
+
+    def _report_phases(self):
+        """Print where the time of an execute call goes, phase by phase."""
+        phases = self.executor.phases.summary(unit="ms")
+        if not phases:
+            return
+        print(
+            f"Phases of {self.config.label} per call: "
+            + ", ".join(
+                f"{name} {stats['median']:.3f}ms ({stats['share']:.0%})"
+                for name, stats in phases.items()
+                if name != "total"
+            )
+            + f", total {phases['total']['median']:.3f}ms"
+        )
+
+    def _report_memory(self):
+        """Keep the memory footprint with the results and print its headline."""
+        self.memory = self.memory_probe.summary()
+        peak = self.memory["peak_rss"] / 2**20
+        line = f"Memory of {self.config.label}: peak RSS {peak:.1f}MiB"
+        if self.memory["peak_rss_scope"] != "task":
+            line += " (process-wide)"
+        growth = self.memory["rss_growth_per_iteration"]
+        if growth is not None:
+            line += f", RSS growth {growth / 1024:+.2f}KiB per iteration"
+        if self.memory["python_peak"] is not None:
+            line += f", Python peak {self.memory['python_peak'] / 2**20:.1f}MiB"
+        heap = self.memory["cpu_allocator"]
+        if heap is not None and heap["growth_per_iteration"] is not None:
+            growth = heap["growth_per_iteration"]
+            line += f", heap growth {growth / 1024:+.2f}KiB per iteration"
+        print(line)
+
+    def _run_load(self):
+        """Sweep the offered load open-loop and locate the saturation knee."""
+        load = self.config.experiment.load
+        # Closed-loop capacity of one worker, the scale of load_fractions
+        capacity = 1.0 / self.timer.median_time()
+        rates = load.rates or [fraction * capacity for fraction in load.load_fractions]
+        trace = load_trace(load.trace_file) if load.trace_file else None
+        if self.config.experiment.batching is not None:
+            generator = self._batcher()
+        else:
+            generator = LoadGenerator(
+                self.executor.execute,
+                self.workload,
+                self.data_provider,
+                workers=load.workers,
+                drain_timeout=load.drain_timeout,
+            )
+
+        print(f"Load sweep of {self.config.label} ({load.arrival.value} arrivals):")
+        levels = []
+        for rate in sorted(rates):
+            arrivals = arrival_times(
+                load.arrival, rate, load.duration, load.burst_size, trace, load.seed
+            )
+            level = generator.run(arrivals, rate, load.duration)
+            levels.append(level)
+            print(
+                f"  offered {rate:>10.1f}/s achieved {level.achieved_rate:>10.1f}/s "
+                f"p50 {_format_ms(level.latency['p50'])} "
+                f"p99 {_format_ms(level.latency['p99'])} dropped {level.dropped}"
+            )
+            if level.batches and level.batches["count"]:
+                print(
+                    f"    {level.batches['count']} batches of mean size "
+                    f"{level.batches['mean_size']:.2f}, "
+                    f"{level.batches['full_fraction']:.0%} full"
+                )
+
+        knee = find_knee(levels, load.throughput_tolerance, load.latency_factor)
+        if knee.rate is None:
+            print(f"  Saturated ({knee.reason}) at {knee.saturated_rate:.1f}/s already")
+        elif knee.saturated_rate is None:
+            print(f"  Not saturated up to {knee.rate:.1f}/s")
+        else:
+            print(
+                f"  Knee at {knee.rate:.1f}/s, saturated ({knee.reason}) "
+                f"at {knee.saturated_rate:.1f}/s"
+            )
+        self.load = {
+            "arrival": load.arrival.value,
+            "workers": load.workers,
+            "batching": (
+                self.config.experiment.batching.model_dump()
+                if self.config.experiment.batching is not None
+                else None
+            ),
+            "capacity": capacity,
+            "levels": [level.to_dict() for level in levels],
+            "knee": asdict(knee),
+        }
+
+    def _batcher(self) -> DynamicBatcher:
+        """Batch single-sample requests drawn from one batch of the data provider."""
+        import torch
+
+        batching = self.config.experiment.batching
+        inputs, labels = self.data_provider.get_data()
+        samples = list(zip(inputs.split(1), labels.split(1)))
+
+        def collate(batch):
+            return _BatchData(
+                torch.cat([sample[0] for sample in batch]),
+                torch.cat([sample[1] for sample in batch]),
+            )
+
+        return DynamicBatcher(
+            lambda data: self.executor.execute(self.workload, data),
+            samples,
+            collate,
+            max_batch_size=batching.max_batch_size,
+            max_wait=batching.max_wait,
+            workers=self.config.experiment.load.workers,
+            drain_timeout=self.config.experiment.load.drain_timeout,
+        )
+
+    def _profile(self):
+        """Profile extra iterations and keep the operator table with the results."""
+        profiler = self.config.experiment.profiler
+        trace_path = None
+        if profiler.export_trace:
+            trace_path = os.path.join(
+                self.logging_path, f"{self.config.label}.trace.json"
+            )
+        self.profile = self.timer.profile(
+            self.executor.execute,
+            self.workload,
+            self.data_provider,
+            iterations=profiler.iterations,
+            top_n=profiler.top_n,
+            record_shapes=profiler.record_shapes,
+            trace_path=trace_path,
+        )
+        print(f"Top operators of {self.config.label} by self CPU time per iteration:")
+        for row in self.profile["operators"]:
+            print(
+                f"  {row['name']:<40} {row['self_cpu_time'] * 1e6:>12.1f}us "
+                f"{row['self_cpu_percent']:>6.1f}% calls={row['calls']:g}"
+            )
+
+    def _append_to_store(self, record: Record) -> str:
+        """Append the run and its raw samples to the results store."""
+        store_path = os.path.join(self.logging_path, ResultsStore.DEFAULT_NAME)
+        with ResultsStore(store_path) as store:
+            return store.append(
+                record,
+                self.timer.times,
+                environment=collect_environment(),
+                run_info=self.run_info,
+            )
+
     def _save_results(self, serializer=None):
         """
-        Save the results to a file in JSON format.
+        Save the results to a file in JSON format, a view of the latest stored run.
         :param serializer: Custom serializer function for non-serializable objects.
         """
         result_file = os.path.join(self.logging_path, f"{self.config.label}.json")
@@ -0,0 +1,112 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from quark_utility import *
+from quarkrt.workload import WorkloadBase
+
+from .runner import Runner, workload_key
+
+
+@dataclass
+class SweepRunner:
+    """
+    Run every grid point of a sweep config in the current process.
+
+    Grid points that share a workload run back to back on the same constructed
+    model, only the executor, data provider and timer are rebuilt per point.
+    """
+
+    config: BenchmarkConfig = field(default=None)
+    # Workload cache, shared with the caller to keep models warm across tasks
+    workloads: Dict[str, WorkloadBase] = field(default_factory=dict)
+    results: dict = field(default_factory=dict)
+    logging_path: str = field(default="build/benchmarks/")
+    run_info: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        TRACE("Create SweepRunner for task {}".format(self.config.label))
+        self.points = self.config.expand()
+        # Stable sort so points sharing a model are adjacent, in grid order otherwise
+        self.points.sort(key=lambda item: workload_key(item[1]))
+
+    def run(self):
+        TRACE(f"Start sweep {self.config.label} over {len(self.points)} grid points")
+        sweep_results = []
+        for idx, (point, point_config) in enumerate(self.points):
+            print(f"Sweep point {idx + 1}/{len(self.points)}: {point_config.label}")
+            key = workload_key(point_config)
+            runner = Runner(
+                point_config,
+                workload=self.workloads.get(key),
+                logging_path=self.logging_path,
+                sweep_point=point,
+                run_info=self.run_info,
+            )
+            self.workloads[key] = runner.workload
+            runner.run()
+            sweep_results.append(
+                {
+                    "label": point_config.label,
+                    "point": point,
+                    "results": runner.get_results(),
+                }
+            )
+
+        self.results = {"sweep": sweep_results}
+        self._save_results()
+
+    def _save_results(self):
+        """Save the per-point results of the whole sweep under the sweep label."""
+        result_file = os.path.join(self.logging_path, f"{self.config.label}.json")
+        print(f"Saving sweep results to file: {result_file}")
+        os.makedirs(os.path.dirname(result_file), exist_ok=True)
+        with open(result_file, "w") as file:
+            json.dump(
+                self.results,
+                file,
+                default=enum_serializer,
+                indent=4,
+                ensure_ascii=False,
+            )
+
+    def get_results(self):
+        return self.results
+
+
+def run_config(
+    config: BenchmarkConfig,
+    workloads: Dict[str, WorkloadBase],
+    run_info: Optional[Dict[str, Any]] = None,
+    logging_path: str = "build/benchmarks/",
+) -> Dict[str, Any]:
+    """
+    Run one task config in-process, reusing and filling the workload cache.
+
+    Returns:
+        Dict[str, Any]: Results of the Runner, or of the SweepRunner for sweeps.
+    """
+    run_info = run_info or {}
+    if config.sweep is not None:
+        runner = SweepRunner(
+            config, workloads=workloads, logging_path=logging_path, run_info=run_info
+        )
+    else:
+        key = workload_key(config)
+        runner = Runner(
+            config,
+            workload=workloads.get(key),
+            logging_path=logging_path,
+            run_info=run_info,
+        )
+        workloads[key] = runner.workload
+    runner.run()
+    return runner.get_results()
+
+
+def result_run_ids(results: Dict[str, Any]) -> List[str]:
+    """Ids of the stored runs behind task results, one per grid point for sweeps."""
+    if "sweep" in results:
+        return [point["results"]["run_id"] for point in results["sweep"]]
+    return [results["run_id"]]
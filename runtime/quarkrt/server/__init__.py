@@ -0,0 +1,2 @@
+from .farm_worker import *
+from .runtime_server import *
@@ -0,0 +1,109 @@
+import os
+import socket
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+from quark_utility import *
+from quarkrt.runner import result_run_ids, run_config
+from quarkrt.workload import WorkloadBase
+
+__all__ = [
+    "FarmWorker",
+]
+
+
+class FarmWorker:
+    """
+    Farm worker that pulls tasks from a FarmServer over TCP and runs them in-process.
+
+    While a task runs, a background thread renews its lease with heartbeats.
+    Results are sent back with every stored run and its raw samples, so the
+    coordinator's results store holds the same runs as the worker's.
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        name: Optional[str] = None,
+        logging_path: str = "build/benchmarks/",
+        timeout: float = 30.0,
+    ):
+        self.client = MessageClient(address, timeout=timeout)
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.logging_path = logging_path
+        self.workloads: Dict[str, WorkloadBase] = {}
+        self.heartbeat_interval = 10.0
+        self.tasks_run = 0
+
+    def _heartbeat(self, task_id: str, stop: threading.Event):
+        while not stop.wait(self.heartbeat_interval):
+            try:
+                response = self.client.request(
+                    "heartbeat", worker=self.name, task_id=task_id
+                )
+            except OSError as e:
+                TRACE(f"Heartbeat for {task_id} failed: {e}")
+                continue
+            if response["status"] == "lost":
+                TRACE(f"Lease of {task_id} expired, its result will be dropped")
+
+    def run_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one farm task and return the result message payload."""
+        config = BenchmarkConfig.model_validate(task["config"])
+        results = run_config(
+            config, self.workloads, task["run_info"], logging_path=self.logging_path
+        )
+
+        store_path = os.path.join(self.logging_path, ResultsStore.DEFAULT_NAME)
+        with ResultsStore(store_path) as store:
+            runs = [store.export_run(run_id) for run_id in result_run_ids(results)]
+        return {"results": results, "runs": runs}
+
+    def serve(self, connect_timeout: float = 60.0):
+        """Pull and run tasks until the coordinator reports the queue done."""
+        if not self.client.wait_ready(timeout=connect_timeout):
+            raise RuntimeError(f"Farm coordinator {self.client.address} is unreachable")
+        response = self.client.request("register", worker=self.name)
+        self.heartbeat_interval = response["heartbeat_interval"]
+        print(f"Farm worker {self.name} joined {self.client.address}")
+
+        while True:
+            try:
+                response = self.client.request("pull", worker=self.name)
+            except OSError:
+                # The coordinator closes its socket once the queue is done
+                print(f"Farm coordinator {self.client.address} went away")
+                return
+            if response["status"] == "done":
+                print(f"Farm worker {self.name} finished after {self.tasks_run} tasks")
+                return
+            if response["status"] == "wait":
+                time.sleep(response["retry_after"])
+                continue
+
+            task = response["task"]
+            print(f"Run farm task {task['label']} (attempt {task['attempt']})")
+            stop = threading.Event()
+            heartbeat = threading.Thread(
+                target=self._heartbeat, args=(task["id"], stop), daemon=True
+            )
+            heartbeat.start()
+            try:
+                result = self.run_task(task)
+                message = {"op": "result", "result": result}
+            except Exception as e:
+                TRACE(traceback.format_exc())
+                message = {"op": "failed", "error": f"{type(e).__name__}: {e}"}
+            finally:
+                stop.set()
+                heartbeat.join()
+
+            self.tasks_run += 1
+            op = message.pop("op")
+            try:
+                self.client.request(op, worker=self.name, task_id=task["id"], **message)
+            except OSError as e:
+                print(f"Farm coordinator {self.client.address} went away: {e}")
+                return
@@ -0,0 +1,92 @@
+import os
+import socketserver
+import traceback
+from typing import Any, Dict, Optional
+
+from quark_utility import *
+from quarkrt.runner import run_config
+from quarkrt.workload import WorkloadBase
+
+__all__ = [
+    "RuntimeServer",
+]
+
+
+class RuntimeRequestHandler(socketserver.StreamRequestHandler):
+    """Answers line-delimited JSON requests until the client hangs up."""
+
+    def handle(self):
+        while True:
+            message = recv_message(self.rfile)
+            if message is None:
+                return
+            send_message(self.wfile, self.server.dispatch(message))
+
+
+class RuntimeServer(socketserver.UnixStreamServer):
+    """
+    Long-lived quark-runtime worker that runs task files in-process.
+
+    Framework imports stay loaded and constructed workloads are cached between
+    tasks, so a task only pays for building its executor, data provider and timer.
+    Requests are served one at a time so concurrent tasks never share cores.
+    """
+
+    def __init__(self, socket_path: str):
+        TRACE(f"Create RuntimeServer on {socket_path}")
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, RuntimeRequestHandler)
+        self.socket_path = socket_path
+        self.workloads: Dict[str, WorkloadBase] = {}
+        self.config_index = ConfigIndex()
+        self.tasks_served = 0
+        self.shutdown_requested = False
+
+    def dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        op = message.get("op")
+        TRACE(f"RuntimeServer received op = {op}")
+        if op == "ping":
+            return {"status": "ok", "pid": os.getpid(), "tasks": self.tasks_served}
+        elif op == "environment":
+            return {"status": "ok", "environment": collect_environment()}
+        elif op == "run":
+            try:
+                results = self.run_task(message["task"], message.get("run_info", {}))
+                return {"status": "ok", "results": results}
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "error": f"{type(e).__name__}: {e}",
+                    "traceback": traceback.format_exc(),
+                }
+        elif op == "shutdown":
+            self.shutdown_requested = True
+            return {"status": "ok"}
+        else:
+            return {"status": "error", "error": f"Unknown op: {op}"}
+
+    def run_task(
+        self, task_file: str, run_info: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        config = self.config_index.get(task_file)
+        if config is None:
+            raise ValueError(
+                f"Invalid task configuration {task_file}: "
+                f"{self.config_index.error(task_file)}"
+            )
+
+        results = run_config(config, self.workloads, run_info)
+        self.tasks_served += 1
+        return results
+
+    def serve(self):
+        """Serve requests until a client asks for shutdown."""
+        print(f"quark-runtime serving on {self.socket_path} (pid {os.getpid()})")
+        try:
+            while not self.shutdown_requested:
+                self.handle_request()
+        finally:
+            self.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
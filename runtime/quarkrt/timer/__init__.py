@@ -1 +1,2 @@
+from .memory_probe import *
 from .timer import *
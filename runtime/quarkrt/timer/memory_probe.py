@@ -0,0 +1,230 @@
+import ctypes
+import sys
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from quark_utility import *
+
+__all__ = [
+    "read_proc_status",
+    "read_malloc_in_use",
+    "MemoryProbe",
+]
+
+_STATUS_PATH = "/proc/self/status"
+_CLEAR_REFS_PATH = "/proc/self/clear_refs"
+
+
+def read_proc_status(
+    keys=("VmRSS", "VmHWM"), path: str = _STATUS_PATH
+) -> Dict[str, int]:
+    """Memory fields of /proc/<pid>/status in bytes, empty where procfs is missing."""
+    values = {}
+    try:
+        with open(path, "r") as file:
+            for line in file:
+                name, _, rest = line.partition(":")
+                if name in keys:
+                    # Reported as "<value> kB"
+                    values[name] = int(rest.split()[0]) * 1024
+    except OSError:
+        return {}
+    return values
+
+
+class _MallInfo2(ctypes.Structure):
+    _fields_ = [
+        (name, ctypes.c_size_t)
+        for name in (
+            "arena",
+            "ordblks",
+            "smblks",
+            "hblks",
+            "hblkhd",
+            "usmblks",
+            "fsmblks",
+            "uordblks",
+            "fordblks",
+            "keepcost",
+        )
+    ]
+
+
+def _load_mallinfo2():
+    try:
+        mallinfo2 = ctypes.CDLL(None).mallinfo2
+    except (AttributeError, OSError):
+        return None
+    mallinfo2.restype = _MallInfo2
+    return mallinfo2
+
+
+_MALLINFO2 = _load_mallinfo2()
+
+
+def read_malloc_in_use() -> Optional[int]:
+    """
+    Bytes allocated from the C heap, None without glibc 2.33's mallinfo2.
+
+    torch exposes no statistics of its CPU allocator, unlike the CUDA one, but
+    c10 allocates CPU tensors with posix_memalign, so they are part of the heap
+    in use next to other native allocations. Chunks served by mmap included.
+    """
+    if _MALLINFO2 is None:
+        return None
+    info = _MALLINFO2()
+    return info.uordblks + info.hblkhd
+
+
+def _reset_peak_rss() -> bool:
+    """Reset VmHWM to the current RSS, supported since Linux 4.0."""
+    try:
+        with open(_CLEAR_REFS_PATH, "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _slope(x: List[float], y: List[float]) -> Optional[float]:
+    """Least-squares slope of y over x, None without two distinct x."""
+    if len(set(x)) < 2:
+        return None
+    return float(np.polyfit(np.asarray(x), np.asarray(y, dtype=np.float64), 1)[0])
+
+
+class MemoryProbe:
+    """
+    Memory footprint of a task, sampled by the timer between timed samples.
+
+    Reads the process RSS every `interval` samples, outside the timed region,
+    and the peak RSS of the task from VmHWM, reset when the task starts where
+    the kernel allows it. Optionally traces Python allocations with
+    tracemalloc, and reads the torch CUDA allocator for GPU tasks. The growth
+    of RSS per iteration over the measured samples makes leaks in executors
+    show up as a trend rather than as one large number. The same trend is fitted
+    on the C heap in use, which holds the CPU tensors of torch, see
+    read_malloc_in_use.
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        trace_python: bool = False,
+        device: Optional[DeviceEnum] = None,
+    ):
+        self.interval = interval
+        self.trace_python = trace_python
+        self.device = device
+        self._reset()
+
+    def _reset(self):
+        self.samples = 0
+        # Calls of the timed function so far, a sample may batch several
+        self.iterations = 0
+        self.measure_from = 0
+        # (iteration, RSS bytes, traced Python bytes or None, heap bytes or None)
+        self.readings: List[tuple] = []
+        self.rss_start = 0
+        self.rss_end = 0
+        self.heap_start: Optional[int] = None
+        self.peak_rss = 0
+        self.peak_scope = "process"
+        self.python_peak: Optional[int] = None
+        self.torch_stats: Optional[Dict[str, int]] = None
+        self._started_tracemalloc = False
+
+    def _torch_cuda(self):
+        # Only consult torch when the task already imported it
+        torch = sys.modules.get("torch")
+        if torch is None or self.device != DeviceEnum.GPU:
+            return None
+        return torch.cuda if torch.cuda.is_available() else None
+
+    def start(self):
+        """Reset the peaks, called once before the first warmup sample."""
+        self._reset()
+        if _reset_peak_rss():
+            self.peak_scope = "task"
+        if self.trace_python:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+        cuda = self._torch_cuda()
+        if cuda is not None:
+            cuda.reset_peak_memory_stats()
+        self.rss_start = read_proc_status().get("VmRSS", 0)
+        self.heap_start = read_malloc_in_use()
+
+    def start_measurement(self):
+        """Mark the end of warmup, the trend is fitted on measured samples only."""
+        self.measure_from = self.iterations
+
+    def sample(self, calls: int = 1):
+        """Account one timed sample of `calls` calls, reading memory every interval."""
+        self.samples += 1
+        self.iterations += calls
+        if self.samples % self.interval:
+            return
+        rss = read_proc_status().get("VmRSS", 0)
+        python = tracemalloc.get_traced_memory()[0] if self.trace_python else None
+        self.readings.append((self.iterations, rss, python, read_malloc_in_use()))
+
+    def stop(self):
+        """Read the peaks, called once after the last sample."""
+        status = read_proc_status()
+        self.rss_end = status.get("VmRSS", 0)
+        self.peak_rss = status.get("VmHWM", 0)
+        if self.trace_python:
+            self.python_peak = tracemalloc.get_traced_memory()[1]
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+        cuda = self._torch_cuda()
+        if cuda is not None:
+            self.torch_stats = {
+                "allocated": cuda.memory_allocated(),
+                "peak_allocated": cuda.max_memory_allocated(),
+                "reserved": cuda.memory_reserved(),
+                "peak_reserved": cuda.max_memory_reserved(),
+            }
+
+    def summary(self) -> Dict[str, Any]:
+        """Memory of the task in bytes, growth rates in bytes per iteration."""
+        measured = [r for r in self.readings if r[0] > self.measure_from]
+        iterations = [r[0] for r in measured]
+        rss = [r[1] for r in measured]
+        summary = {
+            "peak_rss": self.peak_rss,
+            # "process" when VmHWM could not be reset and covers earlier tasks too
+            "peak_rss_scope": self.peak_scope,
+            "rss_start": self.rss_start,
+            "rss_end": self.rss_end,
+            "rss_growth": rss[-1] - rss[0] if rss else None,
+            "rss_growth_per_iteration": _slope(iterations, rss),
+            "interval": self.interval,
+            "iterations": [r[0] for r in self.readings],
+            "rss": [r[1] for r in self.readings],
+            "rss_deltas": [int(d) for d in np.diff([r[1] for r in self.readings])],
+            "python_peak": self.python_peak,
+            "python_growth_per_iteration": None,
+            "torch": self.torch_stats,
+            "cpu_allocator": None,
+        }
+        if self.heap_start is not None:
+            heap = [r[3] for r in self.readings]
+            summary["cpu_allocator"] = {
+                "source": "mallinfo2",
+                "in_use_start": self.heap_start,
+                # Largest reading, allocations freed in between are not seen
+                "peak_in_use": max(heap, default=self.heap_start),
+                "growth_per_iteration": _slope(iterations, [r[3] for r in measured]),
+                "in_use": heap,
+            }
+        if self.trace_python:
+            python = [r[2] for r in measured]
+            summary["python_growth_per_iteration"] = _slope(iterations, python)
+            summary["python"] = [r[2] for r in self.readings]
+        return summary
@@ -0,0 +1,218 @@
+import ctypes
+import errno
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from quark_utility import *
+
+from .timer import PyTimer
+
+__all__ = [
+    "PERF_COUNTERS",
+    "PerfTimer",
+]
+
+_PERF_TYPE_HARDWARE = 0
+_PERF_TYPE_SOFTWARE = 1
+
+# name: (type, config) of the counters read around each sample
+PERF_COUNTERS: Dict[str, Tuple[int, int]] = {
+    "cycles": (_PERF_TYPE_HARDWARE, 0),
+    "instructions": (_PERF_TYPE_HARDWARE, 1),
+    # PERF_COUNT_HW_CACHE_MISSES counts last level cache misses
+    "llc_misses": (_PERF_TYPE_HARDWARE, 3),
+    "branch_misses": (_PERF_TYPE_HARDWARE, 5),
+    "context_switches": (_PERF_TYPE_SOFTWARE, 3),
+}
+
+_PERF_EVENT_OPEN_SYSCALL = {"x86_64": 298, "aarch64": 241}
+_PERF_FLAG_FD_CLOEXEC = 1 << 3
+# read() returns value, time_enabled and time_running
+_PERF_FORMAT_TOTAL_TIME_ENABLED = 1 << 0
+_PERF_FORMAT_TOTAL_TIME_RUNNING = 1 << 1
+_READ_FORMAT = struct.Struct("=QQQ")
+# Bits of the perf_event_attr flags word
+_ATTR_EXCLUDE_KERNEL = 1 << 5
+_ATTR_EXCLUDE_HV = 1 << 6
+
+
+class _PerfEventAttr(ctypes.Structure):
+    # PERF_ATTR_SIZE_VER0 layout, accepted by every kernel with perf events
+    _fields_ = [
+        ("type", ctypes.c_uint32),
+        ("size", ctypes.c_uint32),
+        ("config", ctypes.c_uint64),
+        ("sample_period", ctypes.c_uint64),
+        ("sample_type", ctypes.c_uint64),
+        ("read_format", ctypes.c_uint64),
+        ("flags", ctypes.c_uint64),
+        ("wakeup_events", ctypes.c_uint32),
+        ("bp_type", ctypes.c_uint32),
+        ("config1", ctypes.c_uint64),
+    ]
+
+
+def _perf_event_open(
+    event_type: int, config: int, tid: int, exclude_kernel: bool = False
+) -> int:
+    """Open a counter on thread `tid`, raises OSError on failure."""
+    machine = os.uname().machine
+    number = _PERF_EVENT_OPEN_SYSCALL.get(machine)
+    if number is None:
+        raise OSError(errno.ENOSYS, f"perf_event_open is unknown on {machine}")
+    attr = _PerfEventAttr()
+    attr.type = event_type
+    attr.size = ctypes.sizeof(_PerfEventAttr)
+    attr.config = config
+    attr.read_format = _PERF_FORMAT_TOTAL_TIME_ENABLED | _PERF_FORMAT_TOTAL_TIME_RUNNING
+    attr.flags = _ATTR_EXCLUDE_HV
+    if exclude_kernel:
+        attr.flags |= _ATTR_EXCLUDE_KERNEL
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    fd = libc.syscall(
+        number, ctypes.byref(attr), tid, -1, -1, ctypes.c_ulong(_PERF_FLAG_FD_CLOEXEC)
+    )
+    if fd < 0:
+        code = ctypes.get_errno()
+        raise OSError(code, os.strerror(code))
+    return fd
+
+
+def _paranoid_level() -> Optional[str]:
+    try:
+        with open("/proc/sys/kernel/perf_event_paranoid", "r") as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+class PerfTimer(PyTimer):
+    """
+    Wall-clock timer that also reads Linux perf counters around every sample.
+
+    Counters are opened per thread of the process when measurement starts, so
+    the intra-op threads of the framework are counted too. They count kernel
+    and user space, or user space only where perf_event_paranoid forbids
+    kernel profiling. Counts are scaled when the kernel multiplexes counters
+    and reported per call. Counters the kernel refuses are left out with a
+    message, and the timer keeps measuring wall time when none is available.
+    """
+
+    def __init__(self, repeat_samples=10, warmup_samples=2):
+        super().__init__(repeat_samples, warmup_samples)
+        # name -> [fd per thread]
+        self.fds: Dict[str, List[int]] = {}
+        self.unavailable: Dict[str, str] = {}
+        # name -> "all" or "user", what the counter was allowed to count
+        self.scopes: Dict[str, str] = {}
+        self.counters: Dict[str, StreamingStats] = {}
+        self._start_counts: Dict[str, Tuple[float, ...]] = {}
+
+    def _open_counter(self, name: str, tids: List[int]):
+        event_type, config = PERF_COUNTERS[name]
+        for scope in ("all", "user"):
+            fds = []
+            try:
+                for tid in tids:
+                    try:
+                        fds.append(
+                            _perf_event_open(
+                                event_type, config, tid, exclude_kernel=scope == "user"
+                            )
+                        )
+                    except ProcessLookupError:
+                        # The thread exited since the listing
+                        continue
+            except OSError as e:
+                for fd in fds:
+                    os.close(fd)
+                if e.errno in (errno.EACCES, errno.EPERM) and scope == "all":
+                    continue
+                if e.errno == errno.ENOENT:
+                    # No PMU for this event, typical of virtual machines
+                    self.unavailable[name] = "not supported by this CPU"
+                else:
+                    self.unavailable[name] = e.strerror or str(e)
+                return
+            self.fds[name] = fds
+            self.scopes[name] = scope
+            return
+
+    def _start_measurement(self):
+        self.close()
+        self.unavailable = {}
+        self.scopes = {}
+        tids = [int(tid) for tid in os.listdir("/proc/self/task")]
+        for name in PERF_COUNTERS:
+            self._open_counter(name, tids)
+        self.counters = {name: StreamingStats() for name in self.fds}
+
+        if not self.fds:
+            reasons = sorted(set(self.unavailable.values()))
+            print(
+                "Perf counters are unavailable ({}), kernel.perf_event_paranoid={}; "
+                "PerfTimer measures wall time only".format(
+                    ", ".join(reasons), _paranoid_level()
+                )
+            )
+        elif self.unavailable:
+            print(f"Perf counters unavailable: {self.unavailable}")
+        TRACE(f"Perf counters open on {len(tids)} threads: {sorted(self.fds)}")
+
+    def _read(self, name: str) -> Tuple[float, float, float]:
+        value = enabled = running = 0
+        for fd in self.fds[name]:
+            v, e, r = _READ_FORMAT.unpack(os.read(fd, _READ_FORMAT.size))
+            value, enabled, running = value + v, enabled + e, running + r
+        return value, enabled, running
+
+    def start(self):
+        if self.fds:
+            self._start_counts = {name: self._read(name) for name in self.fds}
+        super().start()
+
+    def stop(self):
+        super().stop()
+        if not self._start_counts:
+            return
+        for name, (value, enabled, running) in self._start_counts.items():
+            end_value, end_enabled, end_running = self._read(name)
+            delta = end_value - value
+            ran = end_running - running
+            if ran > 0 and ran < end_enabled - enabled:
+                # Multiplexed counter, scale to the time it was enabled
+                delta = delta * (end_enabled - enabled) / ran
+            self.counters[name].add(delta / self.inner_loops)
+        self._start_counts = {}
+
+    def close(self):
+        for fds in self.fds.values():
+            for fd in fds:
+                os.close(fd)
+        self.fds = {}
+
+    def __del__(self):
+        self.close()
+
+    def summary(self, unit="sec"):
+        summary = super().summary(unit)
+        counters = {
+            name: {
+                "mean": stats.mean,
+                "median": stats.quantile(0.5),
+                "min": stats.min,
+                "max": stats.max,
+            }
+            for name, stats in self.counters.items()
+            if stats.count
+        }
+        cycles = self.counters.get("cycles")
+        instructions = self.counters.get("instructions")
+        if cycles and instructions and cycles.count and cycles.mean > 0:
+            counters["ipc"] = instructions.mean / cycles.mean
+        summary["counters"] = counters
+        summary["counter_scopes"] = self.scopes
+        summary["unavailable_counters"] = self.unavailable
+        return summary
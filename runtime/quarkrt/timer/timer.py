@@ -1,5 +1,7 @@
+import time
 import timeit
 from enum import Enum
+from typing import Optional
 
 import numpy as np
 from quark_utility import *
@@ -9,34 +11,81 @@ from .timer_base import TimerBase
 
 # default version of timer for benchmark, use it if not use specific ones
 class PyTimer(TimerBase):
-    """Python's timer using timeit.default_timer() with statistics."""
+    """Python's timer using time.perf_counter_ns() with statistics."""
 
-    def observe(self) -> float:
-        return timeit.default_timer()
+    tick = 1e-9
+
+    def observe(self) -> int:
+        # Integer nanoseconds, the difference of two readings loses no precision
+        return time.perf_counter_ns()
 
 
 class TimerBuilder:
     """Builds a Timer instance based on a TimerEnum enum, with a default to PyTimer."""
 
-    # TODO: make config determine repeats and warmups
     @staticmethod
-    def build(timer_type: TimerEnum, repeat_samples=33, warmup_samples=5) -> TimerBase:
+    def build(
+        timer_type: TimerEnum,
+        repeat_samples=33,
+        warmup_samples=5,
+        sampling: Optional[SamplingConfig] = None,
+        device: Optional[DeviceEnum] = None,
+    ) -> TimerBase:
         """Creates a Timer based on the TimerEnum enum.
 
         Args:
             timer_type (TimerEnum): The TimerEnum enum to specify which Timer to create.
             repeat_samples (int): Number of repeat samples for timing.
             warmup_samples (int): Number of warmup runs before timing.
+            sampling (SamplingConfig): Sampling of the task, overrides the counts above.
+            device (DeviceEnum): Device the task runs on, the torch timer times
+                CPU tasks by wall clock instead of CUDA events.
 
         Returns:
             TimerBase: An instance of a Timer subclass.
         """
+        if sampling is not None:
+            repeat_samples = sampling.repeat_samples
+            warmup_samples = sampling.warmup_samples
+        timer = TimerBuilder._build(timer_type, repeat_samples, warmup_samples, device)
+        if sampling is not None:
+            # Coverage of the intervals in the summary, adaptive or not
+            timer.confidence = sampling.confidence
+        if sampling is not None and sampling.target_precision:
+            timer.set_adaptive(
+                sampling.target_precision,
+                confidence=sampling.confidence,
+                min_samples=sampling.min_samples,
+                max_samples=sampling.max_samples,
+                max_time=sampling.max_time,
+            )
+        if sampling is not None and sampling.autorange:
+            timer.set_autorange(min_sample_time=sampling.min_sample_time)
+        if sampling is not None and sampling.streaming:
+            timer.set_streaming(reservoir_size=sampling.reservoir_size)
+        if sampling is not None and sampling.auto_warmup:
+            timer.set_auto_warmup(
+                window=sampling.warmup_window,
+                tolerance=sampling.warmup_tolerance,
+                max_samples=sampling.max_warmup_samples,
+                max_time=sampling.max_warmup_time,
+            )
+        return timer
+
+    @staticmethod
+    def _build(
+        timer_type: TimerEnum, repeat_samples, warmup_samples, device=None
+    ) -> TimerBase:
         if timer_type == TimerEnum.PYTHON:
             return PyTimer(repeat_samples, warmup_samples)
         elif timer_type == TimerEnum.TORCH:
             from .torch_timer import PyTorchTimer
 
-            return PyTorchTimer(repeat_samples, warmup_samples)
+            return PyTorchTimer(repeat_samples, warmup_samples, device=device)
+        elif timer_type == TimerEnum.PERF:
+            from .perf_timer import PerfTimer
+
+            return PerfTimer(repeat_samples, warmup_samples)
         elif timer_type == TimerEnum.TENSORFLOW:
             return TensorFlowTimer(repeat_samples, warmup_samples)
         elif timer_type == TimerEnum.IREE:
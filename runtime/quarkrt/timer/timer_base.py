@@ -1,3 +1,5 @@
+import math
+import time
 import timeit
 from enum import Enum
 
@@ -5,9 +7,18 @@ import numpy as np
 from quark_utility import *
 
 
+def _noop(*args, **kwargs):
+    pass
+
+
 class TimerBase:
     """Base class for Timer implementations with statistical features."""
 
+    # Seconds per unit of the values returned by observe()
+    tick = 1.0
+    # Upper bound of the inner loop count picked by autorange
+    MAX_INNER_LOOPS = 10_000_000
+
     def __init__(self, repeat_samples=10, warmup_samples=2):
         TRACE("Create Timer")
         self.repeat_samples = repeat_samples
@@ -15,6 +26,34 @@ class TimerBase:
         self.times = []
         self.start_time = 0.0
         self.end_time = 0.0
+        # Adaptive sampling is off while target_precision is 0, see set_adaptive
+        self.target_precision = 0.0
+        self.confidence = 0.95
+        self.min_samples = 10
+        self.max_samples = 10000
+        self.time_limit = 60.0
+        self.stop_reason = "repeat_samples"
+        # Automatic warmup is off until set_auto_warmup, warmup_samples applies
+        self.auto_warmup = False
+        self.warmup_window = 5
+        self.warmup_tolerance = 0.02
+        self.max_warmup_samples = 200
+        self.warmup_time_limit = 60.0
+        # Latency of every warmup iteration, the cold-start curve of the task
+        self.warmup_times = []
+        self.warmup_reason = "warmup_samples"
+        # Streaming keeps memory constant for soak runs, see set_streaming
+        self.streaming = False
+        self.reservoir_size = 10000
+        self.stats = StreamingStats()
+        self._recording_stream = False
+        self.last_elapsed = 0.0
+        # Calls per timed sample and the per-call overhead subtracted, see set_autorange
+        self.inner_loops = 1
+        self.autorange_target = 0.0
+        self.overhead = 0.0
+        # Read between samples, outside the timed region, e.g. a MemoryProbe
+        self.probes = []
         self._validate()
 
     def _validate(self) -> bool:
@@ -32,25 +71,241 @@ class TimerBase:
 
     def stop(self):
         self.end_time = self.observe()
-        elapsed = self.end_time - self.start_time
-        self.times.append(elapsed)
+        elapsed = (self.end_time - self.start_time) * self.tick
+        self.record(elapsed)
+
+    def record(self, elapsed: float):
+        """Account one sample, timers with their own stop() must call this."""
+        # A sample times a batch of inner_loops calls, it is reported per call
+        elapsed = elapsed / self.inner_loops - self.overhead
+        if self.overhead:
+            # Noise can push a call below the calibrated overhead
+            elapsed = max(elapsed, 0.0)
+        self.last_elapsed = elapsed
+        if self._recording_stream:
+            self.stats.add(elapsed)
+        else:
+            self.times.append(elapsed)
 
     def elapsed_time(self) -> float:
-        return self.times[-1] if self.times else 0.0
+        return self.last_elapsed
+
+    def sample_count(self) -> int:
+        return self.stats.count if self.streaming else len(self.times)
+
+    def set_autorange(self, min_sample_time: float = 0.001):
+        """
+        Time batches of calls lasting at least `min_sample_time` instead of single calls.
+
+        Like timeit.Timer.autorange, the inner loop count grows 1, 2, 5, 10, ...
+        until one batch takes long enough. The overhead of the same loop around
+        an empty function is then measured and subtracted from every call, so
+        the timer and Python call overhead do not dominate cheap operators.
+        """
+        self.autorange_target = min_sample_time
+
+    def _sample(self, func, *args, **kwargs):
+        """Take one timed sample of inner_loops calls."""
+        loops = self.inner_loops
+        self.start()
+        if loops == 1:
+            func(*args, **kwargs)
+        else:
+            for _ in range(loops):
+                func(*args, **kwargs)
+        self.stop()
+        if func is not _noop:
+            for probe in self.probes:
+                probe.sample(loops)
+
+    def _calibrate(self, func, *args, **kwargs):
+        """Pick inner_loops for the autorange target and measure the loop overhead."""
+        self.overhead = 0.0
+        self.times = []
+        for loops in self._loop_counts():
+            self.inner_loops = loops
+            self._sample(func, *args, **kwargs)
+            if self.times[-1] * loops >= self.autorange_target:
+                break
+
+        self.times = []
+        for _ in range(5):
+            self._sample(_noop, *args, **kwargs)
+        self.overhead = float(np.median(self.times))
+        self.times = []
+        TRACE(
+            f"Autorange picked {self.inner_loops} calls per sample, "
+            f"overhead {self.overhead * 1e9:.1f}ns per call"
+        )
+
+    def _loop_counts(self):
+        base = 1
+        while base <= self.MAX_INNER_LOOPS:
+            for step in (1, 2, 5):
+                if base * step > self.MAX_INNER_LOOPS:
+                    return
+                yield base * step
+            base *= 10
+
+    def add_probe(self, probe):
+        """
+        Read `probe` along the run, see MemoryProbe.
+
+        A probe provides start() and stop() around the run, start_measurement()
+        once warmup is over and sample(calls) after every timed sample.
+        """
+        self.probes.append(probe)
+
+    def set_streaming(self, reservoir_size: int = 10000):
+        """
+        Accumulate samples in a StreamingStats instead of keeping each of them.
+
+        Statistics come from the accumulator, quantiles within 0.1%. `times`
+        holds a uniform sample of at most `reservoir_size` raw values, which is
+        what gets stored with the run.
+        """
+        self.streaming = True
+        self.reservoir_size = reservoir_size
+
+    def set_adaptive(
+        self,
+        target_precision: float,
+        confidence: float = 0.95,
+        min_samples: int = 10,
+        max_samples: int = 10000,
+        max_time: float = 60.0,
+    ):
+        """
+        Sample until the median is known to `target_precision` instead of a fixed count.
+
+        Args:
+            target_precision (float): Relative half-width of the median's confidence
+                interval to reach, e.g. 0.01 for +-1%.
+            confidence (float): Coverage of the confidence interval.
+            min_samples (int): Samples taken before the precision is first checked.
+            max_samples (int): Stop once this many samples were taken.
+            max_time (float): Stop once sampling took this many seconds.
+        """
+        self.target_precision = target_precision
+        self.confidence = confidence
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.time_limit = max_time
+
+    def set_auto_warmup(
+        self,
+        window: int = 5,
+        tolerance: float = 0.02,
+        max_samples: int = 200,
+        max_time: float = 60.0,
+    ):
+        """
+        Warm up until the latency is steady instead of for a fixed count.
+
+        Args:
+            window (int): Iterations per window, the last two windows are compared.
+            tolerance (float): Relative shift of the window medians still deemed steady.
+            max_samples (int): Stop warming up after this many iterations.
+            max_time (float): Stop warming up after this many seconds.
+        """
+        self.auto_warmup = True
+        self.warmup_window = window
+        self.warmup_tolerance = tolerance
+        self.max_warmup_samples = max_samples
+        self.warmup_time_limit = max_time
 
     def run(self, func, *args, **kwargs):
         """Run a function with the specified number of warmups and repeats, recording time."""
-        # Warm-up phase
-        for _ in range(self.warmup_samples):
-            func(*args, **kwargs)
+        # Warm-up phase, timed call by call so the cold-start curve is kept
+        self.inner_loops = 1
+        self.overhead = 0.0
+        self.times = []
+        for probe in self.probes:
+            probe.start()
+        if self.auto_warmup:
+            self._warmup_until_steady(func, *args, **kwargs)
+        else:
+            for _ in range(self.warmup_samples):
+                self._sample(func, *args, **kwargs)
+            self.warmup_reason = "warmup_samples"
+        self.warmup_times = self.times
+
+        if self.autorange_target:
+            self._calibrate(func, *args, **kwargs)
+        self._start_measurement()
+        for probe in self.probes:
+            probe.start_measurement()
 
         # Repeat phase
         self.times = []
-        for _ in range(self.repeat_samples):
-            self.start()
-            func(*args, **kwargs)
-            self.stop()
-        return self
+        if self.streaming:
+            self.stats = StreamingStats(reservoir_size=self.reservoir_size)
+            self.times = self.stats.reservoir
+        self._recording_stream = self.streaming
+        try:
+            if self.target_precision:
+                self._run_adaptive(func, *args, **kwargs)
+                return self
+
+            for _ in range(self.repeat_samples):
+                self._sample(func, *args, **kwargs)
+            self.stop_reason = "repeat_samples"
+            return self
+        finally:
+            self._recording_stream = False
+            for probe in self.probes:
+                probe.stop()
+
+    def profile(self, func, *args, **kwargs):
+        """Profile extra calls of `func` operator by operator, see PyTorchTimer."""
+        raise NotImplementedError(f"{type(self).__name__} cannot profile operators")
+
+    def _start_measurement(self):
+        """Hook called once warmup and calibration are done, before the first sample."""
+        pass
+
+    def _warmup_until_steady(self, func, *args, **kwargs):
+        deadline = time.perf_counter() + self.warmup_time_limit
+        while True:
+            self._sample(func, *args, **kwargs)
+
+            if is_steady(self.times, self.warmup_window, self.warmup_tolerance):
+                self.warmup_reason = "steady"
+                break
+            if len(self.times) >= self.max_warmup_samples:
+                self.warmup_reason = "max_warmup_samples"
+                break
+            if time.perf_counter() >= deadline:
+                self.warmup_reason = "max_warmup_time"
+                break
+        TRACE(
+            f"Warmup stopped by {self.warmup_reason} after {len(self.times)} iterations"
+        )
+
+    def _run_adaptive(self, func, *args, **kwargs):
+        deadline = time.perf_counter() + self.time_limit
+        next_check = self.min_samples
+        while True:
+            self._sample(func, *args, **kwargs)
+
+            count = self.sample_count()
+            # Sorting for the precision check is skipped between checkpoints,
+            # which grow by 10% so fast operators are not slowed down by it
+            if count >= next_check:
+                if self.precision() <= self.target_precision:
+                    self.stop_reason = "target_precision"
+                    break
+                next_check = count + max(1, count // 10)
+            if count >= self.max_samples:
+                self.stop_reason = "max_samples"
+                break
+            if time.perf_counter() >= deadline:
+                self.stop_reason = "max_time"
+                break
+        TRACE(
+            f"Adaptive sampling stopped by {self.stop_reason} after {self.sample_count()} "
+            f"samples at precision {self.precision():.4f}"
+        )
 
     def convert_unit(self, time, unit):
         """Convert time to the specified unit."""
@@ -64,42 +319,119 @@ class TimerBase:
             raise ValueError("Unsupported unit. Use 'sec', 'ms', or 'us'.")
 
     def mean_time(self, unit="sec"):
+        if self.streaming:
+            return self.convert_unit(self.stats.mean, unit)
         return self.convert_unit(np.mean(self.times), unit)
 
     def median_time(self, unit="sec"):
-        return self.convert_unit(np.median(self.times), unit)
+        return self.percentile(50, unit)
 
     def min_time(self, unit="sec"):
+        if self.streaming:
+            return self.convert_unit(self.stats.min, unit)
         return self.convert_unit(np.min(self.times), unit)
 
     def max_time(self, unit="sec"):
+        if self.streaming:
+            return self.convert_unit(self.stats.max, unit)
         return self.convert_unit(np.max(self.times), unit)
 
     def std_dev(self, unit="sec"):
+        if self.streaming:
+            return self.convert_unit(self.stats.std, unit)
         return self.convert_unit(np.std(self.times, ddof=1), unit)
 
-    def confidence_interval(self, confidence=0.95, unit="sec"):
-        """Calculate the confidence interval of the recorded times."""
-        n = len(self.times)
-        if n < 2:
-            return (
-                self.convert_unit(self.mean_time(unit), unit),
-                self.convert_unit(self.mean_time(unit), unit),
-            )
+    def percentile(self, q, unit="sec"):
+        if self.streaming:
+            return self.convert_unit(self.stats.quantile(q / 100.0), unit)
+        return self.convert_unit(np.percentile(self.times, q), unit)
 
+    def confidence_interval(self, confidence=0.95, unit="sec"):
+        """Student-t confidence interval of the mean recorded time."""
+        n = self.sample_count()
         mean = self.mean_time(unit)
+        if n < 2:
+            return (mean, mean)
         std_err = self.std_dev(unit) / np.sqrt(n)
-        h = std_err * 1.96  # For 95% confidence level
+        h = std_err * t_quantile(0.5 + confidence / 2.0, n - 1)
         return (mean - h, mean + h)
 
+    def robust_stats(self, confidence=0.95, unit="sec", resamples=1000):
+        """
+        Outlier-resistant statistics of the recorded times.
+
+        Reports the bootstrap confidence interval of the median, the median
+        absolute deviation, the 10% trimmed mean and the IQR outlier counts.
+        When streaming they are estimated from the reservoir in `times`, and
+        are None without samples.
+        """
+        values = np.asarray(self.times, dtype=np.float64)
+        if len(values) == 0:
+            return {
+                "bootstrap_ci": None,
+                "mad": None,
+                "trimmed_mean": None,
+                "outliers": None,
+            }
+        low, high = bootstrap_ci(values, np.median, confidence, resamples)
+        outliers = classify_outliers(values)
+        return {
+            "bootstrap_ci": (
+                self.convert_unit(low, unit),
+                self.convert_unit(high, unit),
+            ),
+            "mad": self.convert_unit(median_abs_deviation(values), unit),
+            "trimmed_mean": self.convert_unit(trimmed_mean(values, 0.1), unit),
+            "outliers": {
+                "low_severe": outliers.low_severe,
+                "low_mild": outliers.low_mild,
+                "high_mild": outliers.high_mild,
+                "high_severe": outliers.high_severe,
+                "fraction": outliers.total / len(values),
+            },
+        }
+
+    def precision(self) -> float:
+        """Relative half-width of the median's confidence interval, inf below 2 samples."""
+        if not self.streaming:
+            return relative_half_width(self.times, self.confidence)
+        median = self.stats.quantile(0.5) if self.stats.count else 0.0
+        if self.stats.count < 2 or median == 0:
+            return math.inf
+        low, high = self.stats.median_ci(self.confidence)
+        return (high - low) / 2.0 / abs(median)
+
     def summary(self, unit="sec"):
         """Generate a summary of the run statistics."""
-        return {
+        precision = self.precision()
+        summary = {
             "mean_time": self.mean_time(unit),
             "median_time": self.median_time(unit),
             "min_time": self.min_time(unit),
             "max_time": self.max_time(unit),
             "std_dev": self.std_dev(unit),
-            "confidence_interval": self.confidence_interval(unit),
-            "samples": len(self.times),
+            "confidence": self.confidence,
+            "confidence_interval": self.confidence_interval(self.confidence, unit),
+            **self.robust_stats(self.confidence, unit),
+            "samples": self.sample_count(),
+            "percentiles": {
+                f"p{q:g}": self.percentile(q, unit) for q in (50, 90, 99, 99.9)
+            },
+            "precision": precision if math.isfinite(precision) else None,
+            "target_precision": self.target_precision or None,
+            "stop_reason": self.stop_reason,
+            "inner_loops": self.inner_loops,
+            "overhead": (
+                self.convert_unit(self.overhead, unit)
+                if self.autorange_target
+                else None
+            ),
+            "warmup_samples": len(self.warmup_times),
+            "warmup_reason": self.warmup_reason,
+            "warmup_time": self.convert_unit(float(np.sum(self.warmup_times)), unit),
+            "warmup_times": [self.convert_unit(t, unit) for t in self.warmup_times],
         }
+        if self.streaming:
+            # Mergeable across workers with StreamingStats.from_dict, in seconds
+            summary["sketch"] = self.stats.to_dict()
+        return summary
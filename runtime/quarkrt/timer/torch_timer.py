@@ -1,27 +1,109 @@
+import os
+import time
+from typing import Any, Dict, Optional
+
 import torch
+from quark_utility import *
 
 from .timer_base import TimerBase
 
 
 class PyTorchTimer(TimerBase):
-    """Timer using PyTorch's cuda event-based timing, suitable for GPU operations."""
+    """
+    Timer for PyTorch workloads on GPU or CPU.
+
+    On GPU, samples are measured between CUDA events and synchronised. On CPU,
+    or when CUDA is unavailable, torch ops run synchronously and samples are
+    wall time from time.perf_counter_ns.
+    """
 
-    def __init__(self, repeat_samples=10, warmup_samples=2):
+    tick = 1e-9
+
+    def __init__(
+        self, repeat_samples=10, warmup_samples=2, device: Optional[DeviceEnum] = None
+    ):
         super().__init__(repeat_samples, warmup_samples)
-        self.start_event = torch.cuda.Event(enable_timing=True)
-        self.end_event = torch.cuda.Event(enable_timing=True)
+        self.use_cuda = device != DeviceEnum.CPU and torch.cuda.is_available()
+        if self.use_cuda:
+            self.start_event = torch.cuda.Event(enable_timing=True)
+            self.end_event = torch.cuda.Event(enable_timing=True)
 
     def start(self):
+        if not self.use_cuda:
+            return super().start()
         self.start_event.record()
 
     def stop(self):
+        if not self.use_cuda:
+            return super().stop()
         self.end_event.record()
         torch.cuda.synchronize()  # Ensures events are complete
         elapsed = (
             self.start_event.elapsed_time(self.end_event) / 1000
         )  # Convert to seconds
-        self.times.append(elapsed)
+        self.record(elapsed)
+
+    def observe(self) -> int:
+        """Wall clock of the CPU path, CUDA events replace it on GPU."""
+        return time.perf_counter_ns()
+
+    def profile(
+        self,
+        func,
+        *args,
+        iterations: int = 5,
+        top_n: int = 20,
+        record_shapes: bool = False,
+        trace_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run `iterations` extra calls under torch.profiler and rank the ATen operators.
+
+        Args:
+            func: The timed function, called with `args`.
+            iterations (int): Calls to profile, after and apart from the timed ones.
+            top_n (int): Number of operators kept, by self CPU time.
+            record_shapes (bool): Record input shapes in the trace.
+            trace_path (str): Where to export a Chrome trace, None to skip it.
+
+        Returns:
+            Dict with the per-iteration operator table, times in seconds.
+        """
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if self.use_cuda:
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+        with torch.profiler.profile(
+            activities=activities, record_shapes=record_shapes
+        ) as profiler:
+            for _ in range(iterations):
+                func(*args)
+            if self.use_cuda:
+                torch.cuda.synchronize()
+
+        events = [
+            event for event in profiler.key_averages() if event.key.startswith("aten::")
+        ]
+        events.sort(key=lambda event: event.self_cpu_time_total, reverse=True)
+        total = sum(event.self_cpu_time_total for event in events) or 1.0
+        operators = []
+        for event in events[:top_n]:
+            # The profiler reports microseconds summed over all iterations
+            row = {
+                "name": event.key,
+                "calls": event.count / iterations,
+                "self_cpu_time": event.self_cpu_time_total * 1e-6 / iterations,
+                "cpu_time": event.cpu_time_total * 1e-6 / iterations,
+                "self_cpu_percent": 100.0 * event.self_cpu_time_total / total,
+            }
+            if self.use_cuda:
+                device_time = getattr(event, "self_device_time_total", None)
+                if device_time is None:
+                    device_time = event.self_cuda_time_total
+                row["self_device_time"] = device_time * 1e-6 / iterations
+            operators.append(row)
 
-    def observe(self) -> float:
-        """In PyTorchTimer, observe is not used directly, as start/stop are overridden."""
-        return 0.0  # Placeholder, not used in this class
+        if trace_path:
+            os.makedirs(os.path.dirname(trace_path) or ".", exist_ok=True)
+            profiler.export_chrome_trace(trace_path)
+            TRACE(f"Profiler trace exported to {trace_path}")
+        return {"iterations": iterations, "operators": operators, "trace": trace_path}
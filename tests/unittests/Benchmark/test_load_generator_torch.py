@@ -0,0 +1,92 @@
+# RUN: python -m pytest -q --tb=short %s
+import time
+
+import numpy as np
+import pytest
+from quark_utility import *
+from quarkrt.runner import DynamicBatcher, LoadGenerator
+
+
+def service(seconds):
+    time.sleep(seconds)
+
+
+def test_load_generator_queues_beyond_capacity():
+    generator = LoadGenerator(service, 0.01, workers=1, drain_timeout=5.0)
+
+    light = generator.run(arrival_times(ArrivalEnum.CONSTANT, 20.0, 1.0), 20.0)
+    assert light.completed == light.requests == 20
+    assert light.achieved_rate == pytest.approx(20.0, rel=0.15)
+    assert light.queueing["p99"] < 0.01
+
+    # Twice the capacity of one worker, requests wait for their turn
+    heavy = generator.run(arrival_times(ArrivalEnum.CONSTANT, 200.0, 0.5), 200.0)
+    assert heavy.achieved_rate < 110.0
+    assert heavy.latency["p99"] > 0.2
+    assert heavy.latency["p99"] > heavy.service["p99"] + heavy.queueing["p50"]
+
+    knee = find_knee([light, heavy])
+    assert (knee.rate, knee.saturated_rate) == (20.0, 200.0)
+
+
+def test_load_generator_drops_after_drain_timeout():
+    generator = LoadGenerator(service, 0.05, workers=2, drain_timeout=0.1)
+    level = generator.run(np.zeros(20), 100.0)
+    assert 0 < level.dropped < 20
+    assert level.completed + level.dropped == 20
+
+
+def test_load_generator_raises_request_errors():
+    def failing():
+        raise RuntimeError("executor failed")
+
+    with pytest.raises(RuntimeError, match="executor failed"):
+        LoadGenerator(failing).run(np.zeros(2), 10.0)
+
+
+def _batcher(max_batch_size, max_wait, batches):
+    def execute(batch):
+        batches.append(batch)
+        time.sleep(0.005)
+
+    return DynamicBatcher(
+        execute,
+        list(range(100)),
+        list,
+        max_batch_size=max_batch_size,
+        max_wait=max_wait,
+        drain_timeout=5.0,
+    )
+
+
+def test_dynamic_batcher_fills_batches_up_to_the_limit():
+    batches = []
+    level = _batcher(8, 0.05, batches).run(np.zeros(20), 100.0)
+
+    assert level.completed == 20
+    assert sorted(len(batch) for batch in batches) == [4, 8, 8]
+    assert sorted(sum(batches, [])) == list(range(20))
+    assert level.batches["sizes"] == {4: 1, 8: 2}
+    assert level.batches["full_fraction"] == pytest.approx(2 / 3)
+
+
+def test_dynamic_batcher_dispatches_after_max_wait():
+    batches = []
+    # Arrivals 50ms apart never share a batch, each waits out max_wait
+    level = _batcher(8, 0.02, batches).run(
+        arrival_times(ArrivalEnum.CONSTANT, 20.0, 0.2), 20.0
+    )
+
+    assert [len(batch) for batch in batches] == [1, 1, 1, 1]
+    assert level.batches["mean_size"] == 1.0
+    assert level.queueing["p50"] >= 0.02
+    assert level.latency["p50"] >= 0.025
+
+
+def test_dynamic_batcher_raises_execute_errors():
+    def failing(batch):
+        raise RuntimeError("batch failed")
+
+    batcher = DynamicBatcher(failing, [0], list, drain_timeout=1.0)
+    with pytest.raises(RuntimeError, match="batch failed"):
+        batcher.run(np.zeros(3), 10.0)
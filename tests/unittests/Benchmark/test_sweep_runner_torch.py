@@ -0,0 +1,83 @@
+# RUN: python -m pytest -q --tb=short %s
+import os
+
+os.environ["TORCH_SUPPORTED"] = "1"
+
+import pytest
+import torch
+from quark_utility import *
+from quarkrt.runner import SweepRunner
+
+
+@pytest.fixture
+def torch_sweep_config():
+    return BenchmarkConfig(
+        label="sweep_smoke_test",
+        experiment=ExperimentConfig(
+            executor=ExecutorConfig(
+                framework=FrameworkEnum.TORCH,
+                device=DeviceEnum.CPU,
+            ),
+            run_mode=RunModeEnum.INFERENCE,
+            timer=TimerEnum.PYTHON,
+        ),
+        workload=OperatorConfig(
+            framework=FrameworkEnum.TORCH,
+            granularity=GranularityEnum.OPERATOR,
+            operator=OperatorEnum.CONV2D,
+        ),
+        dataset=SyntheticDatasetConfig(
+            source=DataSourceEnum.SYNTHETIC,
+            input_shape=[3, 16, 16],
+            batch_size=1,
+            dtype=DtypeEnum.FLOAT32,
+        ),
+        sweep=SweepConfig(axes={"dataset.batch_size": [1, 2, 4]}),
+    )
+
+
+def test_sweep_runner_reuses_workload(torch_sweep_config, tmpdir):
+    runner = SweepRunner(torch_sweep_config, logging_path=str(tmpdir))
+    runner.run()
+    results = runner.get_results()["sweep"]
+
+    assert [entry["point"] for entry in results] == [
+        {"dataset.batch_size": batch_size} for batch_size in (1, 2, 4)
+    ]
+    for entry in results:
+        assert entry["results"]["sweep_point"] == entry["point"]
+        assert entry["results"]["samples"] > 0
+        assert tmpdir.join(f"{entry['label']}.json").exists()
+    assert tmpdir.join("sweep_smoke_test.json").exists()
+
+    # All grid points share the conv2d operator, it is built only once
+    assert len(runner.workloads) == 1
+
+
+def test_sweep_execution_modes_leave_cached_workload(torch_sweep_config, tmpdir):
+    config = torch_sweep_config.model_copy(deep=True)
+    config.sweep = SweepConfig(
+        axes={"experiment.executor.execution_mode": ["channels_last", "eager"]}
+    )
+    runner = SweepRunner(config, logging_path=str(tmpdir))
+    runner.run()
+
+    # The channels_last point converted a copy, the eager point ran contiguous
+    (workload,) = runner.workloads.values()
+    assert all(param.is_contiguous() for param in workload.workload.parameters())
+
+
+def test_sweep_dtypes_leave_cached_workload(torch_sweep_config, tmpdir):
+    config = torch_sweep_config.model_copy(deep=True)
+    config.sweep = SweepConfig(axes={"dataset.dtype": ["bfloat16", "float32"]})
+    runner = SweepRunner(config, logging_path=str(tmpdir))
+    runner.run()
+
+    # The bfloat16 point cast a copy, the float32 point ran on unrounded weights
+    (workload,) = runner.workloads.values()
+    weight = next(workload.workload.parameters())
+    assert weight.dtype == torch.float32
+    assert not torch.equal(weight, weight.bfloat16().float())
+
+
+os.environ.pop("TORCH_SUPPORTED", None)
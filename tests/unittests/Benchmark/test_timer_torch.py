@@ -1,12 +1,17 @@
 # RUN: python -m pytest -q --tb=short %s
+import errno
 import os
+import sys
+import time
 
 os.environ["TOR_SUPPORTED"] = "1"
 
 import numpy as np
 import pytest
 import torch
+from quark_utility import *
 from quarkrt.timer import *
+from quarkrt.timer.timer_base import TimerBase
 
 
 def dummy_function():
@@ -25,11 +30,8 @@ def one_pos_function(inp0):
     "timer_type, repeat_samples, warmup_samples",
     [
         (TimerEnum.PYTHON, 10, 3),
-        (TimerEnum.TORCH, 10, 3)
-        if torch.cuda.is_available()
-        else pytest.param(
-            "pytorch_timer", 10, 3, marks=pytest.mark.skip(reason="CUDA not available")
-        ),
+        # Times CUDA events on GPU hosts and wall clock on CPU-only hosts
+        (TimerEnum.TORCH, 10, 3),
     ],
 )
 def test_timer(timer_type, repeat_samples, warmup_samples):
@@ -81,11 +83,8 @@ def test_timer(timer_type, repeat_samples, warmup_samples):
     "timer_type, repeat_samples, warmup_samples",
     [
         (TimerEnum.PYTHON, 10, 3),
-        (TimerEnum.TORCH, 10, 3)
-        if torch.cuda.is_available()
-        else pytest.param(
-            "pytorch_timer", 10, 3, marks=pytest.mark.skip(reason="CUDA not available")
-        ),
+        # Times CUDA events on GPU hosts and wall clock on CPU-only hosts
+        (TimerEnum.TORCH, 10, 3),
     ],
 )
 def test_timer_one_arg(timer_type, repeat_samples, warmup_samples):
@@ -133,4 +132,238 @@ def test_timer_one_arg(timer_type, repeat_samples, warmup_samples):
     ), "Mean should be within the confidence interval"
 
 
+def test_adaptive_timer_reaches_target_precision():
+    sampling = SamplingConfig(
+        warmup_samples=2, target_precision=0.05, min_samples=5, max_time=10.0
+    )
+    _timer = TimerBuilder.build(TimerEnum.PYTHON, sampling=sampling)
+    _timer.run(dummy_function)
+    summary = _timer.summary()
+
+    assert summary["stop_reason"] == "target_precision"
+    assert summary["samples"] >= sampling.min_samples
+    assert summary["precision"] <= sampling.target_precision
+    assert summary["target_precision"] == sampling.target_precision
+
+
+@pytest.mark.parametrize(
+    "sampling, stop_reason",
+    [
+        (
+            SamplingConfig(target_precision=1e-9, min_samples=5, max_samples=20),
+            "max_samples",
+        ),
+        (
+            SamplingConfig(target_precision=1e-9, min_samples=5, max_time=0.05),
+            "max_time",
+        ),
+    ],
+)
+def test_adaptive_timer_caps(sampling, stop_reason):
+    # Alternating durations keep the median interval wide
+    durations = iter([0.0, 0.002] * 1000)
+    _timer = TimerBuilder.build(TimerEnum.PYTHON, sampling=sampling)
+    _timer.run(lambda: time.sleep(next(durations)))
+
+    assert _timer.stop_reason == stop_reason
+    assert len(_timer.times) <= sampling.max_samples
+    assert _timer.summary()["precision"] > sampling.target_precision
+
+
+def test_auto_warmup_stops_when_steady():
+    # Cold iterations slow down the first runs, like filling caches
+    iterations = iter(range(1000))
+    sampling = SamplingConfig(auto_warmup=True, warmup_window=5, repeat_samples=5)
+    _timer = TimerBuilder.build(TimerEnum.PYTHON, sampling=sampling)
+    _timer.run(lambda: time.sleep(0.02 if next(iterations) < 6 else 0.001))
+    summary = _timer.summary()
+
+    assert summary["warmup_reason"] == "steady"
+    # Sleep jitter can fail a comparison by chance, the next windows settle it
+    assert 6 < summary["warmup_samples"] <= 6 + 4 * sampling.warmup_window
+    assert len(summary["warmup_times"]) == summary["warmup_samples"]
+    assert summary["max_time"] < 0.01 < summary["warmup_times"][0]
+    assert summary["samples"] == sampling.repeat_samples
+
+
+class FakeClockTimer(TimerBase):
+    """Timer reading a clock that only the timed function advances."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.clock = 0.0
+
+    def observe(self) -> float:
+        return self.clock
+
+
+def test_auto_warmup_cap():
+    _timer = FakeClockTimer(5, 5)
+    _timer.set_auto_warmup(max_samples=12)
+    durations = iter(0.03 * 0.7**idx for idx in range(1000))
+
+    def workload():
+        # Latency keeps dropping, it never settles within the cap
+        _timer.clock += next(durations)
+
+    _timer.run(workload)
+
+    assert _timer.warmup_reason == "max_warmup_samples"
+    assert len(_timer.warmup_times) == 12
+
+
+def test_streaming_timer_keeps_a_reservoir():
+    sampling = SamplingConfig(streaming=True, reservoir_size=16, repeat_samples=500)
+    _timer = TimerBuilder.build(TimerEnum.PYTHON, sampling=sampling)
+    _timer.run(dummy_function)
+    summary = _timer.summary()
+
+    assert summary["samples"] == 500
+    assert len(_timer.times) == 16
+    assert summary["min_time"] <= summary["median_time"] <= summary["max_time"]
+    assert summary["percentiles"]["p50"] <= summary["percentiles"]["p99.9"]
+    assert StreamingStats.from_dict(summary["sketch"]).count == 500
+
+
+def test_summary_confidence_and_robust_statistics():
+    _timer = FakeClockTimer(40, 0)
+    durations = iter([0.01 + 0.0001 * (idx % 5) for idx in range(39)] + [1.0])
+
+    def workload():
+        # One preempted sample among steady ones
+        _timer.clock += next(durations)
+
+    _timer.run(workload)
+    _timer.confidence = 0.99
+    summary = _timer.summary()
+
+    low, high = summary["confidence_interval"]
+    low95, high95 = _timer.confidence_interval(0.95)
+    assert summary["confidence"] == 0.99
+    assert low < low95 < summary["mean_time"] < high95 < high
+    assert summary["outliers"]["high_severe"] == 1
+    assert summary["outliers"]["fraction"] == pytest.approx(1 / 40)
+    assert summary["mad"] < 0.001
+    assert summary["trimmed_mean"] < 0.0103 < summary["mean_time"]
+    assert summary["bootstrap_ci"][0] <= summary["median_time"]
+    assert summary["median_time"] <= summary["bootstrap_ci"][1]
+    ms_low, _ = _timer.confidence_interval(0.99, unit="ms")
+    assert ms_low == pytest.approx(low * 1000)
+
+
+def test_autorange_times_batches_of_cheap_calls():
+    sampling = SamplingConfig(autorange=True, min_sample_time=0.001, repeat_samples=10)
+    _timer = TimerBuilder.build(TimerEnum.PYTHON, sampling=sampling)
+    _timer.run(lambda inp0: inp0, 0)
+    summary = _timer.summary()
+
+    assert summary["inner_loops"] > 1
+    assert summary["overhead"] > 0
+    assert summary["samples"] == sampling.repeat_samples
+    # Times are per call with the empty loop overhead taken out
+    assert 0 <= summary["median_time"] < sampling.min_sample_time / 100
+    assert len(summary["warmup_times"]) == sampling.warmup_samples
+
+
+def test_autorange_keeps_slow_calls_unbatched():
+    sampling = SamplingConfig(autorange=True, min_sample_time=0.001, repeat_samples=3)
+    _timer = TimerBuilder.build(TimerEnum.PYTHON, sampling=sampling)
+    _timer.run(time.sleep, 0.002)
+
+    assert _timer.inner_loops == 1
+    # Sleeping oversleeps on a busy machine, it never returns early
+    assert _timer.median_time() >= 0.002
+
+
+def test_perf_timer_reads_available_counters():
+    from quarkrt.timer.perf_timer import PERF_COUNTERS
+
+    _timer = TimerBuilder.build(TimerEnum.PERF, repeat_samples=5, warmup_samples=1)
+    _timer.run(time.sleep, 0.001)
+    summary = _timer.summary()
+
+    assert summary["samples"] == 5
+    assert summary["median_time"] >= 0.001
+    # Every counter is either read or reported unavailable, depending on the host
+    measured = set(summary["counters"]) - {"ipc"}
+    assert measured | set(summary["unavailable_counters"]) == set(PERF_COUNTERS)
+    assert set(summary["counter_scopes"]) == measured
+    for name in measured:
+        assert summary["counters"][name]["min"] >= 0
+
+
+def test_perf_timer_falls_back_to_wall_time(monkeypatch, capsys):
+    from quarkrt.timer.perf_timer import PERF_COUNTERS, PerfTimer
+
+    def forbidden(*args, **kwargs):
+        raise PermissionError(errno.EACCES, "Permission denied")
+
+    monkeypatch.setattr(
+        sys.modules[PerfTimer.__module__], "_perf_event_open", forbidden
+    )
+    _timer = TimerBuilder.build(TimerEnum.PERF, repeat_samples=3, warmup_samples=1)
+    _timer.run(dummy_function)
+    summary = _timer.summary()
+
+    assert "measures wall time only" in capsys.readouterr().out
+    assert summary["samples"] == 3
+    assert summary["counters"] == {}
+    assert set(summary["unavailable_counters"]) == set(PERF_COUNTERS)
+
+
+def test_torch_timer_on_cpu():
+    conv = torch.nn.Conv2d(3, 8, 3)
+    inputs = torch.randn(1, 3, 32, 32)
+    _timer = TimerBuilder.build(TimerEnum.TORCH, 5, 1, device=DeviceEnum.CPU)
+    _timer.run(conv, inputs)
+
+    assert not _timer.use_cuda
+    assert _timer.summary()["samples"] == 5
+    assert _timer.min_time() > 0
+
+
+def test_torch_timer_profile(tmpdir):
+    conv = torch.nn.Conv2d(3, 8, 3)
+    inputs = torch.randn(1, 3, 32, 32)
+    _timer = TimerBuilder.build(TimerEnum.TORCH, 5, 1, device=DeviceEnum.CPU)
+    trace_path = os.path.join(str(tmpdir), "conv.trace.json")
+    profile = _timer.profile(conv, inputs, iterations=2, top_n=3, trace_path=trace_path)
+
+    operators = profile["operators"]
+    assert 0 < len(operators) <= 3
+    assert all(row["name"].startswith("aten::") for row in operators)
+    assert operators[0]["self_cpu_time"] >= operators[-1]["self_cpu_time"]
+    assert os.path.getsize(trace_path) > 0
+
+    with pytest.raises(NotImplementedError):
+        TimerBuilder.build(TimerEnum.PYTHON).profile(conv, inputs)
+
+
+def test_memory_probe_shows_leak_as_trend():
+    leaked = []
+
+    def leaky_function():
+        # Touch every page so the allocation is resident
+        leaked.append(b"x" * 2**20)
+
+    _timer = TimerBuilder.build(TimerEnum.PYTHON, 20, 2)
+    probe = MemoryProbe(interval=2, trace_python=True)
+    _timer.add_probe(probe)
+    _timer.run(leaky_function)
+    memory = probe.summary()
+
+    assert len(memory["rss"]) == 11
+    assert memory["peak_rss"] >= memory["rss_end"] > 0
+    assert memory["rss_growth_per_iteration"] > 0.5 * 2**20
+    assert memory["python_growth_per_iteration"] == pytest.approx(2**20, rel=0.05)
+    assert memory["python_peak"] >= 22 * 2**20
+    if memory["cpu_allocator"] is not None:
+        growth = memory["cpu_allocator"]["growth_per_iteration"]
+        assert growth == pytest.approx(2**20, rel=0.1)
+
+    leaked.clear()
+    _timer.run(dummy_function)
+    assert abs(probe.summary()["python_growth_per_iteration"]) < 1024
+
+
 os.environ.pop("TORCH_SUPPORTED", None)
@@ -17,4 +17,36 @@ def test_dummy():
     assert True
 
 
+@pytest.mark.parametrize(
+    "dtype",
+    [DtypeEnum.FLOAT32, DtypeEnum.FLOAT16, DtypeEnum.BFLOAT16, DtypeEnum.FLOAT64],
+)
+def test_torch_provider_synthetic_dtype(dtype):
+    config = BenchmarkConfig(
+        label="dtype",
+        experiment=ExperimentConfig(
+            executor=ExecutorConfig(
+                framework=FrameworkEnum.TORCH, device=DeviceEnum.CPU
+            ),
+            run_mode=RunModeEnum.INFERENCE,
+            timer=TimerEnum.PYTHON,
+        ),
+        workload=OperatorConfig(
+            framework=FrameworkEnum.TORCH,
+            granularity=GranularityEnum.OPERATOR,
+            operator=OperatorEnum.CONV2D,
+        ),
+        dataset=SyntheticDatasetConfig(
+            source=DataSourceEnum.SYNTHETIC,
+            input_shape=[3, 8, 8],
+            batch_size=2,
+            dtype=dtype,
+        ),
+    )
+    inputs, labels = DataProviderBuilder.build(config).get_data()
+    assert inputs.dtype == dtype.to_torch()
+    assert inputs.shape == (2, 3, 8, 8)
+    assert labels.dtype == torch.int64
+
+
 os.environ.pop("TORCH_SUPPORTED", None)
@@ -1,5 +1,6 @@
 # tests/test_executor.py
 # RUN: python -m pytest -q -v --tb=short %s
+import functools
 import os
 
 os.environ["TOR_SUPPORTED"] = "1"
@@ -57,4 +58,194 @@ def test_torch_executor_device(test_config, device: DeviceEnum):
             assert device_info == torch.device("cuda")
 
 
+def _resnet(run_mode, dtype=DtypeEnum.FLOAT32, **executor):
+    """Executor, workload and data provider of a small ResNet18 task on CPU."""
+    if executor.get("execution_mode") == ExecutionModeEnum.COMPILE:
+        # No C++ toolchain needed, still goes through dynamo
+        executor.setdefault("compile", CompileConfig(backend="aot_eager"))
+    config = BenchmarkConfig(
+        label="phases",
+        experiment=ExperimentConfig(
+            executor=ExecutorConfig(
+                framework=FrameworkEnum.TORCH, device=DeviceEnum.CPU, **executor
+            ),
+            run_mode=run_mode,
+            timer=TimerEnum.PYTHON,
+        ),
+        workload=ModelConfig(
+            framework=FrameworkEnum.TORCH,
+            granularity=GranularityEnum.MODEL,
+            model=ModelEnum.RESNET18,
+        ),
+        dataset=SyntheticDatasetConfig(
+            source=DataSourceEnum.SYNTHETIC,
+            input_shape=[3, 32, 32],
+            batch_size=2,
+            dtype=dtype,
+            rng=RNGEnum.NORMAL,
+        ),
+    )
+    return (
+        ExecutorBuilder.build(config),
+        WorkloadBuilder.build(config),
+        DataProviderBuilder.build(config),
+    )
+
+
+@pytest.mark.parametrize(
+    "run_mode, phases",
+    [
+        # Synthetic inputs are staged once by prepare, not fetched per call
+        (RunModeEnum.INFERENCE, ["forward"]),
+        (RunModeEnum.TRAINING, ["forward", "loss", "backward", "optimizer"]),
+    ],
+)
+def test_torch_executor_phases(run_mode, phases):
+    from quarkrt.timer import TimerBuilder
+
+    executor, workload, data_provider = _resnet(run_mode)
+    timer = TimerBuilder.build(TimerEnum.PYTHON, repeat_samples=4, warmup_samples=2)
+    timer.add_probe(executor.phases)
+    timer.run(executor.execute, workload, data_provider)
+
+    summary = executor.phases.summary(unit="ms")
+    assert list(summary) == phases + ["total"]
+    assert executor.phases.total.count == 4
+    assert summary["total"]["mean"] == pytest.approx(
+        sum(summary[name]["mean"] for name in phases)
+    )
+    assert sum(summary[name]["share"] for name in phases) == pytest.approx(1.0)
+    # Phases sit inside the timed call
+    assert summary["total"]["mean"] <= timer.mean_time(unit="ms")
+
+    # Nothing is recorded outside a timer run
+    executor.execute(workload, data_provider)
+    assert executor.phases.total.count == 4
+
+
+class _Batch:
+    """Data provider without a synthetic source, streamed by every call."""
+
+    def get_data(self):
+        return torch.randn(2, 3, 32, 32), torch.randint(0, 10, (2,))
+
+
+def test_torch_executor_prepares_a_reusable_plan():
+    executor, workload, data_provider = _resnet(RunModeEnum.TRAINING)
+    workload.optimizer = functools.partial(torch.optim.SGD, momentum=0.9)
+
+    plan = executor.prepare(workload, data_provider)
+    assert plan.model.training
+    assert plan.inputs.shape == (2, 3, 32, 32)
+    for _ in range(2):
+        executor.execute(workload, data_provider)
+    assert executor.plans[id(workload)] is plan
+    # The optimizer lives across steps, so its momentum is kept
+    assert len(plan.optimizer.state) > 0
+
+    executor.phases.start()
+    executor.execute(workload, _Batch())
+    executor.phases.sample()
+    assert {"data", "transfer"} <= set(executor.phases.summary())
+    assert executor.plans[id(workload)] is plan
+
+
+@pytest.mark.parametrize(
+    "execution_mode, compiled",
+    [
+        (ExecutionModeEnum.EAGER, False),
+        (ExecutionModeEnum.INFERENCE_MODE, False),
+        (ExecutionModeEnum.CHANNELS_LAST, False),
+        (ExecutionModeEnum.TORCHSCRIPT_TRACE, True),
+        (ExecutionModeEnum.TORCHSCRIPT_SCRIPT, True),
+        (ExecutionModeEnum.COMPILE, True),
+    ],
+)
+def test_torch_executor_execution_modes(execution_mode, compiled):
+    executor, workload, data_provider = _resnet(
+        RunModeEnum.INFERENCE, execution_mode=execution_mode
+    )
+
+    plan = executor.prepare(workload, data_provider)
+    output = executor.execute(workload, data_provider)
+    # The workload keeps the eager module, the plan wraps or converts it
+    with torch.no_grad():
+        expected = workload.workload.eval()(plan.inputs)
+    torch.testing.assert_close(output, expected, rtol=1e-4, atol=1e-4)
+    assert executor.setup["execution_mode"] == execution_mode.value
+    assert (executor.setup["compile_time"] is not None) == compiled
+    if execution_mode == ExecutionModeEnum.CHANNELS_LAST:
+        assert plan.inputs.is_contiguous(memory_format=torch.channels_last)
+        weight = next(plan.model.parameters())
+        assert weight.is_contiguous(memory_format=torch.channels_last)
+        # The cached workload stays contiguous for tasks in other modes
+        assert next(workload.workload.parameters()).is_contiguous()
+    if execution_mode == ExecutionModeEnum.INFERENCE_MODE:
+        assert output.is_inference()
+
+
+@pytest.mark.parametrize(
+    "execution_mode", [ExecutionModeEnum.COMPILE, ExecutionModeEnum.CHANNELS_LAST]
+)
+def test_torch_executor_trains_in_execution_mode(execution_mode):
+    executor, workload, data_provider = _resnet(
+        RunModeEnum.TRAINING, execution_mode=execution_mode
+    )
+
+    plan = executor.prepare(workload, data_provider)
+    weight = plan.optimizer.param_groups[0]["params"][0]
+    before = weight.detach().clone()
+    # Warming up the compiled graph does not step the optimizer
+    assert torch.equal(before, weight)
+    executor.execute(workload, _Batch())
+    assert not torch.equal(before, weight)
+
+
+@pytest.mark.parametrize(
+    "dtype, autocast, weights, output",
+    [
+        (DtypeEnum.BFLOAT16, None, torch.bfloat16, torch.bfloat16),
+        (DtypeEnum.FLOAT16, None, torch.float16, torch.float16),
+        (DtypeEnum.FLOAT64, None, torch.float64, torch.float64),
+        # Autocast keeps float32 weights and computes in reduced precision
+        (DtypeEnum.FLOAT32, DtypeEnum.BFLOAT16, torch.float32, torch.bfloat16),
+        # Even when the inputs come in reduced precision
+        (DtypeEnum.BFLOAT16, DtypeEnum.BFLOAT16, torch.float32, torch.bfloat16),
+    ],
+)
+def test_torch_executor_precision(dtype, autocast, weights, output):
+    executor, workload, data_provider = _resnet(
+        RunModeEnum.INFERENCE, dtype=dtype, autocast=autocast, drift=DriftConfig()
+    )
+
+    plan = executor.prepare(workload, data_provider)
+    assert next(plan.model.parameters()).dtype == weights
+    # The cached workload keeps float32 weights for other tasks
+    assert next(workload.workload.parameters()).dtype == torch.float32
+    assert executor.execute(workload, data_provider).dtype == output
+
+    drift = executor.setup["drift"]
+    assert executor.setup["dtype"] == dtype.value
+    if dtype == DtypeEnum.FLOAT64:
+        assert drift["max_rel_error"] < 1e-5
+    else:
+        assert 0 < drift["max_rel_error"] < 1
+    assert 0 <= drift["top1_agreement"] <= 1
+
+
+def test_torch_executor_trains_under_autocast():
+    executor, workload, data_provider = _resnet(
+        RunModeEnum.TRAINING, autocast=DtypeEnum.BFLOAT16
+    )
+
+    executor.prepare(workload, data_provider)
+    weight = next(workload.workload.parameters())
+    before = weight.detach().clone()
+    assert executor.execute(workload, data_provider).dtype == torch.bfloat16
+    # Master weights stay float32 and are updated
+    assert weight.dtype == torch.float32
+    assert not torch.equal(before, weight)
+    assert executor.setup["drift"] is None
+
+
 os.environ.pop("TORCH_SUPPORTED", None)
@@ -0,0 +1,97 @@
+# RUN: python -m pytest -q -v --tb=short %s
+import os
+
+os.environ["TORCH_SUPPORTED"] = "1"
+
+import threading
+
+import pytest
+import torch
+import yaml
+from quark_utility import *
+from quarkrt.server import FarmWorker
+
+TASK_TEMPLATE = """
+label: {label}
+workload:
+  framework: torch
+  granularity: operator
+  operator: conv2d
+
+experiment:
+  run_mode: inference
+  executor:
+    framework: torch
+    device: cpu
+  timer: python
+
+dataset:
+  source: synthetic
+  input_shape: [3, 16, 16]
+  batch_size: {batch_size}
+  dtype: float32
+"""
+
+
+def _farm_task(idx):
+    config = BenchmarkConfig.model_validate(
+        yaml.safe_load(TASK_TEMPLATE.format(label=f"farm_{idx}", batch_size=idx + 1))
+    )
+    return FarmTask(
+        id=str(idx),
+        label=config.label,
+        config=config.model_dump(mode="json"),
+        run_info={"sweep_id": "farm-test"},
+    )
+
+
+def test_local_workers_on_loopback(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    tasks = [_farm_task(idx) for idx in range(4)]
+    queue = FarmQueue(tasks, heartbeat_timeout=30)
+    server = FarmServer(("127.0.0.1", 0), queue, poll_interval=0.1)
+
+    workers = [
+        FarmWorker(server.address, name=f"worker_{idx}", logging_path=f"worker_{idx}")
+        for idx in range(2)
+    ]
+    threads = [threading.Thread(target=worker.serve) for worker in workers]
+    for thread in threads:
+        thread.start()
+    assert server.serve_until_done(timeout=300)
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert not queue.failed
+    assert sum(worker.tasks_run for worker in workers) == len(tasks)
+
+    # Every run comes back with its samples and lands in the coordinator's store
+    with ResultsStore(str(tmpdir.join("coordinator.db"))) as store:
+        for task in tasks:
+            result = queue.results[task.id]
+            assert result["results"]["samples"] > 0
+            for run in result["runs"]:
+                assert store.import_run(run)
+                assert not store.import_run(run)
+        runs = store.query(sweep_id="farm-test")
+        assert sorted(run["label"] for run in runs) == [task.label for task in tasks]
+        assert all(len(store.samples(run["run_id"])) > 0 for run in runs)
+
+
+def test_worker_exits_when_coordinator_goes_away(monkeypatch):
+    queue = FarmQueue([_farm_task(0)])
+    server = FarmServer(("127.0.0.1", 0), queue, poll_interval=0.1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def run_task(task):
+        # The coordinator dies while the task runs
+        server.shutdown()
+        server.server_close()
+        return {"results": {}, "runs": []}
+
+    worker = FarmWorker(server.address, name="orphan", timeout=5)
+    monkeypatch.setattr(worker, "run_task", run_task)
+    worker.serve(connect_timeout=5)
+    thread.join(timeout=5)
+    assert worker.tasks_run == 1
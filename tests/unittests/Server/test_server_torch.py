@@ -0,0 +1,77 @@
+# RUN: python -m pytest -q -v --tb=short %s
+import os
+
+os.environ["TORCH_SUPPORTED"] = "1"
+
+import threading
+
+import pytest
+import torch
+from quark_utility import *
+from quarkrt.server import RuntimeServer
+
+
+@pytest.fixture
+def task_file(tmpdir):
+    task = tmpdir.join("conv.yml")
+    task.write("""
+    label: server_smoke_test
+    workload:
+      framework: torch
+      granularity: operator
+      operator: conv2d
+
+    experiment:
+      run_mode: inference
+      executor:
+        framework: torch
+        device: cpu
+      timer: python
+
+    dataset:
+      source: synthetic
+      input_shape: [3, 16, 16]
+      batch_size: 2
+      dtype: float32
+    """)
+    return str(task)
+
+
+@pytest.fixture
+def server(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    server = RuntimeServer(str(tmpdir.join("quark-runtime.sock")))
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    yield server
+    if not server.shutdown_requested:
+        MessageClient(server.socket_path).request("shutdown")
+    thread.join(timeout=10)
+
+
+def test_server_runs_tasks_with_warm_workload(server, task_file):
+    client = MessageClient(server.socket_path, timeout=60)
+    assert client.wait_ready(timeout=10)
+
+    first = client.request("run", task=task_file)
+    assert first["status"] == "ok"
+    assert first["results"]["samples"] > 0
+    workload = next(iter(server.workloads.values()))
+
+    second = client.request("run", task=task_file)
+    assert second["status"] == "ok"
+    assert len(server.workloads) == 1
+    assert next(iter(server.workloads.values())) is workload
+    assert client.request("ping")["tasks"] == 2
+
+
+def test_server_reports_task_errors(server, tmpdir):
+    client = MessageClient(server.socket_path, timeout=60)
+    response = client.request("run", task=str(tmpdir.join("missing.yml")))
+    assert response["status"] == "error"
+    assert "FileNotFoundError" in response["error"]
+
+    assert client.request("shutdown")["status"] == "ok"
+
+
+os.environ.pop("TORCH_SUPPORTED", None)
@@ -0,0 +1,32 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import os
+
+import pytest
+from quark_utility import *
+
+
+@pytest.mark.parametrize(
+    "cpus, text",
+    [
+        ([0, 1, 2, 5], "0-2,5"),
+        ([3], "3"),
+        ([0, 2, 4], "0,2,4"),
+        ([8, 9, 10, 11], "8-11"),
+    ],
+)
+def test_cpu_list_roundtrip(cpus, text):
+    assert format_cpu_list(cpus) == text
+    assert parse_cpu_list(text) == cpus
+
+
+def test_pin_to_cpus_sets_thread_env(monkeypatch):
+    for var in THREAD_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
+    original = available_cpus()
+    try:
+        pin_to_cpus(original[:1])
+        assert configured_num_threads() == 1
+        assert available_cpus() == original[:1]
+    finally:
+        os.sched_setaffinity(0, original)
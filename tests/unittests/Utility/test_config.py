@@ -69,3 +69,111 @@ def test_config_load_task_from_yaml(sample_config_file):
     assert config.workload.framework == FrameworkEnum.TORCH
     assert config.workload.granularity == GranularityEnum.OPERATOR
     assert config.workload.operator == OperatorEnum.CONV2D
+
+
+def test_config_sampling_and_profiler(sample_config_yaml):
+    config_dict = yaml.safe_load(sample_config_yaml)
+    config_dict["experiment"]["sampling"] = {"target_precision": 0.01}
+    config = BenchmarkConfig.model_validate(config_dict)
+    assert config.experiment.sampling.target_precision == 0.01
+    assert config.experiment.sampling.repeat_samples == 33
+
+    with pytest.raises(ValueError):
+        config_dict["experiment"]["sampling"] = {"min_samples": 10, "max_samples": 5}
+        BenchmarkConfig.model_validate(config_dict)
+
+    # Only the torch timer can profile operators
+    del config_dict["experiment"]["sampling"]
+    config_dict["experiment"]["profiler"] = {"top_n": 5}
+    with pytest.raises(ValueError):
+        BenchmarkConfig.model_validate(config_dict)
+    config_dict["experiment"]["timer"] = "torch"
+    assert BenchmarkConfig.model_validate(config_dict).experiment.profiler.top_n == 5
+
+    config_dict["experiment"]["memory"] = {"tracemalloc": True}
+    assert BenchmarkConfig.model_validate(config_dict).experiment.memory.interval == 1
+    with pytest.raises(ValueError):
+        config_dict["experiment"]["memory"] = {"interval": 0}
+        BenchmarkConfig.model_validate(config_dict)
+
+
+def test_config_load(sample_config_yaml):
+    config_dict = yaml.safe_load(sample_config_yaml)
+    config_dict["experiment"]["load"] = {"arrival": "bursty", "rates": [10, 20]}
+    load = BenchmarkConfig.model_validate(config_dict).experiment.load
+    assert load.arrival == ArrivalEnum.BURSTY
+    assert load.workers == 1
+
+    for invalid in (
+        {"arrival": "trace"},
+        {"arrival": "uniform"},
+        {"rates": []},
+        {"load_fractions": [0.5, -1.0]},
+        {"workers": 0},
+    ):
+        config_dict["experiment"]["load"] = invalid
+        with pytest.raises(ValueError):
+            BenchmarkConfig.model_validate(config_dict)
+
+
+def test_config_batching(sample_config_yaml):
+    config_dict = yaml.safe_load(sample_config_yaml)
+    config_dict["experiment"]["batching"] = {"max_batch_size": 16}
+    # Requests come from the load section
+    with pytest.raises(ValueError):
+        BenchmarkConfig.model_validate(config_dict)
+
+    config_dict["experiment"]["load"] = {"rates": [100]}
+    batching = BenchmarkConfig.model_validate(config_dict).experiment.batching
+    assert (batching.max_batch_size, batching.max_wait) == (16, 0.005)
+
+    config_dict["experiment"]["batching"] = {"max_batch_size": 0}
+    with pytest.raises(ValueError):
+        BenchmarkConfig.model_validate(config_dict)
+
+
+def test_config_execution_mode(sample_config_yaml):
+    config_dict = yaml.safe_load(sample_config_yaml)
+    executor = BenchmarkConfig.model_validate(config_dict).experiment.executor
+    assert executor.execution_mode == ExecutionModeEnum.EAGER
+
+    config_dict["experiment"]["executor"]["execution_mode"] = "compile"
+    config_dict["experiment"]["executor"]["compile"] = {"mode": "max-autotune"}
+    executor = BenchmarkConfig.model_validate(config_dict).experiment.executor
+    assert (executor.compile.backend, executor.compile.mode) == (
+        "inductor",
+        "max-autotune",
+    )
+
+    # Compile options without the compile mode
+    config_dict["experiment"]["executor"]["execution_mode"] = "eager"
+    with pytest.raises(ValueError):
+        BenchmarkConfig.model_validate(config_dict)
+
+    # Frozen TorchScript cannot be trained
+    del config_dict["experiment"]["executor"]["compile"]
+    config_dict["experiment"]["executor"]["execution_mode"] = "torchscript_trace"
+    config_dict["experiment"]["run_mode"] = "training"
+    with pytest.raises(ValueError):
+        BenchmarkConfig.model_validate(config_dict)
+
+
+def test_config_precision(sample_config_yaml):
+    config_dict = yaml.safe_load(sample_config_yaml)
+    config_dict["dataset"]["dtype"] = "bfloat16"
+    config_dict["experiment"]["executor"]["autocast"] = "bfloat16"
+    config_dict["experiment"]["executor"]["drift"] = {}
+    config = BenchmarkConfig.model_validate(config_dict)
+    assert config.dataset.dtype == DtypeEnum.BFLOAT16
+    assert config.experiment.executor.autocast == DtypeEnum.BFLOAT16
+    assert config.experiment.executor.drift.tolerance == 1e-2
+
+    # Autocast only lowers the precision
+    config_dict["experiment"]["executor"]["autocast"] = "float64"
+    with pytest.raises(ValueError):
+        BenchmarkConfig.model_validate(config_dict)
+
+    config_dict["experiment"]["executor"]["autocast"] = "float16"
+    config_dict["experiment"]["executor"]["execution_mode"] = "torchscript_script"
+    with pytest.raises(ValueError):
+        BenchmarkConfig.model_validate(config_dict)
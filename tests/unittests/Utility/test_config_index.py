@@ -0,0 +1,98 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import os
+
+import pytest
+import quark_utility.config_index as config_index
+from quark_utility import *
+
+TASK_TEMPLATE = """
+label: {label}
+workload:
+  framework: torch
+  granularity: operator
+  operator: conv2d
+
+experiment:
+  run_mode: inference
+  executor:
+    framework: torch
+    device: cpu
+  timer: python
+
+dataset:
+  source: synthetic
+  input_shape: [3, 32, 32]
+  batch_size: {batch_size}
+  dtype: float32
+"""
+
+
+@pytest.fixture
+def task_tree(tmpdir):
+    files = []
+    for idx in range(3):
+        task = tmpdir.join(f"task_{idx}.yml")
+        task.write(TASK_TEMPLATE.format(label=f"task_{idx}", batch_size=idx + 1))
+        files.append(str(task))
+    return files
+
+
+@pytest.fixture
+def index_path(tmpdir):
+    return str(tmpdir.join("build", "config_index.pkl"))
+
+
+def _forbid_parsing(monkeypatch):
+    def fail(path, data):
+        raise AssertionError(f"{path} should have been served from the index")
+
+    monkeypatch.setattr(config_index, "_parse_config", fail)
+
+
+def test_index_serves_unchanged_files(task_tree, index_path, monkeypatch):
+    index = ConfigIndex(index_path)
+    configs = index.refresh(task_tree)
+    index.save()
+    assert [configs[path].label for path in task_tree] == ["task_0", "task_1", "task_2"]
+
+    _forbid_parsing(monkeypatch)
+    reloaded = ConfigIndex(index_path)
+    assert reloaded.refresh(task_tree) == configs
+
+    # A touched file with identical content is recognised by its hash
+    os.utime(task_tree[0], ns=(0, 0))
+    assert reloaded.get(task_tree[0]) == configs[task_tree[0]]
+
+
+def test_index_reparses_changed_files(task_tree, index_path):
+    index = ConfigIndex(index_path)
+    index.refresh(task_tree)
+
+    with open(task_tree[1], "w") as file:
+        file.write(TASK_TEMPLATE.format(label="renamed", batch_size=64))
+    assert index.get(task_tree[1]).label == "renamed"
+    assert index.get(task_tree[1]).dataset.batch_size == 64
+
+
+def test_index_skips_invalid_files(task_tree, index_path, tmpdir):
+    broken = tmpdir.join("broken.yml")
+    broken.write("label: broken\nworkload: {framework: torch}\n")
+
+    index = ConfigIndex(index_path)
+    configs = index.refresh(task_tree + [str(broken)])
+    assert str(broken) not in configs
+    assert len(configs) == len(task_tree)
+    index.save()
+
+    # The validation error is kept for files served from the index
+    reloaded = ConfigIndex(index_path)
+    assert reloaded.get(str(broken)) is None
+    assert reloaded.error(str(broken)).startswith("ValidationError")
+    assert reloaded.error(task_tree[0]) == ""
+
+
+def test_index_parallel_parse(task_tree, index_path, monkeypatch):
+    monkeypatch.setattr(config_index, "_PARALLEL_THRESHOLD", 2)
+    configs = ConfigIndex(index_path).refresh(task_tree, jobs=2)
+    assert sorted(config.dataset.batch_size for config in configs.values()) == [1, 2, 3]
@@ -2,6 +2,7 @@
 
 from enum import Enum
 
+import numpy as np
 import pytest
 from quark_utility import *
 
@@ -61,7 +62,11 @@ def test_timer_type_from_string():
         (RunModeEnum, ["inference", "training"], "unknown"),
         (GranularityEnum, ["operator", "model", "fused_operator"], "unknown"),
         (FrameworkEnum, ["torch", "tensorflow", "iree"], "unknown"),
-        (TimerEnum, ["python", "torch", "tensorflow", "iree", "tvm"], "unknown"),
+        (
+            TimerEnum,
+            ["python", "torch", "tensorflow", "iree", "tvm", "perf"],
+            "unknown",
+        ),
         (DataSourceEnum, ["synthetic", "cifar10", "mnist"], "unknown"),
         (DeviceEnum, ["cpu", "gpu", "tpu"], "unknown"),
     ],
@@ -75,3 +80,11 @@ def test_enum_from_string(enum_class, valid_values, invalid_value):
 
     # Test invalid value
     assert enum_class.from_string(invalid_value) == enum_class.UNKNOWN
+
+
+def test_dtype_to_numpy():
+    assert DtypeEnum.from_string("float16").to_numpy() == np.float16
+    assert DtypeEnum.FLOAT64.to_numpy() == np.float64
+    # numpy has no bfloat16
+    with pytest.raises(ValueError):
+        DtypeEnum.BFLOAT16.to_numpy()
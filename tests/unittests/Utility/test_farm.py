@@ -0,0 +1,127 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import threading
+
+import pytest
+from quark_utility import *
+
+
+def _tasks(count):
+    return [
+        FarmTask(id=str(idx), label=f"task_{idx}", config={}) for idx in range(count)
+    ]
+
+
+def test_pull_prefetches_into_own_deque():
+    queue = FarmQueue(_tasks(5), prefetch=2)
+    assert queue.pull("a", now=0).id == "0"
+    assert [task.id for task in queue.deques["a"]] == ["1"]
+    assert queue.pull("b", now=0).id == "2"
+    assert [task.id for task in queue.backlog] == ["4"]
+
+
+def test_idle_worker_steals_from_busiest_deque():
+    queue = FarmQueue(_tasks(6), prefetch=4)
+    assert queue.pull("a", now=0).id == "0"
+    assert queue.pull("b", now=0).id == "4"
+    assert queue.pull("b", now=0).id == "5"
+    # b is idle and the backlog is empty, it takes the back of a's deque
+    assert queue.pull("b", now=0).id == "3"
+    assert [task.id for task in queue.deques["a"]] == ["1", "2"]
+
+
+def test_silent_worker_tasks_are_requeued():
+    queue = FarmQueue(_tasks(3), prefetch=2, heartbeat_timeout=10)
+    task = queue.pull("a", now=0)
+    queue.pull("b", now=0)
+    assert queue.heartbeat("b", "2", now=8)
+
+    assert queue.expire(now=15) == [task.id]
+    # a's leased and prefetched tasks are back, b kept its lease
+    assert [t.id for t in queue.backlog] == ["0", "1"]
+    assert "2" in queue.leases
+    # a's result arrives too late and is dropped
+    assert not queue.complete("a", task.id, {"results": {}})
+    assert queue.pull("b", now=16).id == "0"
+
+
+def test_task_timeout_and_max_expiries():
+    queue = FarmQueue(_tasks(1), task_timeout=5, max_expiries=2)
+    queue.pull("a", now=0)
+    queue.heartbeat("a", "0", now=6)
+    assert queue.expire(now=6) == ["0"]
+    queue.pull("a", now=7)
+    assert queue.expire(now=13) == ["0"]
+    assert queue.is_done()
+    assert queue.failed["0"].attempts == 2
+    assert len(queue.failed["0"].errors) == 2
+
+
+def test_expired_lease_does_not_count_as_failure():
+    # max_failures of the default --retries=0
+    queue = FarmQueue(_tasks(1), heartbeat_timeout=10, max_failures=1)
+    queue.pull("a", now=0)
+    assert queue.expire(now=11) == ["0"]
+    assert not queue.is_done()
+    assert queue.pull("b", now=12).id == "0"
+    assert queue.fail("b", "0", "crashed")
+    assert queue.is_done()
+    assert queue.failed["0"].failures == 1
+    assert queue.failed["0"].expiries == 1
+
+
+def test_live_workers():
+    queue = FarmQueue(_tasks(2), heartbeat_timeout=10)
+    assert not queue.has_live_workers(now=0)
+    queue.pull("a", now=0)
+    # A lease keeps the worker live even past the heartbeat timeout
+    assert queue.has_live_workers(now=20)
+    queue.fail("a", "0", "crashed")
+    assert queue.has_live_workers(now=5)
+    assert not queue.has_live_workers(now=20)
+
+
+def test_server_stops_once_workers_are_gone():
+    queue = FarmQueue(_tasks(2))
+    server = FarmServer(("127.0.0.1", 0), queue, poll_interval=0.05)
+    assert not server.serve_until_done(timeout=30, workers_alive=lambda: False)
+    assert not queue.is_done()
+
+
+def _worker(address, name, collected):
+    client = MessageClient(address, timeout=10)
+    client.request("register", worker=name)
+    while True:
+        response = client.request("pull", worker=name)
+        if response["status"] == "done":
+            return
+        if response["status"] == "wait":
+            continue
+        task = response["task"]
+        collected.append((name, task["label"]))
+        client.request("heartbeat", worker=name, task_id=task["id"])
+        client.request(
+            "result", worker=name, task_id=task["id"], result={"label": task["label"]}
+        )
+
+
+def test_server_on_loopback():
+    queue = FarmQueue(_tasks(8))
+    server = FarmServer(("127.0.0.1", 0), queue, poll_interval=0.05)
+    collected = []
+    workers = [
+        threading.Thread(target=_worker, args=(server.address, name, collected))
+        for name in ["a", "b", "c"]
+    ]
+    for worker in workers:
+        worker.start()
+    assert server.serve_until_done(timeout=30)
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert sorted(label for _, label in collected) == sorted(
+        task.label for task in _tasks(8)
+    )
+    assert {task_id: result["label"] for task_id, result in queue.results.items()} == {
+        str(idx): f"task_{idx}" for idx in range(8)
+    }
@@ -0,0 +1,89 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import pytest
+from quark_utility import *
+
+
+@pytest.fixture
+def config():
+    return BenchmarkConfig(
+        label="fingerprint_test",
+        experiment=ExperimentConfig(
+            executor=ExecutorConfig(
+                framework=FrameworkEnum.TORCH,
+                device=DeviceEnum.CPU,
+            ),
+            run_mode=RunModeEnum.INFERENCE,
+            timer=TimerEnum.PYTHON,
+        ),
+        workload=ModelConfig(
+            framework=FrameworkEnum.TORCH,
+            granularity=GranularityEnum.MODEL,
+            model=ModelEnum.RESNET18,
+        ),
+        dataset=SyntheticDatasetConfig(
+            source=DataSourceEnum.SYNTHETIC,
+            input_shape=[3, 224, 224],
+            batch_size=32,
+            dtype=DtypeEnum.FLOAT32,
+        ),
+    )
+
+
+def test_fingerprint_is_stable(config):
+    environment = collect_environment()
+    reordered = BenchmarkConfig.model_validate(
+        dict(reversed(list(config.model_dump().items())))
+    )
+    assert task_fingerprint(config, environment) == task_fingerprint(
+        reordered, environment
+    )
+
+
+def test_fingerprint_tracks_config_and_environment(config):
+    environment = collect_environment()
+    baseline = task_fingerprint(config, environment)
+
+    changed = config.model_copy(deep=True)
+    changed.dataset.batch_size = 64
+    assert task_fingerprint(changed, environment) != baseline
+
+    upgraded = dict(environment, packages={**environment["packages"], "torch": "9.9"})
+    assert task_fingerprint(config, upgraded) != baseline
+
+
+def test_fingerprint_tracks_sampling(config):
+    environment = collect_environment()
+    baseline = task_fingerprint(config, environment)
+    assert "sampling" not in canonical_config(config)
+
+    adaptive = config.model_copy(deep=True)
+    adaptive.experiment.sampling = SamplingConfig(target_precision=0.01)
+    assert task_fingerprint(adaptive, environment) != baseline
+
+
+def test_fingerprint_tracks_execution_mode(config):
+    environment = collect_environment()
+    baseline = task_fingerprint(config, environment)
+    # Eager tasks keep the fingerprints they had before execution modes
+    assert "execution_mode" not in canonical_config(config)
+
+    compiled = config.model_copy(deep=True)
+    compiled.experiment.executor.execution_mode = ExecutionModeEnum.COMPILE
+    assert task_fingerprint(compiled, environment) != baseline
+
+
+@pytest.mark.parametrize(
+    "duration, seconds",
+    [("90", 90), ("90s", 90), ("2h", 7200), ("1h30m", 5400), ("7d", 604800)],
+)
+def test_parse_duration(duration, seconds):
+    assert parse_duration(duration) == seconds
+
+
+@pytest.mark.parametrize(
+    "duration", ["", "soon", "2x", "1h-", "1.2.3s", ".5h", "1..2h", "1hm", "h30m"]
+)
+def test_parse_duration_rejects_garbage(duration):
+    with pytest.raises(ValueError):
+        parse_duration(duration)
@@ -0,0 +1,75 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import os
+
+import pytest
+from quark_utility import *
+
+
+@pytest.fixture
+def journal(tmpdir):
+    journal = SweepJournal("sweep-1", "experiments", "", directory=str(tmpdir))
+    journal.add("a.yml", "a", TaskStatusEnum.PENDING)
+    journal.add("b.yml", "b", TaskStatusEnum.PENDING)
+    journal.add("c.yml", "c", TaskStatusEnum.UP_TO_DATE)
+    journal.save()
+    return journal
+
+
+def test_transitions_are_written_through(journal, tmpdir):
+    journal.start("a.yml")
+    journal.finish("a.yml")
+    journal.start("b.yml")
+
+    # The coordinator died while b was running
+    reloaded = SweepJournal.load("sweep-1", directory=str(tmpdir))
+    assert reloaded.config_dir == "experiments"
+    assert reloaded.status("a.yml") == TaskStatusEnum.DONE
+    assert reloaded.status("b.yml") == TaskStatusEnum.RUNNING
+    assert reloaded.attempts("b.yml") == 1
+    assert reloaded.failures("b.yml") == 0
+    assert reloaded.unfinished() == ["b.yml"]
+    assert reloaded.status("d.yml") == TaskStatusEnum.UNKNOWN
+    assert not [name for name in os.listdir(str(tmpdir)) if name.endswith(".tmp")]
+
+
+def test_failures_keep_attempts_and_errors(journal, tmpdir):
+    for attempt in range(2):
+        journal.start("b.yml")
+        journal.fail("b.yml", f"crash {attempt}")
+    # Registering the task again on resume keeps its history
+    journal.add("b.yml", "b", TaskStatusEnum.PENDING)
+    journal.save()
+
+    reloaded = SweepJournal.load("sweep-1", directory=str(tmpdir))
+    assert reloaded.attempts("b.yml") == 2
+    assert reloaded.failures("b.yml") == 2
+    assert reloaded.tasks["b.yml"]["errors"] == ["crash 0", "crash 1"]
+    assert reloaded.counts() == {"pending": 2, "up_to_date": 1}
+
+
+@pytest.mark.parametrize("retries", [0, 1])
+def test_resume_reruns_interrupted_tasks(journal, tmpdir, retries):
+    from types import SimpleNamespace
+
+    from quark.coordinator.coordinator import BenchCoordinator
+
+    journal.start("a.yml")
+    journal.fail("a.yml", "crash")
+    # The coordinator died while b was running
+    journal.start("b.yml")
+
+    coordinator = BenchCoordinator.__new__(BenchCoordinator)
+    coordinator.arguments = SimpleNamespace(retries=retries)
+    coordinator.journal = SweepJournal.load("sweep-1", directory=str(tmpdir))
+    coordinator.labels = {"a.yml": "a", "b.yml": "b", "c.yml": "c"}
+    coordinator.sweep_id = "sweep-1"
+    coordinator.failures = []
+    assert coordinator.is_resumable("b.yml")
+    assert coordinator.is_resumable("a.yml") == (retries > 0)
+    assert not coordinator.is_resumable("c.yml")
+
+
+def test_load_missing_sweep(tmpdir):
+    with pytest.raises(ValueError):
+        SweepJournal.load("missing", directory=str(tmpdir))
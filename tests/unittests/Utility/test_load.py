@@ -0,0 +1,85 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import numpy as np
+import pytest
+from quark_utility import *
+
+
+@pytest.mark.parametrize(
+    "arrival", [ArrivalEnum.CONSTANT, ArrivalEnum.POISSON, ArrivalEnum.BURSTY]
+)
+def test_arrival_times_match_the_offered_rate(arrival):
+    times = arrival_times(arrival, rate=200.0, duration=50.0, burst_size=4)
+    assert np.all(np.diff(times) >= 0)
+    assert times[0] >= 0 and times[-1] < 50.0
+    assert len(times) == pytest.approx(200.0 * 50.0, rel=0.05)
+
+
+def test_arrival_processes_differ_in_spread():
+    gaps = {
+        arrival: np.diff(arrival_times(arrival, rate=100.0, duration=20.0))
+        for arrival in (ArrivalEnum.CONSTANT, ArrivalEnum.POISSON, ArrivalEnum.BURSTY)
+    }
+    assert np.std(gaps[ArrivalEnum.CONSTANT]) < 1e-9
+    # Exponential gaps have a coefficient of variation of 1
+    assert np.std(gaps[ArrivalEnum.POISSON]) / np.mean(
+        gaps[ArrivalEnum.POISSON]
+    ) == pytest.approx(1.0, abs=0.1)
+    # A burst issues its requests at once
+    assert np.mean(gaps[ArrivalEnum.BURSTY] == 0) == pytest.approx(7 / 8, abs=0.01)
+
+
+def test_trace_replay_is_scaled_to_the_rate(tmpdir):
+    trace_file = tmpdir.join("trace.csv")
+    trace_file.write("timestamp,size\n# comment\n10.0,1\n10.5,1\n\n11.0,1\n12.0,1\n")
+    trace = load_trace(str(trace_file))
+    np.testing.assert_allclose(trace, [0.0, 0.5, 1.0, 2.0])
+
+    # The trace has 4 requests over 2 seconds, replay it twice as fast
+    np.testing.assert_allclose(
+        arrival_times(ArrivalEnum.TRACE, 4.0, 10.0, trace=trace), trace / 2.0
+    )
+    np.testing.assert_allclose(
+        arrival_times(ArrivalEnum.TRACE, 1.0, 3.0, trace=trace), [0.0, 1.0, 2.0]
+    )
+    with pytest.raises(ValueError):
+        arrival_times(ArrivalEnum.TRACE, 1.0, 3.0)
+
+
+def test_summarize_load_counts_queueing_and_drops():
+    scheduled = np.array([0.0, 0.1, 0.2, 0.3])
+    started = np.array([0.0, 0.15, 0.3, np.nan])
+    finished = np.array([0.1, 0.25, 0.4, np.nan])
+    level = summarize_load(10.0, scheduled, scheduled, started, finished)
+
+    assert (level.requests, level.completed, level.dropped) == (4, 3, 1)
+    assert level.arrival_rate == pytest.approx(4 / 0.3)
+    assert level.achieved_rate == pytest.approx(3 / 0.4)
+    level = summarize_load(10.0, scheduled, scheduled, started, finished, -0.1, 0.6)
+    assert level.arrival_rate == pytest.approx(4 / 0.6)
+    assert level.achieved_rate == pytest.approx(3 / 0.6)
+    assert level.latency["p50"] == pytest.approx(0.15)
+    assert level.queueing["p50"] == pytest.approx(0.05)
+    assert level.service["p50"] == pytest.approx(0.1)
+    assert level.generator_lag_p99 == 0.0
+
+
+def _level(offered, achieved, p99):
+    return LoadLevel(offered, offered, achieved, 100, 100, 0, latency={"p99": p99})
+
+
+def test_find_knee():
+    levels = [
+        _level(100, 100, 0.010),
+        _level(400, 399, 0.012),
+        _level(200, 200, 0.011),
+        _level(800, 600, 0.500),
+    ]
+    knee = find_knee(levels)
+    assert (knee.rate, knee.saturated_rate, knee.reason) == (400, 800, "throughput")
+
+    knee = find_knee(levels[:3] + [_level(800, 800, 0.050)])
+    assert (knee.rate, knee.reason) == (400, "latency")
+
+    assert find_knee(levels[:3]).reason == "not_saturated"
+    assert find_knee([_level(100, 50, 0.01)]).rate is None
@@ -0,0 +1,168 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import numpy as np
+import pytest
+import yaml
+from quark_utility import *
+
+TASK_TEMPLATE = """
+label: {label}
+workload:
+  framework: torch
+  granularity: operator
+  operator: conv2d
+
+experiment:
+  run_mode: inference
+  executor:
+    framework: torch
+    device: cpu
+  timer: python
+
+dataset:
+  source: synthetic
+  input_shape: [3, 32, 32]
+  batch_size: 1
+  dtype: float32
+"""
+
+
+def _timings(median, seed, count=40):
+    rng = np.random.default_rng(seed)
+    return median * (1.0 + 0.02 * rng.standard_normal(count))
+
+
+def _append(store, label, samples, sweep_id):
+    config = BenchmarkConfig.model_validate(
+        yaml.safe_load(TASK_TEMPLATE.format(label=label))
+    )
+    record = Record(config=config, summary={"median_time": float(np.median(samples))})
+    return store.append(record, samples, run_info={"sweep_id": sweep_id})
+
+
+def test_rank_data_averages_ties():
+    np.testing.assert_array_equal(rank_data([3.0, 1.0, 3.0, 2.0]), [3.5, 1, 3.5, 2])
+
+
+def test_mann_whitney_u_direction():
+    slow, fast = _timings(1.2, seed=0), _timings(1.0, seed=1)
+    assert mann_whitney_u(slow, fast, alternative="greater").p_value < 1e-6
+    assert mann_whitney_u(slow, fast, alternative="less").p_value > 0.99
+    assert mann_whitney_u(fast, fast, alternative="two-sided").p_value > 0.9
+    assert mann_whitney_u([1.0] * 5, [1.0] * 5).p_value == 1.0
+    with pytest.raises(ValueError):
+        mann_whitney_u([], [1.0])
+
+
+def test_bootstrap_ratio_ci_brackets_ratio():
+    ratio, low, high = bootstrap_ratio_ci(_timings(1.5, seed=0), _timings(1.0, seed=1))
+    assert low < ratio < high
+    assert 1.4 < low and high < 1.6
+
+
+def test_median_ci_brackets_median():
+    samples = _timings(1.0, seed=0)
+    low, high = median_ci(samples)
+    assert low < np.median(samples) < high
+    assert relative_half_width(samples) < relative_half_width(samples[:20])
+    assert relative_half_width([1.0]) == float("inf")
+
+
+def test_is_steady():
+    cold = [5.0, 4.0, 3.0, 2.0, 1.5, 1.2, 1.1, 1.05, 1.0, 1.0]
+    assert not is_steady(cold, window=5, tolerance=0.02)
+    assert not is_steady(cold[-6:], window=5, tolerance=0.02)
+    assert is_steady(cold + [1.0] * 5, window=5, tolerance=0.02)
+    # Noise without a trend is steady even though the medians differ
+    assert is_steady(_timings(1.0, seed=0)[:10], window=5, tolerance=0.0)
+
+
+@pytest.mark.parametrize(
+    "p, df, expected",
+    [(0.975, 1, 12.7062), (0.975, 5, 2.5706), (0.995, 10, 3.1693), (0.9, 30, 1.3104)],
+)
+def test_t_quantile_matches_tables(p, df, expected):
+    assert t_quantile(p, df) == pytest.approx(expected, abs=1e-4)
+    assert t_quantile(1.0 - p, df) == pytest.approx(-expected, abs=1e-4)
+
+
+def test_t_and_bootstrap_ci_widen_with_confidence():
+    samples = _timings(1.0, seed=0)
+    low90, high90 = t_ci(samples, 0.90)
+    low99, high99 = t_ci(samples, 0.99)
+    assert low99 < low90 < np.mean(samples) < high90 < high99
+    low90, high90 = bootstrap_ci(samples, confidence=0.90)
+    low99, high99 = bootstrap_ci(samples, confidence=0.99)
+    assert low99 <= low90 < np.median(samples) < high90 <= high99
+    assert t_ci([1.0]) == (1.0, 1.0)
+
+
+def test_robust_statistics_resist_outliers():
+    samples = np.concatenate([_timings(1.0, seed=0), [50.0, 80.0, -10.0]])
+    assert median_abs_deviation(samples) < 0.05
+    assert median_abs_deviation(samples, scale=1.4826) < np.std(samples)
+    assert trimmed_mean(samples, 0.1) == pytest.approx(1.0, rel=0.01)
+    assert trimmed_mean([1.0, 2.0, 3.0], 0.0) == 2.0
+    with pytest.raises(ValueError):
+        trimmed_mean(samples, 0.5)
+
+
+def test_classify_outliers():
+    samples = list(range(1, 21)) + [40.0, 60.0, -30.0]
+    outliers = classify_outliers(samples)
+    assert (outliers.q1, outliers.q3) == (5.5, 16.5)
+    assert outliers.low_severe == 1 and outliers.low_mild == 0
+    assert outliers.high_mild == 1 and outliers.high_severe == 1
+    assert outliers.total == 3
+    assert classify_outliers([1.0] * 10).total == 0
+
+
+@pytest.mark.parametrize(
+    "median, verdict",
+    [
+        (1.2, "regression"),
+        (1.0, "unchanged"),
+        (1.02, "unchanged"),
+        (0.8, "improvement"),
+    ],
+)
+def test_compare_samples_verdicts(median, verdict):
+    policy = RegressionPolicy(threshold=0.05)
+    result = compare_samples(_timings(median, seed=2), _timings(1.0, seed=3), policy)
+    assert result["verdict"] == verdict
+
+
+def test_check_regressions_against_tag(tmpdir):
+    with ResultsStore(str(tmpdir.join(ResultsStore.DEFAULT_NAME))) as store:
+        baseline = {
+            label: _append(store, label, _timings(1.0, seed=idx), "base")
+            for idx, label in enumerate(["conv", "relu"])
+        }
+        store.tag("main", list(baseline.values()))
+        current = {
+            "conv": _append(store, "conv", _timings(1.3, seed=5), "new"),
+            "relu": _append(store, "relu", _timings(1.0, seed=6), "new"),
+            "pool": _append(store, "pool", _timings(1.0, seed=7), "new"),
+        }
+
+        baseline_runs = store.resolve("main")
+        assert {
+            label: run["run_id"] for label, run in baseline_runs.items()
+        } == baseline
+        assert store.resolve("base").keys() == baseline_runs.keys()
+        assert store.resolve(current["pool"][:12])["pool"]["run_id"] == current["pool"]
+        with pytest.raises(ValueError):
+            store.resolve("unknown")
+
+        verdict = check_regressions(
+            store, store.resolve("new"), baseline_runs, RegressionPolicy()
+        )
+
+    assert verdict["status"] == "fail"
+    assert verdict["regressions"] == ["conv"]
+    verdicts = {task["label"]: task["verdict"] for task in verdict["tasks"]}
+    assert verdicts == {
+        "conv": "regression",
+        "relu": "unchanged",
+        "pool": "no_baseline",
+    }
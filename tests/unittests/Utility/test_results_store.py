@@ -0,0 +1,112 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import json
+import multiprocessing
+
+import numpy as np
+import pytest
+import yaml
+from quark_utility import *
+
+TASK_TEMPLATE = """
+label: {label}
+workload:
+  framework: torch
+  granularity: operator
+  operator: {operator}
+
+experiment:
+  run_mode: inference
+  executor:
+    framework: torch
+    device: cpu
+  timer: python
+
+dataset:
+  source: synthetic
+  input_shape: [3, 32, 32]
+  batch_size: 1
+  dtype: float32
+"""
+
+
+def _record(label, operator="conv2d", median=0.5):
+    config = BenchmarkConfig.model_validate(
+        yaml.safe_load(TASK_TEMPLATE.format(label=label, operator=operator))
+    )
+    return Record(config=config, summary={"median_time": median, "samples": 3})
+
+
+@pytest.fixture
+def store_path(tmpdir):
+    return str(tmpdir.join("benchmarks", ResultsStore.DEFAULT_NAME))
+
+
+def test_append_keeps_config_and_samples(store_path):
+    with ResultsStore(store_path) as store:
+        run_id = store.append(
+            _record("conv"),
+            [0.1, 0.2, 0.3],
+            environment={"python": "3.11"},
+            run_info={"sweep_id": "s1", "fingerprint": "abc"},
+        )
+        run = store.get(run_id)
+        assert run["label"] == "conv"
+        assert run["framework"] == "torch"
+        assert run["model"] == "conv2d"
+        assert run["device"] == "cpu"
+        assert run["sweep_id"] == "s1"
+        assert run["fingerprint"] == "abc"
+        assert run["config"]["dataset"]["batch_size"] == 1
+        assert run["environment"] == {"python": "3.11"}
+        np.testing.assert_array_equal(store.samples(run_id), [0.1, 0.2, 0.3])
+
+
+def test_runs_are_appended_not_replaced(store_path):
+    with ResultsStore(store_path) as store:
+        first = store.append(_record("conv", median=1.0), [1.0])
+        second = store.append(_record("conv", median=2.0), [2.0])
+        store.append(_record("relu", operator="relu"), [3.0])
+
+        runs = store.query(label="conv")
+        assert [run["run_id"] for run in runs] == [second, first]
+        assert store.latest("conv")["summary"]["median_time"] == 2.0
+        assert [run["label"] for run in store.query(model="relu")] == ["relu"]
+        assert store.query(since=runs[0]["timestamp"] + 1) == []
+        with pytest.raises(ValueError):
+            store.query(config="conv")
+
+
+def test_export_json_is_latest_per_label(store_path, tmpdir):
+    with ResultsStore(store_path) as store:
+        store.append(_record("conv", median=1.0), [1.0])
+        latest = store.append(_record("conv", median=2.0), [2.0])
+        view_file = str(tmpdir.join("view.json"))
+        store.export_json(view_file)
+
+    with open(view_file) as file:
+        view = json.load(file)
+    assert view == {"conv": {"median_time": 2.0, "samples": 3, "run_id": latest}}
+
+
+def _append_runs(store_path, worker, count):
+    with ResultsStore(store_path) as store:
+        for idx in range(count):
+            store.append(_record(f"worker_{worker}"), [float(idx)])
+
+
+def test_concurrent_writers(store_path):
+    ResultsStore(store_path).close()
+    workers = [
+        multiprocessing.Process(target=_append_runs, args=(store_path, worker, 20))
+        for worker in range(4)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    with ResultsStore(store_path) as store:
+        assert len(store.query()) == 80
+        assert len(store.query(label="worker_2")) == 20
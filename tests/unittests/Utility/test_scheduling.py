@@ -0,0 +1,141 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import pytest
+import yaml
+from quark_utility import *
+
+TASK_TEMPLATE = """
+label: {label}
+tags: {tags}
+workload:
+  framework: torch
+  granularity: model
+  model: {model}
+
+experiment:
+  run_mode: inference
+  executor:
+    framework: torch
+    device: cpu
+  timer: python
+
+dataset:
+  source: synthetic
+  input_shape: [3, 224, 224]
+  batch_size: {batch_size}
+  dtype: float32
+"""
+
+
+def _config(label, model="resnet18", batch_size=1, tags=()):
+    return BenchmarkConfig.model_validate(
+        yaml.safe_load(
+            TASK_TEMPLATE.format(
+                label=label, model=model, batch_size=batch_size, tags=list(tags)
+            )
+        )
+    )
+
+
+def _append(store, config, wall_time, fingerprint=None, sweep_id="s"):
+    record = Record(config=config, summary={"wall_time": wall_time})
+    store.append(
+        record, [0.1], run_info={"fingerprint": fingerprint, "sweep_id": sweep_id}
+    )
+
+
+@pytest.fixture
+def store(tmpdir):
+    with ResultsStore(str(tmpdir.join(ResultsStore.DEFAULT_NAME))) as store:
+        yield store
+
+
+def test_tags_do_not_change_fingerprint():
+    environment = {"python": "3.11"}
+    assert task_fingerprint(_config("a"), environment) == task_fingerprint(
+        _config("a", tags=["smoke"]), environment
+    )
+
+
+def test_estimate_from_history_of_fingerprint(store):
+    config = _config("resnet")
+    for sweep_id, wall_time in [("s1", 10.0), ("s2", 12.0), ("s3", 30.0)]:
+        _append(store, config, wall_time, fingerprint="fp", sweep_id=sweep_id)
+
+    estimate = DurationModel(store).estimate(config, "fp")
+    assert estimate.source == "history"
+    assert estimate.seconds == 12.0
+
+
+def test_estimate_from_batch_size_model(store):
+    _append(store, _config("bs1", batch_size=1), 3.0)
+    _append(store, _config("bs4", batch_size=4), 9.0)
+
+    model = DurationModel(store)
+    estimate = model.estimate(_config("bs8", batch_size=8), "new")
+    assert estimate.source == "model"
+    assert estimate.seconds == pytest.approx(17.0)
+
+    unseen = model.estimate(_config("vgg", model="vgg16"), "new")
+    assert unseen.source == "default"
+    assert unseen.seconds == DurationModel.DEFAULT_SECONDS
+
+
+def _tasks():
+    return [
+        ScheduledTask("a.yml", "train", TaskEstimate(600.0, "history"), ["nightly"]),
+        ScheduledTask("b.yml", "relu", TaskEstimate(5.0, "history")),
+        ScheduledTask("c.yml", "conv", TaskEstimate(20.0, "model"), ["smoke"]),
+    ]
+
+
+def test_schedule_policies():
+    labels = lambda tasks: [task.label for task in tasks]
+    planned, deferred = schedule_tasks(_tasks(), SchedulePolicyEnum.FIFO)
+    assert labels(planned) == ["train", "relu", "conv"] and deferred == []
+
+    planned, _ = schedule_tasks(_tasks(), SchedulePolicyEnum.SHORTEST)
+    assert labels(planned) == ["relu", "conv", "train"]
+
+    planned, _ = schedule_tasks(
+        _tasks(), SchedulePolicyEnum.PRIORITY, priority_tags=["nightly", "smoke"]
+    )
+    assert labels(planned) == ["train", "conv", "relu"]
+
+    with pytest.raises(ValueError):
+        schedule_tasks(_tasks(), SchedulePolicyEnum.UNKNOWN)
+
+
+def test_time_budget_defers_tasks():
+    planned, deferred = schedule_tasks(
+        _tasks(), SchedulePolicyEnum.FIFO, time_budget=parse_duration("1m")
+    )
+    # train does not fit, the shorter tasks behind it still do
+    assert [task.label for task in planned] == ["relu", "conv"]
+    assert [task.label for task in deferred] == ["train"]
+
+    # relu and train share a worker, conv runs on the other one
+    planned, deferred = schedule_tasks(
+        _tasks(), SchedulePolicyEnum.SHORTEST, time_budget=610, workers=2
+    )
+    assert len(planned) == 3 and deferred == []
+
+
+def test_time_budget_is_per_worker():
+    # A task longer than the budget does not fit, however many workers share it
+    planned, deferred = schedule_tasks(
+        _tasks(), SchedulePolicyEnum.FIFO, time_budget=400, workers=4
+    )
+    assert [task.label for task in planned] == ["relu", "conv"]
+    assert [task.label for task in deferred] == ["train"]
+
+    # Both 300s tasks land on the idle worker, the third one fits on neither
+    tasks = [
+        ScheduledTask(f"{idx}.yml", f"op_{idx}", TaskEstimate(300.0, "history"))
+        for idx in range(3)
+    ]
+    planned, deferred = schedule_tasks(
+        tasks, SchedulePolicyEnum.FIFO, time_budget=400, workers=2
+    )
+    assert [task.label for task in planned] == ["op_0", "op_1"]
+    assert [task.label for task in deferred] == ["op_2"]
@@ -0,0 +1,69 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import json
+
+import numpy as np
+import pytest
+from quark_utility import *
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(0)
+    return rng.lognormal(mean=-9.0, sigma=0.3, size=20000)
+
+
+def test_moments_are_exact(samples):
+    stats = StreamingStats.from_values(samples.tolist())
+    assert stats.count == len(samples)
+    assert stats.mean == pytest.approx(samples.mean(), rel=1e-9)
+    assert stats.std == pytest.approx(samples.std(ddof=1), rel=1e-9)
+    assert (stats.min, stats.max) == (samples.min(), samples.max())
+
+
+@pytest.mark.parametrize("q", [0.0, 0.5, 0.9, 0.99, 0.999, 1.0])
+def test_quantiles_within_accuracy(samples, q):
+    stats = StreamingStats.from_values(samples.tolist(), relative_accuracy=0.001)
+    expected = np.quantile(samples, q, method="lower")
+    assert stats.quantile(q) == pytest.approx(expected, rel=0.002)
+
+
+def test_memory_is_bounded(samples):
+    stats = StreamingStats(reservoir_size=100)
+    for _ in range(5):
+        stats.extend(samples.tolist())
+    assert stats.count == 5 * len(samples)
+    assert len(stats.reservoir) == 100
+    # Buckets only depend on the range of the values, not on their number
+    assert len(stats.buckets) == len(StreamingStats.from_values(samples).buckets)
+
+
+def test_merge_across_processes(samples):
+    halves = np.array_split(samples, 2)
+    shards = [
+        StreamingStats.from_values(half.tolist(), reservoir_size=50) for half in halves
+    ]
+    # Sketches travel between processes as JSON
+    shipped = StreamingStats.from_dict(
+        json.loads(json.dumps(shards[1].to_dict(include_reservoir=True)))
+    )
+    merged = shards[0].merge(shipped)
+    whole = StreamingStats.from_values(samples.tolist())
+
+    assert merged.count == whole.count
+    assert merged.mean == pytest.approx(whole.mean, rel=1e-9)
+    assert merged.variance == pytest.approx(whole.variance, rel=1e-9)
+    assert merged.buckets == whole.buckets
+    assert merged.quantile(0.99) == whole.quantile(0.99)
+    assert len(merged.reservoir) == 50
+
+    with pytest.raises(ValueError):
+        merged.merge(StreamingStats(relative_accuracy=0.01))
+
+
+def test_non_positive_values():
+    stats = StreamingStats.from_values([0.0, 0.0, 1.0, 2.0])
+    assert stats.quantile(0.0) == 0.0
+    assert stats.quantile(1.0) == 2.0
+    with pytest.raises(ValueError):
+        StreamingStats().quantile(0.5)
@@ -0,0 +1,75 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import pytest
+from quark_utility import *
+
+
+@pytest.fixture
+def sweep_config_dict():
+    return {
+        "label": "sweep_test",
+        "workload": {"framework": "torch", "granularity": "model", "model": "resnet18"},
+        "experiment": {
+            "run_mode": "inference",
+            "executor": {"framework": "torch", "device": "cpu"},
+            "timer": "python",
+        },
+        "dataset": {
+            "source": "synthetic",
+            "input_shape": [3, 224, 224],
+            "batch_size": 1,
+            "dtype": "float32",
+        },
+        "sweep": {
+            "axes": {
+                "dataset.batch_size": [1, 8, 32],
+                "experiment.run_mode": ["inference", "training"],
+            }
+        },
+    }
+
+
+def test_sweep_product(sweep_config_dict):
+    expanded = BenchmarkConfig.model_validate(sweep_config_dict).expand()
+    assert len(expanded) == 6
+
+    point, config = expanded[-1]
+    assert point == {"dataset.batch_size": 32, "experiment.run_mode": "training"}
+    assert config.dataset.batch_size == 32
+    assert config.experiment.run_mode == RunModeEnum.TRAINING
+    assert config.label == "sweep_test@batch_size=32,run_mode=training"
+    assert config.sweep is None
+
+
+def test_sweep_zip(sweep_config_dict):
+    sweep_config_dict["sweep"] = {
+        "mode": "zip",
+        "axes": {
+            "dataset.batch_size": [1, 8],
+            "dataset.input_shape": [[3, 32, 32], [3, 64, 64]],
+        },
+    }
+    expanded = BenchmarkConfig.model_validate(sweep_config_dict).expand()
+    assert [(c.dataset.batch_size, c.dataset.input_shape) for _, c in expanded] == [
+        (1, [3, 32, 32]),
+        (8, [3, 64, 64]),
+    ]
+    assert expanded[0][1].label == "sweep_test@batch_size=1,input_shape=3x32x32"
+
+
+def test_sweep_zip_requires_equal_lengths(sweep_config_dict):
+    sweep_config_dict["sweep"]["mode"] = "zip"
+    with pytest.raises(ValidationError):
+        BenchmarkConfig.model_validate(sweep_config_dict)
+
+
+def test_sweep_rejects_unknown_axis(sweep_config_dict):
+    sweep_config_dict["sweep"]["axes"] = {"dataset.batch": [1, 2]}
+    with pytest.raises(ValueError):
+        BenchmarkConfig.model_validate(sweep_config_dict).expand()
+
+
+def test_config_without_sweep_expands_to_itself(sweep_config_dict):
+    del sweep_config_dict["sweep"]
+    config = BenchmarkConfig.model_validate(sweep_config_dict)
+    assert config.expand() == [({}, config)]
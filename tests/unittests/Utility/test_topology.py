@@ -0,0 +1,85 @@
+# RUN: python -m pytest -q -v --tb=short %s
+
+import os
+import sys
+
+import pytest
+from quark_utility import *
+
+# Two sockets with 4 cores each, hyperthread siblings are numbered core + 8
+CPUINFO = "\n\n".join(
+    f"processor\t: {cpu}\nphysical id\t: {(cpu % 8) // 4}\ncore id\t\t: {cpu % 4}"
+    for cpu in range(16)
+)
+
+
+@pytest.fixture
+def dual_socket(tmpdir):
+    for node, cpulist in [(0, "0-3,8-11"), (1, "4-7,12-15")]:
+        tmpdir.mkdir(f"node{node}").join("cpulist").write(cpulist + "\n")
+    tmpdir.join("cpuinfo").write(CPUINFO + "\n")
+    nodes = read_numa_nodes(str(tmpdir), allowed=range(16))
+    core_ids = read_core_ids(str(tmpdir.join("cpuinfo")))
+    return nodes, core_ids
+
+
+def test_read_topology(dual_socket):
+    nodes, core_ids = dual_socket
+    assert [(node.id, node.cpus) for node in nodes] == [
+        (0, [0, 1, 2, 3, 8, 9, 10, 11]),
+        (1, [4, 5, 6, 7, 12, 13, 14, 15]),
+    ]
+    assert core_ids[9] == (0, 1)
+    assert core_ids[13] == (1, 1)
+
+
+def test_missing_sysfs_is_one_node(tmpdir):
+    nodes = read_numa_nodes(str(tmpdir.join("missing")), allowed=[0, 1, 2])
+    assert [(node.id, node.cpus) for node in nodes] == [(0, [0, 1, 2])]
+
+
+def test_place_jobs_never_spans_nodes(dual_socket):
+    nodes, core_ids = dual_socket
+    assert [p.to_dict() for p in place_jobs(1, nodes, core_ids)] == [
+        {"numa_node": 0, "cpus": "0-3,8-11"}
+    ]
+
+    placements = place_jobs(4, nodes, core_ids)
+    assert [p.node for p in placements] == [0, 1, 0, 1]
+    # Each slot holds two whole cores with their siblings
+    assert placements[0].cpus == [0, 1, 8, 9]
+    assert placements[1].cpus == [4, 5, 12, 13]
+
+    placements = place_jobs(3, nodes, core_ids)
+    assert all(len(p.cpus) == 4 for p in placements)
+    used = [cpu for p in placements for cpu in p.cpus]
+    assert len(used) == len(set(used))
+
+    with pytest.raises(ValueError):
+        place_jobs(9, nodes, core_ids)
+
+
+@pytest.mark.parametrize(
+    "cores, jobs, expected",
+    [
+        # An odd number of cores per slot still keeps siblings together
+        (6, 2, [[0, 1, 2, 6, 7, 8], [3, 4, 5, 9, 10, 11]]),
+        # Three cores do not split in two, one of them stays idle
+        (3, 2, [[0, 3], [1, 4]]),
+    ],
+)
+def test_place_jobs_keeps_siblings_together(cores, jobs, expected):
+    # One socket, hyperthread siblings are numbered core + cores
+    node = NumaNode(id=0, cpus=list(range(2 * cores)))
+    core_ids = {cpu: (0, cpu % cores) for cpu in range(2 * cores)}
+    placements = place_jobs(jobs, [node], core_ids)
+    assert [p.cpus for p in placements] == expected
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="set_mempolicy is Linux only")
+def test_current_placement_after_binding():
+    node = read_numa_nodes()[0]
+    assert bind_memory_to_node(node.id)
+    placement = current_placement()
+    assert node.id in placement["numa_nodes"]
+    assert parse_cpu_list(placement["cpus"]) == available_cpus()
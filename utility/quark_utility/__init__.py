@@ -1,9 +1,22 @@
+from .affinity import *
 from .config import *
+from .config_index import *
 from .enum import *
 from .error import *
+from .farm import *
+from .fingerprint import *
+from .ipc import *
+from .journal import *
+from .load import *
 from .platform import *
+from .regression import *
+from .results_store import *
 from .sandbox import *
+from .scheduling import *
 from .serialise import *
+from .stats import *
+from .streaming import *
 from .string import *
+from .topology import *
 from .trace import *
 from .validator import *
@@ -0,0 +1,76 @@
+import os
+import sys
+from typing import List, Optional, Sequence
+
+from .trace import *
+
+__all__ = [
+    "THREAD_ENV_VARS",
+    "available_cpus",
+    "format_cpu_list",
+    "parse_cpu_list",
+    "pin_to_cpus",
+    "configured_num_threads",
+]
+
+# Environment variables read by the threading runtimes used by the frameworks
+THREAD_ENV_VARS = ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"]
+
+
+def available_cpus() -> List[int]:
+    """Return the sorted list of CPUs the current process is allowed to run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def format_cpu_list(cpus: Sequence[int]) -> str:
+    """Format CPUs in the kernel cpulist syntax, e.g. [0, 1, 2, 5] -> '0-2,5'."""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(
+        str(first) if first == last else f"{first}-{last}" for first, last in ranges
+    )
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """Parse the kernel cpulist syntax, e.g. '0-2,5' -> [0, 1, 2, 5]."""
+    cpus = []
+    for chunk in text.strip().split(","):
+        if not chunk:
+            continue
+        if "-" in chunk:
+            first, last = chunk.split("-")
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(chunk))
+    return sorted(set(cpus))
+
+
+def pin_to_cpus(cpus: Sequence[int]):
+    """
+    Pin the current process to `cpus` and size the framework thread pools to match.
+
+    Child processes inherit both the affinity mask and the environment, so pinning
+    a worker before it launches `quark-runtime` confines the whole task.
+    """
+    TRACE(f"Pin process {os.getpid()} to CPUs {format_cpu_list(cpus)}")
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(len(cpus))
+
+    # torch only reads OMP_NUM_THREADS on first use, resize it if already loaded
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(len(cpus))
+
+
+def configured_num_threads() -> Optional[int]:
+    """Return the thread count requested through OMP_NUM_THREADS, if any."""
+    value = os.environ.get("OMP_NUM_THREADS")
+    return int(value) if value else None
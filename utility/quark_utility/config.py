@@ -1,19 +1,27 @@
 import ast
+import copy
 import itertools
 import json
 import re
 from abc import ABC, abstractmethod
 from dataclasses import asdict, dataclass, field
+from enum import Enum
 from pprint import pformat
 from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 
 import numpy as np
 import yaml
-from pydantic import (BaseModel, ValidationError, field_validator,
-                      root_validator)
+from pydantic import (
+    BaseModel,
+    ValidationError,
+    field_validator,
+    model_validator,
+    root_validator,
+)
 
 from .enum import *
 from .serialise import *
+from .trace import *
 
 
 class OperatorConfig(BaseModel):
@@ -53,11 +61,83 @@ class FusedOperatorConfig(BaseModel):
 
 
 # ---------------------------
-# Define Executor configuration as a nested model
+# Define Executor configuration as a nested model:
+# execution_mode selects how the torch executor runs the model: eager under
+# no_grad, under torch.inference_mode, traced or scripted and frozen with
+# TorchScript, through torch.compile with the options of `compile`, or eager
+# with model and inputs in the channels_last memory format.
+# Model weights take the dtype of the dataset. With `autocast`, forward and loss
+# run under torch.autocast in that reduced precision instead, weights staying
+# float32 whatever the dataset dtype. `drift` compares the output of the prepared model with an eager
+# float32 reference once, before timing.
 # ---------------------------
+class CompileConfig(BaseModel):
+    backend: str = "inductor"
+    # None is the default mode of torch.compile
+    mode: Optional[
+        Literal[
+            "default",
+            "reduce-overhead",
+            "max-autotune",
+            "max-autotune-no-cudagraphs",
+        ]
+    ] = None
+    fullgraph: bool = False
+
+
+class DriftConfig(BaseModel):
+    # Largest absolute error allowed, relative to the largest reference output
+    tolerance: float = 1e-2
+
+    @field_validator("tolerance")
+    def check_tolerance(cls, v):
+        if v <= 0:
+            raise ValueError("drift tolerance must be positive")
+        return v
+
+
 class ExecutorConfig(BaseModel):
     framework: FrameworkEnum
     device: DeviceEnum
+    execution_mode: ExecutionModeEnum = ExecutionModeEnum.EAGER
+    compile: Optional[CompileConfig] = None
+    autocast: Optional[DtypeEnum] = None
+    drift: Optional[DriftConfig] = None
+
+    @field_validator("autocast")
+    def check_autocast(cls, v):
+        if v not in (None, DtypeEnum.BFLOAT16, DtypeEnum.FLOAT16):
+            raise ValueError("autocast needs a reduced precision, bfloat16 or float16")
+        return v
+
+    @field_validator("execution_mode")
+    def check_execution_mode(cls, v):
+        if v == ExecutionModeEnum.UNKNOWN:
+            raise ValueError("Unknown execution_mode")
+        return v
+
+    @model_validator(mode="after")
+    def check_torch_modes(self):
+        if (
+            self.execution_mode != ExecutionModeEnum.EAGER
+            and self.framework != FrameworkEnum.TORCH
+        ):
+            raise ValueError("execution modes other than eager need the torch executor")
+        if (
+            self.compile is not None
+            and self.execution_mode != ExecutionModeEnum.COMPILE
+        ):
+            raise ValueError("compile options need the compile execution_mode")
+        if self.framework != FrameworkEnum.TORCH and (
+            self.autocast is not None or self.drift is not None
+        ):
+            raise ValueError("autocast and drift need the torch executor")
+        if self.autocast is not None and self.execution_mode in (
+            ExecutionModeEnum.TORCHSCRIPT_TRACE,
+            ExecutionModeEnum.TORCHSCRIPT_SCRIPT,
+        ):
+            raise ValueError("autocast is not supported with frozen TorchScript")
+        return self
 
 
 # ---------------------------
@@ -114,6 +194,220 @@ DatasetConfig = Union[SyntheticDatasetConfig, ConcreteDatasetConfig]
 WorkloadConfig = Union[OperatorConfig, ModelConfig, FusedOperatorConfig]
 
 
+# ---------------------------
+# Define Sampling configuration:
+# Without target_precision a task takes repeat_samples timed samples. With it, the
+# timer keeps sampling until the confidence interval of the median is narrower than
+# target_precision relative to the median, or max_samples / max_time is reached.
+# confidence is also the coverage of the intervals reported in the run summary.
+# With auto_warmup, warmup runs until two consecutive windows of warmup_window
+# iterations show the same latency, instead of a fixed warmup_samples.
+# With streaming, samples are accumulated in constant memory and only a reservoir
+# of reservoir_size raw samples is kept, for soak runs of millions of iterations.
+# With autorange, each sample times as many calls as fill min_sample_time seconds
+# and reports the time per call, for operators faster than the timer overhead.
+# ---------------------------
+class SamplingConfig(BaseModel):
+    warmup_samples: int = 5
+    auto_warmup: bool = False
+    warmup_window: int = 5
+    warmup_tolerance: float = 0.02
+    max_warmup_samples: int = 200
+    max_warmup_time: float = 60.0
+    repeat_samples: int = 33
+    target_precision: Optional[float] = None
+    confidence: float = 0.95
+    min_samples: int = 10
+    max_samples: int = 10000
+    # Seconds spent in timed samples before giving up on the target
+    max_time: float = 60.0
+    streaming: bool = False
+    reservoir_size: int = 10000
+    autorange: bool = False
+    min_sample_time: float = 0.001
+
+    @field_validator("warmup_samples")
+    def check_warmup_samples(cls, v):
+        if v < 0:
+            raise ValueError("warmup_samples must not be negative")
+        return v
+
+    @field_validator(
+        "repeat_samples",
+        "min_samples",
+        "max_samples",
+        "max_warmup_samples",
+    )
+    def check_sample_counts(cls, v):
+        if v < 1:
+            raise ValueError("sample counts must be positive")
+        return v
+
+    @field_validator("target_precision")
+    def check_target_precision(cls, v):
+        if v is not None and not 0 < v < 1:
+            raise ValueError("target_precision must be within (0, 1), e.g. 0.01")
+        return v
+
+    @field_validator("confidence")
+    def check_confidence(cls, v):
+        if not 0 < v < 1:
+            raise ValueError("confidence must be within (0, 1)")
+        return v
+
+    @field_validator("warmup_window")
+    def check_warmup_window(cls, v):
+        # Smaller windows are too short for the rank test to ever detect a shift
+        if v < 5:
+            raise ValueError("warmup_window must be at least 5 iterations")
+        return v
+
+    @field_validator("min_sample_time")
+    def check_min_sample_time(cls, v):
+        if v <= 0:
+            raise ValueError("min_sample_time must be positive")
+        return v
+
+    @field_validator("reservoir_size")
+    def check_reservoir_size(cls, v):
+        if v < 0:
+            raise ValueError("reservoir_size must not be negative")
+        return v
+
+    @field_validator("warmup_tolerance")
+    def check_warmup_tolerance(cls, v):
+        if v < 0:
+            raise ValueError("warmup_tolerance must not be negative")
+        return v
+
+    @model_validator(mode="after")
+    def check_sample_bounds(self):
+        if self.min_samples > self.max_samples:
+            raise ValueError("min_samples must not exceed max_samples")
+        if self.auto_warmup and 2 * self.warmup_window > self.max_warmup_samples:
+            raise ValueError("max_warmup_samples must cover two warmup windows")
+        return self
+
+
+# ---------------------------
+# Define Profiler configuration:
+# After timing, the torch timer runs `iterations` more iterations under
+# torch.profiler and stores the top_n ATen operators by self CPU time, plus a
+# Chrome trace next to the results when export_trace is set.
+# ---------------------------
+class ProfilerConfig(BaseModel):
+    iterations: int = 5
+    top_n: int = 20
+    record_shapes: bool = False
+    export_trace: bool = True
+
+    @field_validator("iterations", "top_n")
+    def check_positive(cls, v):
+        if v < 1:
+            raise ValueError("profiler iterations and top_n must be positive")
+        return v
+
+
+# ---------------------------
+# Define Memory configuration:
+# Reads the process RSS from /proc/self/status every `interval` iterations of the
+# timer, and the peak RSS (VmHWM) of the task. With tracemalloc, Python
+# allocations are traced too, which slows down Python-heavy workloads.
+# ---------------------------
+class MemoryConfig(BaseModel):
+    interval: int = 1
+    tracemalloc: bool = False
+
+    @field_validator("interval")
+    def check_interval(cls, v):
+        if v < 1:
+            raise ValueError("memory interval must be positive")
+        return v
+
+
+# ---------------------------
+# Define Load configuration:
+# After the closed-loop timing, requests are issued open-loop from a pool of
+# `workers` threads at each offered load for `duration` seconds, arriving at a
+# constant rate, as a Poisson process, in Poisson spaced bursts of burst_size, or
+# replaying the timestamps of trace_file. Offered loads are `rates` in requests
+# per second, or else load_fractions of the closed-loop capacity 1 / median time.
+# The knee is the last load before throughput falls throughput_tolerance short of
+# the offered load or p99 latency exceeds latency_factor times its lightest value.
+# ---------------------------
+class LoadConfig(BaseModel):
+    arrival: ArrivalEnum = ArrivalEnum.POISSON
+    rates: Optional[List[float]] = None
+    load_fractions: List[float] = [0.25, 0.5, 0.75, 0.9, 1.0, 1.1, 1.25]
+    duration: float = 10.0
+    burst_size: int = 8
+    trace_file: Optional[str] = None
+    workers: int = 1
+    # Seconds to wait for queued requests after the last arrival
+    drain_timeout: float = 10.0
+    throughput_tolerance: float = 0.05
+    latency_factor: float = 3.0
+    seed: int = 0
+
+    @field_validator("arrival")
+    def check_arrival(cls, v):
+        if v == ArrivalEnum.UNKNOWN:
+            raise ValueError("load arrival process must be set")
+        return v
+
+    @field_validator("rates", "load_fractions")
+    def check_loads(cls, v):
+        if v is not None and (not v or min(v) <= 0):
+            raise ValueError(
+                "offered loads must be a non-empty list of positive values"
+            )
+        return v
+
+    @field_validator("duration", "drain_timeout", "latency_factor")
+    def check_positive(cls, v):
+        if v <= 0:
+            raise ValueError(
+                "load duration, drain_timeout and latency_factor must be positive"
+            )
+        return v
+
+    @field_validator("burst_size", "workers")
+    def check_count(cls, v):
+        if v < 1:
+            raise ValueError("load burst_size and workers must be at least 1")
+        return v
+
+    @model_validator(mode="after")
+    def check_trace_file(self):
+        if self.arrival == ArrivalEnum.TRACE and not self.trace_file:
+            raise ValueError("trace arrivals need a trace_file")
+        return self
+
+
+# ---------------------------
+# Define Batching configuration:
+# Serving simulation on top of the load pass. Requests carry single samples and
+# queue in front of `load.workers` batcher threads, which dispatch a batch to the
+# executor once it holds max_batch_size requests or its oldest request waited
+# max_wait seconds. The batch size of the dataset is the pool of distinct samples.
+# ---------------------------
+class BatchingConfig(BaseModel):
+    max_batch_size: int = 8
+    max_wait: float = 0.005
+
+    @field_validator("max_batch_size")
+    def check_max_batch_size(cls, v):
+        if v < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        return v
+
+    @field_validator("max_wait")
+    def check_max_wait(cls, v):
+        if v < 0:
+            raise ValueError("max_wait must not be negative")
+        return v
+
+
 # ---------------------------
 # Define Experiment configuration model
 # ---------------------------
@@ -122,6 +416,96 @@ class ExperimentConfig(BaseModel):
     run_mode: RunModeEnum
     executor: ExecutorConfig
     timer: TimerEnum
+    sampling: Optional[SamplingConfig] = None
+    profiler: Optional[ProfilerConfig] = None
+    memory: Optional[MemoryConfig] = None
+    load: Optional[LoadConfig] = None
+    batching: Optional[BatchingConfig] = None
+
+    @model_validator(mode="after")
+    def check_profiler_timer(self):
+        if self.profiler is not None and self.timer != TimerEnum.TORCH:
+            raise ValueError("profiler needs the torch timer")
+        return self
+
+    @model_validator(mode="after")
+    def check_execution_mode(self):
+        mode = self.executor.execution_mode
+        if self.run_mode != RunModeEnum.INFERENCE and mode in (
+            ExecutionModeEnum.INFERENCE_MODE,
+            ExecutionModeEnum.TORCHSCRIPT_TRACE,
+            ExecutionModeEnum.TORCHSCRIPT_SCRIPT,
+        ):
+            # Frozen TorchScript and inference tensors cannot be trained
+            raise ValueError(f"execution_mode {mode.value} needs the inference mode")
+        return self
+
+    @model_validator(mode="after")
+    def check_batching(self):
+        if self.batching is None:
+            return self
+        if self.load is None:
+            raise ValueError("batching needs a load section to generate requests")
+        if self.run_mode != RunModeEnum.INFERENCE:
+            raise ValueError("batching simulates serving, it needs the inference mode")
+        if self.executor.framework != FrameworkEnum.TORCH:
+            raise ValueError("batching is only supported by the torch executor")
+        return self
+
+
+# ---------------------------
+# Define Sweep configuration:
+# Each axis maps a dotted config path (e.g. "dataset.batch_size") to the values it takes.
+# "product" runs the Cartesian grid, "zip" pairs the i-th values of all axes.
+# ---------------------------
+class SweepConfig(BaseModel):
+    axes: Dict[str, List[Any]]
+    mode: SweepModeEnum = SweepModeEnum.PRODUCT
+
+    @field_validator("axes")
+    def check_axes(cls, v):
+        if not v:
+            raise ValueError("sweep needs at least one axis")
+        for path, values in v.items():
+            if not values:
+                raise ValueError(f"sweep axis {path} has no values")
+            if path == "label" or path.startswith("sweep"):
+                raise ValueError(f"{path} cannot be swept")
+        return v
+
+    @model_validator(mode="after")
+    def check_zip_lengths(self):
+        if self.mode == SweepModeEnum.ZIP:
+            lengths = {len(values) for values in self.axes.values()}
+            if len(lengths) > 1:
+                raise ValueError("zipped sweep axes must have the same length")
+        return self
+
+    def points(self) -> List[Dict[str, Any]]:
+        """Return the grid as a list of {axis path: value} dictionaries."""
+        paths = list(self.axes.keys())
+        if self.mode == SweepModeEnum.ZIP:
+            combos = zip(*self.axes.values())
+        else:
+            combos = itertools.product(*self.axes.values())
+        return [dict(zip(paths, combo)) for combo in combos]
+
+
+def _format_axis_value(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return "x".join(_format_axis_value(v) for v in value)
+    if isinstance(value, Enum):
+        return str(value.value)
+    return str(value)
+
+
+def sweep_point_label(label: str, point: Dict[str, Any]) -> str:
+    """Derive the label of a grid point, e.g. rn18@batch_size=8,device=cpu."""
+    tags = ",".join(
+        f"{path.rsplit('.', 1)[-1]}={_format_axis_value(value)}"
+        for path, value in point.items()
+    )
+    return f"{label}@{tags}"
 
 
 # ---------------------------
@@ -132,6 +516,36 @@ class BenchmarkConfig(BaseModel):
     workload: WorkloadConfig
     experiment: ExperimentConfig
     dataset: DatasetConfig
+    sweep: Optional[SweepConfig] = None
+    # Scheduling metadata, e.g. for `quark bench --schedule=priority`
+    tags: List[str] = []
+
+    def expand(self) -> List[Tuple[Dict[str, Any], "BenchmarkConfig"]]:
+        """
+        Expand the sweep axes into one concrete config per grid point.
+
+        Returns:
+            List of (point, config) pairs, where point maps axis paths to values.
+            A config without sweep expands to itself with an empty point.
+        """
+        if self.sweep is None:
+            return [({}, self)]
+
+        base = self.model_dump(exclude={"sweep"})
+        expanded = []
+        for point in self.sweep.points():
+            data = copy.deepcopy(base)
+            for path, value in point.items():
+                keys = path.split(".")
+                node = data
+                for key in keys:
+                    if not isinstance(node, dict) or key not in node:
+                        raise ValueError(f"Unknown sweep axis: {path}")
+                    parent, node = node, node[key]
+                parent[keys[-1]] = value
+            data["label"] = sweep_point_label(self.label, point)
+            expanded.append((point, BenchmarkConfig.model_validate(data)))
+        return expanded
 
 
 @dataclass
@@ -174,8 +588,10 @@ class ConfigBuilder:
         # Parse the configuration using Pydantic, which validates the data types and structure.
         try:
             _config = BenchmarkConfig.model_validate(config_dict)
-            print("Parsed configuration:")
-            print(_config.model_dump_json(indent=2))
+            # Dumping the whole config is costly on large trees, only do it when debugging
+            if is_debug_enabled():
+                print("Parsed configuration:")
+                print(_config.model_dump_json(indent=2))
             return _config
 
         except Exception as e:
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import pickle
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from .config import BenchmarkConfig
+from .trace import *
+
+__all__ = [
+    "ConfigIndexEntry",
+    "ConfigIndex",
+]
+
+# libyaml-backed loader when available, it parses several times faster
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Below this many changed files a process pool costs more than it saves
+_PARALLEL_THRESHOLD = 64
+
+
+def _schema_digest() -> str:
+    """Hash of the BenchmarkConfig schema, cached configs are dropped when it changes."""
+    with warnings.catch_warnings():
+        # SyntheticDatasetConfig.input_shape has a property default pydantic warns on
+        warnings.simplefilter("ignore")
+        schema = json.dumps(BenchmarkConfig.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()
+
+
+def _parse_config(path: str, data: bytes) -> Tuple[Optional[BenchmarkConfig], str]:
+    """Parse and validate one YAML document, returns (config, error message)."""
+    try:
+        config_dict = yaml.load(data, Loader=_YamlLoader)
+        return BenchmarkConfig.model_validate(config_dict), ""
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+@dataclass
+class ConfigIndexEntry:
+    path: str
+    mtime_ns: int
+    size: int
+    digest: str
+    config: Optional[BenchmarkConfig] = None
+    error: str = ""
+
+    def matches_stat(self, stat: os.stat_result) -> bool:
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+
+class ConfigIndex:
+    """
+    On-disk index of validated BenchmarkConfig objects for an experiment tree.
+
+    Entries are keyed by absolute path and revalidated by mtime and size. Files
+    whose mtime changed are hashed, and only files whose content changed are
+    parsed again, in parallel when there are many of them.
+    """
+
+    DEFAULT_PATH = "build/config_index.pkl"
+
+    def __init__(self, index_path: str = DEFAULT_PATH):
+        self.index_path = index_path
+        self.schema = _schema_digest()
+        self.entries: Dict[str, ConfigIndexEntry] = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "rb") as file:
+                payload = pickle.load(file)
+        except Exception as e:
+            TRACE(f"Discard unreadable config index {self.index_path}: {e}")
+            return
+        if payload.get("schema") != self.schema:
+            TRACE("Discard config index built for another config schema")
+            return
+        self.entries = payload["entries"]
+
+    def save(self):
+        """Atomically write the index back, so concurrent readers never see a torn file."""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(
+                {"schema": self.schema, "entries": self.entries},
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+
+    def refresh(
+        self, paths: Iterable[str], jobs: Optional[int] = None
+    ) -> Dict[str, BenchmarkConfig]:
+        """
+        Bring the entries for `paths` up to date.
+
+        Args:
+            paths (Iterable[str]): Task files to index.
+            jobs (int): Worker processes used to parse changed files.
+
+        Returns:
+            Dict[str, BenchmarkConfig]: Valid configs keyed by the paths as given.
+        """
+        paths = list(paths)
+        to_parse: List[Tuple[str, os.stat_result, bytes, str]] = []
+        for path in paths:
+            key = os.path.abspath(path)
+            stat = os.stat(key)
+            entry = self.entries.get(key)
+            if entry is not None and entry.matches_stat(stat):
+                continue
+
+            with open(key, "rb") as file:
+                data = file.read()
+            digest = hashlib.sha256(data).hexdigest()
+            if entry is not None and entry.digest == digest:
+                # Touched but unchanged, keep the parsed config
+                entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+                self.dirty = True
+                continue
+            to_parse.append((key, stat, data, digest))
+
+        if to_parse:
+            TRACE(f"Parse {len(to_parse)} of {len(paths)} config files")
+            keys = [item[0] for item in to_parse]
+            blobs = [item[2] for item in to_parse]
+            if len(to_parse) >= _PARALLEL_THRESHOLD and jobs != 1:
+                with ProcessPoolExecutor(max_workers=jobs) as pool:
+                    parsed = list(pool.map(_parse_config, keys, blobs, chunksize=16))
+            else:
+                parsed = [_parse_config(key, data) for key, data in zip(keys, blobs)]
+
+            for (key, stat, _, digest), (config, error) in zip(to_parse, parsed):
+                if error:
+                    print(f"Configuration error in {key}: {error}")
+                self.entries[key] = ConfigIndexEntry(
+                    path=key,
+                    mtime_ns=stat.st_mtime_ns,
+                    size=stat.st_size,
+                    digest=digest,
+                    config=config,
+                    error=error,
+                )
+            self.dirty = True
+
+        configs = {}
+        for path in paths:
+            entry = self.entries[os.path.abspath(path)]
+            if entry.config is not None:
+                configs[path] = entry.config
+        return configs
+
+    def prune(self):
+        """Drop entries for files that no longer exist."""
+        missing = [key for key in self.entries if not os.path.exists(key)]
+        for key in missing:
+            del self.entries[key]
+        self.dirty = self.dirty or bool(missing)
+
+    def get(self, path: str) -> Optional[BenchmarkConfig]:
+        """Return the validated config of one file, parsing it only if it changed."""
+        return self.refresh([path]).get(path)
+
+    def error(self, path: str) -> str:
+        """Validation error recorded for an indexed file, empty if it is valid."""
+        entry = self.entries.get(os.path.abspath(path))
+        return entry.error if entry is not None else ""
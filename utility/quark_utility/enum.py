@@ -77,6 +77,8 @@ class TimerEnum(Enum, metaclass=EnumWithFromStringMeta):
     TENSORFLOW = "tensorflow"
     IREE = "iree"
     TVM = "tvm"
+    # Wall time plus Linux perf counters (cycles, instructions, ...)
+    PERF = "perf"
 
 
 class DataSourceEnum(Enum, metaclass=EnumWithFromStringMeta):
@@ -89,17 +91,70 @@ class DataSourceEnum(Enum, metaclass=EnumWithFromStringMeta):
 class DtypeEnum(Enum, metaclass=EnumWithFromStringMeta):
     FLOAT32 = "float32"
     FLOAT16 = "float16"
+    BFLOAT16 = "bfloat16"
+    FLOAT64 = "float64"
 
     def to_numpy(self):
         import numpy as np
 
         if self == DtypeEnum.FLOAT32:
             return np.float32
-        elif self == DtypeENum.FLOAT16:
+        elif self == DtypeEnum.FLOAT16:
             return np.float16
+        elif self == DtypeEnum.FLOAT64:
+            return np.float64
         else:
+            # numpy has no bfloat16
             raise ValueError(f"Unsupported enum value: {self}")
 
+    def to_torch(self):
+        import torch
+
+        return getattr(torch, self.value)
+
+
+# How sweep axes are combined into grid points
+class SweepModeEnum(Enum, metaclass=EnumWithFromStringMeta):
+    UNKNOWN = "unknown"
+    PRODUCT = "product"
+    ZIP = "zip"
+
+
+class SchedulePolicyEnum(Enum, metaclass=EnumWithFromStringMeta):
+    UNKNOWN = "unknown"
+    FIFO = "fifo"
+    SHORTEST = "shortest"
+    PRIORITY = "priority"
+
+
+class ArrivalEnum(Enum, metaclass=EnumWithFromStringMeta):
+    UNKNOWN = "unknown"
+    CONSTANT = "constant"
+    POISSON = "poisson"
+    BURSTY = "bursty"
+    TRACE = "trace"
+
+
+# How the torch executor runs the model, applied once when it prepares a task
+class ExecutionModeEnum(Enum, metaclass=EnumWithFromStringMeta):
+    UNKNOWN = "unknown"
+    EAGER = "eager"
+    INFERENCE_MODE = "inference_mode"
+    TORCHSCRIPT_TRACE = "torchscript_trace"
+    TORCHSCRIPT_SCRIPT = "torchscript_script"
+    COMPILE = "compile"
+    CHANNELS_LAST = "channels_last"
+
+
+class TaskStatusEnum(Enum, metaclass=EnumWithFromStringMeta):
+    UNKNOWN = "unknown"
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    UP_TO_DATE = "up_to_date"
+    DEFERRED = "deferred"
+
 
 class RNGEnum(Enum, metaclass=EnumWithFromStringMeta):
     UNKNOWN = "unknown"
@@ -0,0 +1,312 @@
+import collections
+import socketserver
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .ipc import *
+from .trace import *
+
+__all__ = [
+    "FarmTask",
+    "FarmQueue",
+    "FarmServer",
+]
+
+
+@dataclass
+class FarmTask:
+    id: str
+    label: str
+    # BenchmarkConfig.model_dump(), workers need no shared file system
+    config: Dict[str, Any]
+    run_info: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    # Attempts the worker reported as failed, and attempts whose lease expired
+    failures: int = 0
+    expiries: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def to_message(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "config": self.config,
+            "run_info": self.run_info,
+            "attempt": self.attempts,
+        }
+
+
+@dataclass
+class _Lease:
+    task: FarmTask
+    worker: str
+    started: float
+    last_heartbeat: float
+
+
+class FarmQueue:
+    """
+    Work queue of a benchmark farm with per-worker deques and work stealing.
+
+    A worker pulling work pops the front of its own deque, refilled with up to
+    `prefetch` tasks from the shared backlog. Once the backlog is empty, idle
+    workers steal from the back of the longest deque of another worker.
+    Running tasks are leased: a lease expires when its worker stops sending
+    heartbeats for `heartbeat_timeout` seconds or the task runs longer than
+    `task_timeout`, and the task goes back to the backlog. A task is given up
+    after `max_failures` attempts its worker reported as failed, or after
+    `max_expiries` attempts lost to an expired lease.
+
+    The queue itself is not thread-safe, FarmServer serialises access to it.
+    """
+
+    def __init__(
+        self,
+        tasks: List[FarmTask],
+        prefetch: int = 2,
+        heartbeat_timeout: float = 30.0,
+        task_timeout: Optional[float] = None,
+        max_failures: int = 3,
+        max_expiries: int = 3,
+    ):
+        self.backlog: Deque[FarmTask] = collections.deque(tasks)
+        self.deques: Dict[str, Deque[FarmTask]] = {}
+        self.leases: Dict[str, _Lease] = {}
+        self.last_seen: Dict[str, float] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.failed: Dict[str, FarmTask] = {}
+        self.prefetch = prefetch
+        self.heartbeat_timeout = heartbeat_timeout
+        self.task_timeout = task_timeout
+        self.max_failures = max_failures
+        self.max_expiries = max_expiries
+        self.total = len(tasks)
+
+    def register(self, worker: str, now: Optional[float] = None):
+        self.deques.setdefault(worker, collections.deque())
+        self.last_seen[worker] = now if now is not None else time.monotonic()
+
+    def _steal(self, worker: str) -> List[FarmTask]:
+        """Take the back half of the longest other deque."""
+        victims = [name for name in self.deques if name != worker and self.deques[name]]
+        if not victims:
+            return []
+        victim = max(victims, key=lambda name: len(self.deques[name]))
+        count = max(1, len(self.deques[victim]) // 2)
+        stolen = [self.deques[victim].pop() for _ in range(count)]
+        TRACE(f"Worker {worker} stole {len(stolen)} tasks from {victim}")
+        return stolen[::-1]
+
+    def pull(self, worker: str, now: Optional[float] = None) -> Optional[FarmTask]:
+        """Lease the next task to `worker`, or None if nothing is runnable for it."""
+        now = now if now is not None else time.monotonic()
+        self.register(worker, now)
+        own = self.deques[worker]
+        if not own:
+            while self.backlog and len(own) < self.prefetch:
+                own.append(self.backlog.popleft())
+        if not own:
+            own.extend(self._steal(worker))
+        if not own:
+            return None
+
+        task = own.popleft()
+        task.attempts += 1
+        self.leases[task.id] = _Lease(task, worker, started=now, last_heartbeat=now)
+        return task
+
+    def heartbeat(self, worker: str, task_id: str, now: Optional[float] = None) -> bool:
+        """Renew the lease of `task_id`, returns False if the worker lost it."""
+        now = now if now is not None else time.monotonic()
+        self.last_seen[worker] = now
+        lease = self.leases.get(task_id)
+        if lease is None or lease.worker != worker:
+            return False
+        lease.last_heartbeat = now
+        return True
+
+    def complete(self, worker: str, task_id: str, result: Dict[str, Any]) -> bool:
+        """Record the result of a leased task, late results of expired leases are dropped."""
+        lease = self.leases.get(task_id)
+        if lease is None or lease.worker != worker:
+            TRACE(f"Drop result of {task_id} from {worker}, the lease was lost")
+            return False
+        del self.leases[task_id]
+        self.results[task_id] = result
+        return True
+
+    def fail(self, worker: str, task_id: str, error: str) -> bool:
+        lease = self.leases.get(task_id)
+        if lease is None or lease.worker != worker:
+            return False
+        del self.leases[task_id]
+        lease.task.failures += 1
+        self._requeue(
+            lease.task,
+            f"{worker}: {error}",
+            give_up=lease.task.failures >= self.max_failures,
+        )
+        return True
+
+    def _requeue(self, task: FarmTask, error: str, give_up: bool):
+        task.errors.append(error)
+        if give_up:
+            print(f"Give up task {task.label} after {task.attempts} attempts: {error}")
+            self.failed[task.id] = task
+        else:
+            print(f"Requeue task {task.label} ({error})")
+            # Retried tasks go first, they already waited for a whole attempt
+            self.backlog.appendleft(task)
+
+    def expire(self, now: Optional[float] = None) -> List[str]:
+        """Requeue tasks of silent workers and tasks over their time limit."""
+        now = now if now is not None else time.monotonic()
+        expired = []
+        for task_id, lease in list(self.leases.items()):
+            if now - lease.last_heartbeat > self.heartbeat_timeout:
+                reason = f"no heartbeat from {lease.worker}"
+            elif self.task_timeout and now - lease.started > self.task_timeout:
+                reason = f"timed out on {lease.worker}"
+            else:
+                continue
+            del self.leases[task_id]
+            lease.task.expiries += 1
+            self._requeue(
+                lease.task, reason, give_up=lease.task.expiries >= self.max_expiries
+            )
+            expired.append(task_id)
+
+        # Tasks prefetched by a worker that went silent are handed back untouched
+        for worker, own in self.deques.items():
+            if own and now - self.last_seen[worker] > self.heartbeat_timeout:
+                TRACE(f"Return {len(own)} tasks prefetched by silent worker {worker}")
+                self.backlog.extend(own)
+                own.clear()
+        return expired
+
+    def has_live_workers(self, now: Optional[float] = None) -> bool:
+        """Whether a worker holds a lease or was heard from within heartbeat_timeout."""
+        now = now if now is not None else time.monotonic()
+        if self.leases:
+            return True
+        return any(
+            now - seen <= self.heartbeat_timeout for seen in self.last_seen.values()
+        )
+
+    def is_done(self) -> bool:
+        return len(self.results) + len(self.failed) == self.total
+
+
+class FarmRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            message = recv_message(self.rfile)
+            if message is None:
+                return
+            send_message(self.wfile, self.server.dispatch(message))
+
+
+class FarmServer(socketserver.ThreadingTCPServer):
+    """
+    TCP endpoint of a benchmark farm, speaking the line-delimited JSON protocol.
+
+    Workers send `register`, then `pull` tasks and report them with `result` or
+    `failed`, renewing their lease with `heartbeat` while a task runs. `pull`
+    answers `wait` while other workers still hold tasks and `done` at the end.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self, address: Tuple[str, int], queue: FarmQueue, poll_interval: float = 1.0
+    ):
+        super().__init__(address, FarmRequestHandler)
+        self.queue = queue
+        self.lock = threading.Lock()
+        self.poll_interval = poll_interval
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server_address[:2]
+
+    def dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        op = message.get("op")
+        worker = message.get("worker", "")
+        with self.lock:
+            if op == "ping":
+                return {"status": "ok"}
+            elif op == "register":
+                self.queue.register(worker)
+                TRACE(f"Worker {worker} joined the farm")
+                return {
+                    "status": "ok",
+                    "heartbeat_interval": self.queue.heartbeat_timeout / 3,
+                }
+            elif op == "pull":
+                if self.queue.is_done():
+                    return {"status": "done"}
+                task = self.queue.pull(worker)
+                if task is None:
+                    return {"status": "wait", "retry_after": self.poll_interval}
+                print(f"Dispatch task {task.label} to {worker}")
+                return {"status": "ok", "task": task.to_message()}
+            elif op == "heartbeat":
+                alive = self.queue.heartbeat(worker, message["task_id"])
+                return {"status": "ok" if alive else "lost"}
+            elif op == "result":
+                if self.queue.complete(worker, message["task_id"], message["result"]):
+                    print(f"Collected result of {message['task_id']} from {worker}")
+                return {"status": "ok"}
+            elif op == "failed":
+                self.queue.fail(worker, message["task_id"], message.get("error", ""))
+                return {"status": "ok"}
+            else:
+                return {"status": "error", "error": f"Unknown op: {op}"}
+
+    def serve_until_done(
+        self,
+        timeout: Optional[float] = None,
+        workers_alive: Optional[Callable[[], bool]] = None,
+    ) -> bool:
+        """
+        Serve workers until every task finished or was given up.
+
+        Args:
+            timeout (float): Seconds to serve at most.
+            workers_alive (Callable): Whether workers started for this farm still
+                run. Once it returns False and no other worker holds a lease or
+                was heard from within the heartbeat timeout, serving stops.
+
+        Returns:
+            bool: False if `timeout` seconds elapsed or all workers left first.
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            while True:
+                with self.lock:
+                    self.queue.expire()
+                    if self.queue.is_done():
+                        break
+                    if (
+                        workers_alive is not None
+                        and not workers_alive()
+                        and not self.queue.has_live_workers()
+                    ):
+                        unfinished = self.queue.total - len(self.queue.results)
+                        print(f"No farm worker left, {unfinished} tasks unfinished")
+                        return False
+                if deadline is not None and time.monotonic() > deadline:
+                    return False
+                time.sleep(self.poll_interval)
+            # Give pulling workers a moment to receive `done` before closing
+            time.sleep(self.poll_interval)
+            return True
+        finally:
+            self.shutdown()
+            self.server_close()
+            thread.join()
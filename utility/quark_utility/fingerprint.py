@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import platform
+from importlib import metadata
+from typing import Any, Dict, Iterable, Optional
+
+from .config import BenchmarkConfig, ExecutorConfig
+from .serialise import *
+
+__all__ = [
+    "FINGERPRINT_PACKAGES",
+    "PLUGIN_BINARY",
+    "cpu_model",
+    "package_versions",
+    "file_digest",
+    "collect_environment",
+    "canonical_config",
+    "task_fingerprint",
+]
+
+# Distributions whose versions can change benchmark results
+FINGERPRINT_PACKAGES = [
+    "quark",
+    "quarkrt",
+    "quark_utility",
+    "torch",
+    "torchvision",
+    "tensorflow",
+    "numpy",
+    "pydantic",
+]
+
+# Native plugin executable invoked by the catzilla executor
+PLUGIN_BINARY = "build/plugins/quark-plugins"
+
+
+def cpu_model() -> str:
+    """Return the CPU model name reported by /proc/cpuinfo."""
+    try:
+        with open("/proc/cpuinfo", "r") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def package_versions(packages: Iterable[str] = FINGERPRINT_PACKAGES) -> Dict[str, Any]:
+    """Return installed versions of `packages`, None for those not installed."""
+    versions = {}
+    for package in packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def file_digest(path: str) -> Optional[str]:
+    """Return the sha256 of a file, or None if it does not exist."""
+    if not os.path.isfile(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def collect_environment() -> Dict[str, Any]:
+    """Describe the software and hardware a task runs on, as seen by this process."""
+    return {
+        "python": platform.python_version(),
+        "packages": package_versions(),
+        "plugins": file_digest(PLUGIN_BINARY),
+        "cpu_model": cpu_model(),
+    }
+
+
+def canonical_config(config: BenchmarkConfig) -> str:
+    """Serialise a config deterministically, independent of YAML layout and order."""
+    # Tags only steer scheduling, they never change what a task measures
+    exclude = {"tags": True}
+    # Keep fingerprints of configs written before these sections existed
+    unset = {
+        name
+        for name in ("sampling", "profiler", "memory", "load", "batching")
+        if getattr(config.experiment, name) is None
+    }
+    if unset:
+        exclude["experiment"] = {name: True for name in unset}
+    # Same for executor options left at their defaults
+    executor = config.experiment.executor
+    defaults = {
+        name: True
+        for name in ("execution_mode", "compile", "autocast", "drift")
+        if getattr(executor, name) == ExecutorConfig.model_fields[name].default
+    }
+    if defaults:
+        exclude.setdefault("experiment", {})["executor"] = defaults
+    return json.dumps(
+        config.model_dump(mode="json", exclude=exclude),
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+
+def task_fingerprint(config: BenchmarkConfig, environment: Dict[str, Any]) -> str:
+    """Hash everything that determines the outcome of a task."""
+    payload = json.dumps(
+        {"config": canonical_config(config), "environment": environment},
+        sort_keys=True,
+        default=enum_serializer,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,86 @@
+import json
+import socket
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .serialise import *
+from .trace import *
+
+__all__ = [
+    "Address",
+    "parse_address",
+    "send_message",
+    "recv_message",
+    "MessageClient",
+]
+
+# A Unix socket path, or a (host, port) pair for TCP
+Address = Union[str, Tuple[str, int]]
+
+
+def parse_address(text: str) -> Address:
+    """Parse 'host:port' into a TCP address, anything else is a Unix socket path."""
+    host, sep, port = text.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return text
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialise enums and numpy values that show up in configs and summaries."""
+    try:
+        return enum_serializer(obj)
+    except TypeError:
+        return numpy_serializer(obj)
+
+
+def send_message(stream, message: Dict[str, Any]):
+    """Write one message as a single line of JSON to a binary file-like stream."""
+    data = json.dumps(message, default=_json_default, ensure_ascii=False)
+    stream.write(data.encode("utf-8") + b"\n")
+    stream.flush()
+
+
+def recv_message(stream) -> Optional[Dict[str, Any]]:
+    """Read one line-delimited JSON message, returns None once the peer hung up."""
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line.decode("utf-8"))
+
+
+class MessageClient:
+    """Request/response client for the line-delimited JSON protocol."""
+
+    def __init__(self, address: Address, timeout: Optional[float] = None):
+        self.address = address
+        self.timeout = timeout
+
+    def _connect(self) -> socket.socket:
+        family = socket.AF_UNIX if isinstance(self.address, str) else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.address)
+        return sock
+
+    def request(self, op: str, **payload) -> Dict[str, Any]:
+        """Send one `op` request and block until its response arrives."""
+        with self._connect() as sock, sock.makefile("rwb") as stream:
+            send_message(stream, {"op": op, **payload})
+            response = recv_message(stream)
+        if response is None:
+            raise ConnectionError(f"{self.address} closed the connection during {op}")
+        return response
+
+    def wait_ready(self, timeout: float = 120.0, interval: float = 0.1) -> bool:
+        """Poll the peer with `ping` until it answers or `timeout` seconds elapse."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if self.request("ping").get("status") == "ok":
+                    return True
+            except OSError:
+                pass
+            time.sleep(interval)
+        TRACE(f"{self.address} is not ready after {timeout} seconds")
+        return False
@@ -0,0 +1,137 @@
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from .enum import *
+from .trace import *
+
+__all__ = [
+    "SweepJournal",
+]
+
+
+class SweepJournal:
+    """
+    Crash-safe progress record of one bench invocation, keyed by its sweep id.
+
+    Every status change is written through to disk atomically, so after a crash
+    or reboot the journal tells exactly which tasks finished. A task still
+    marked running when the coordinator died is run again on resume, only
+    recorded failures count against the retries.
+    """
+
+    DEFAULT_DIR = "build/sweeps"
+
+    def __init__(
+        self,
+        sweep_id: str,
+        config_dir: str = "",
+        label: str = "",
+        directory: str = DEFAULT_DIR,
+    ):
+        self.sweep_id = sweep_id
+        self.config_dir = config_dir
+        self.label = label
+        self.path = os.path.join(directory, f"{sweep_id}.json")
+        self.created = time.time()
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, sweep_id: str, directory: str = DEFAULT_DIR) -> "SweepJournal":
+        path = os.path.join(directory, f"{sweep_id}.json")
+        try:
+            with open(path, "r") as file:
+                payload = json.load(file)
+        except OSError:
+            raise ValueError(f"No journal for sweep {sweep_id} in {directory}")
+
+        journal = cls(
+            sweep_id, payload["config_dir"], payload["label"], directory=directory
+        )
+        journal.created = payload["created"]
+        journal.tasks = payload["tasks"]
+        return journal
+
+    def save(self):
+        """Write the journal with write-to-temp, fsync and rename."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        payload = {
+            "sweep_id": self.sweep_id,
+            "config_dir": self.config_dir,
+            "label": self.label,
+            "created": self.created,
+            "updated": time.time(),
+            "tasks": self.tasks,
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(payload, file, indent=4, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+        # Persist the rename itself, not only the file content
+        dir_fd = os.open(os.path.dirname(self.path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def add(self, task_file: str, label: str, status: TaskStatusEnum):
+        """
+        Track a task, keeping the attempts and errors of one already tracked.
+
+        Unlike the status transitions below, this does not save, so a whole
+        sweep can be registered with a single write.
+        """
+        entry = self.tasks.setdefault(
+            task_file, {"label": label, "attempts": 0, "errors": []}
+        )
+        entry["status"] = status.value
+
+    def status(self, task_file: str) -> TaskStatusEnum:
+        entry = self.tasks.get(task_file)
+        if entry is None:
+            return TaskStatusEnum.UNKNOWN
+        return TaskStatusEnum(entry["status"])
+
+    def attempts(self, task_file: str) -> int:
+        return self.tasks[task_file]["attempts"]
+
+    def failures(self, task_file: str) -> int:
+        """Failed attempts, unlike attempts() without those that were interrupted."""
+        return len(self.tasks[task_file]["errors"])
+
+    def start(self, task_file: str):
+        entry = self.tasks[task_file]
+        entry["status"] = TaskStatusEnum.RUNNING.value
+        entry["attempts"] += 1
+        entry["started"] = time.time()
+        self.save()
+
+    def finish(self, task_file: str):
+        entry = self.tasks[task_file]
+        entry["status"] = TaskStatusEnum.DONE.value
+        entry["finished"] = time.time()
+        self.save()
+
+    def fail(self, task_file: str, error: str):
+        entry = self.tasks[task_file]
+        entry["status"] = TaskStatusEnum.FAILED.value
+        entry["errors"].append(error)
+        self.save()
+
+    def unfinished(self) -> List[str]:
+        """Tasks that still need to run, in the order they were added."""
+        finished = (TaskStatusEnum.DONE.value, TaskStatusEnum.UP_TO_DATE.value)
+        return [
+            task_file
+            for task_file, entry in self.tasks.items()
+            if entry["status"] not in finished
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for entry in self.tasks.values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
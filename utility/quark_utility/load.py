@@ -0,0 +1,230 @@
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .enum import *
+
+__all__ = [
+    "LATENCY_PERCENTILES",
+    "load_trace",
+    "arrival_times",
+    "LoadLevel",
+    "summarize_load",
+    "KneeResult",
+    "find_knee",
+]
+
+LATENCY_PERCENTILES = (50, 90, 99, 99.9)
+
+
+def load_trace(path: str) -> np.ndarray:
+    """
+    Read request timestamps in seconds, one per line, relative to the first one.
+
+    Blank lines and lines starting with '#' are skipped, and only the first
+    comma separated column is read, so request logs exported as CSV replay as is.
+    """
+    timestamps = []
+    with open(path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                timestamps.append(float(line.split(",")[0]))
+            except ValueError:
+                # Header row of a CSV export
+                continue
+    if not timestamps:
+        raise ValueError(f"No timestamps in trace file {path}")
+    timestamps = np.sort(np.asarray(timestamps, dtype=np.float64))
+    return timestamps - timestamps[0]
+
+
+def arrival_times(
+    arrival: ArrivalEnum,
+    rate: float,
+    duration: float,
+    burst_size: int = 8,
+    trace: Optional[np.ndarray] = None,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Offsets in seconds at which an open-loop generator issues requests.
+
+    Args:
+        arrival (ArrivalEnum): CONSTANT spaces requests evenly, POISSON draws
+            exponential gaps, BURSTY issues burst_size requests at once with
+            Poisson spaced bursts, TRACE replays `trace` time-scaled to `rate`.
+        rate (float): Mean offered load in requests per second.
+        duration (float): Seconds of arrivals to generate.
+        burst_size (int): Requests per burst of the BURSTY process.
+        trace (np.ndarray): Timestamps from load_trace, for TRACE.
+        seed (int): Seed of the random processes, fixed so levels are reproducible.
+
+    Returns:
+        np.ndarray: Sorted offsets within [0, duration).
+    """
+    if rate <= 0 or duration <= 0:
+        raise ValueError("Arrival rate and duration must be positive")
+    rng = np.random.default_rng(seed)
+
+    if arrival == ArrivalEnum.CONSTANT:
+        return np.arange(0.0, duration, 1.0 / rate)
+    if arrival == ArrivalEnum.POISSON:
+        return _poisson(rng, rate, duration)
+    if arrival == ArrivalEnum.BURSTY:
+        bursts = _poisson(rng, rate / burst_size, duration)
+        return np.repeat(bursts, burst_size)
+    if arrival == ArrivalEnum.TRACE:
+        if trace is None or len(trace) == 0:
+            raise ValueError("Trace arrivals need the timestamps of a trace file")
+        # Stretch the trace so its mean rate matches the offered load
+        span = trace[-1] if trace[-1] > 0 else 1.0
+        native_rate = len(trace) / span
+        times = np.asarray(trace, dtype=np.float64) * native_rate / rate
+        return times[times < duration]
+    raise ValueError(f"Unknown arrival process: {arrival}")
+
+
+def _poisson(rng: np.random.Generator, rate: float, duration: float) -> np.ndarray:
+    # Draw a few more gaps than expected and top up in the rare case they fall short
+    expected = rate * duration
+    count = int(expected + 5 * math.sqrt(expected) + 10)
+    times = np.cumsum(rng.exponential(1.0 / rate, size=count))
+    while times[-1] < duration:
+        more = times[-1] + np.cumsum(rng.exponential(1.0 / rate, size=count))
+        times = np.concatenate([times, more])
+    return times[times < duration]
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, Optional[float]]:
+    if len(values) == 0:
+        return {f"p{q:g}": None for q in LATENCY_PERCENTILES}
+    points = np.percentile(values, LATENCY_PERCENTILES)
+    return {f"p{q:g}": float(p) for q, p in zip(LATENCY_PERCENTILES, points)}
+
+
+@dataclass
+class LoadLevel:
+    """Outcome of one offered load, latencies in seconds."""
+
+    offered_rate: float
+    # Realized rate of the arrivals, random ones match offered_rate on average only
+    arrival_rate: float
+    achieved_rate: float
+    requests: int
+    completed: int
+    # Requests still queued when the drain timeout expired
+    dropped: int
+    # From the scheduled arrival to completion, queueing included
+    latency: Dict[str, Optional[float]] = field(default_factory=dict)
+    # From the scheduled arrival until a worker picked the request up
+    queueing: Dict[str, Optional[float]] = field(default_factory=dict)
+    service: Dict[str, Optional[float]] = field(default_factory=dict)
+    mean_latency: Optional[float] = None
+    # How late the generator issued requests, large values void the level
+    generator_lag_p99: Optional[float] = None
+    # Batch size distribution when requests were dynamically batched
+    batches: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def summarize_load(
+    offered_rate: float,
+    scheduled: Sequence[float],
+    submitted: Sequence[float],
+    started: Sequence[float],
+    finished: Sequence[float],
+    origin: Optional[float] = None,
+    duration: Optional[float] = None,
+) -> LoadLevel:
+    """
+    Summarize one load level from per-request timestamps on the same clock.
+
+    Latency is measured from the scheduled arrival rather than from when the
+    request was issued, so a late generator or a full queue cannot hide delay.
+    Requests that never started or finished are NaN and count as dropped.
+    Arrivals are counted over `duration` seconds from `origin`, completions
+    over the same window or until the last one finished if that is later.
+    """
+    scheduled = np.asarray(scheduled, dtype=np.float64)
+    submitted = np.asarray(submitted, dtype=np.float64)
+    started = np.asarray(started, dtype=np.float64)
+    finished = np.asarray(finished, dtype=np.float64)
+    done = ~np.isnan(finished)
+    completed = int(done.sum())
+    if origin is None:
+        origin = float(scheduled.min()) if len(scheduled) else 0.0
+    if duration is None:
+        duration = float(scheduled.max()) - origin if len(scheduled) else 0.0
+
+    achieved_rate = arrival_rate = 0.0
+    if duration > 0:
+        arrival_rate = len(scheduled) / duration
+    if completed:
+        span = max(float(finished[done].max()) - origin, duration)
+        achieved_rate = completed / span if span > 0 else math.inf
+    latency = finished[done] - scheduled[done]
+    issued = ~np.isnan(submitted)
+    return LoadLevel(
+        offered_rate=offered_rate,
+        arrival_rate=arrival_rate,
+        achieved_rate=achieved_rate,
+        requests=len(scheduled),
+        completed=completed,
+        dropped=len(scheduled) - completed,
+        latency=_percentiles(latency),
+        queueing=_percentiles(started[done] - scheduled[done]),
+        service=_percentiles(finished[done] - started[done]),
+        mean_latency=float(latency.mean()) if completed else None,
+        generator_lag_p99=(
+            float(np.percentile(submitted[issued] - scheduled[issued], 99))
+            if issued.any()
+            else None
+        ),
+    )
+
+
+@dataclass
+class KneeResult:
+    # Highest offered load still served, None when even the lowest one saturated
+    rate: Optional[float]
+    # Lowest offered load that saturated, None when no swept load did
+    saturated_rate: Optional[float]
+    reason: str
+
+
+def find_knee(
+    levels: List[LoadLevel],
+    throughput_tolerance: float = 0.05,
+    latency_factor: float = 3.0,
+) -> KneeResult:
+    """
+    Locate the saturation knee of a sweep of offered loads.
+
+    A level is saturated once the achieved throughput falls more than
+    `throughput_tolerance` short of its arrival rate, or its p99 latency
+    exceeds `latency_factor` times the p99 of the lightest level. The knee is
+    the last level before the first saturated one.
+    """
+    levels = sorted(levels, key=lambda level: level.offered_rate)
+    if not levels:
+        raise ValueError("Knee detection needs at least one load level")
+    baseline = levels[0].latency.get("p99")
+    knee = None
+    for level in levels:
+        p99 = level.latency.get("p99")
+        if level.achieved_rate < (1.0 - throughput_tolerance) * level.arrival_rate:
+            reason = "throughput"
+        elif p99 is None or (baseline and p99 > latency_factor * baseline):
+            reason = "latency"
+        else:
+            knee = level.offered_rate
+            continue
+        return KneeResult(rate=knee, saturated_rate=level.offered_rate, reason=reason)
+    return KneeResult(rate=knee, saturated_rate=None, reason="not_saturated")
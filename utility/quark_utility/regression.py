@@ -0,0 +1,113 @@
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from .results_store import ResultsStore
+from .stats import *
+
+__all__ = [
+    "RegressionPolicy",
+    "compare_samples",
+    "check_regressions",
+    "write_verdict",
+]
+
+
+@dataclass
+class RegressionPolicy:
+    # Relative slowdown of the median that is tolerated, 0.05 means 5%
+    threshold: float = 0.05
+    # Significance level of the Mann-Whitney U test
+    alpha: float = 0.05
+    confidence: float = 0.95
+    resamples: int = 2000
+
+
+def compare_samples(
+    current: Sequence[float], baseline: Sequence[float], policy: RegressionPolicy
+) -> Dict[str, Any]:
+    """
+    Compare current timings against a baseline.
+
+    A task regressed when the current samples are significantly slower, the
+    median ratio exceeds 1 + threshold and its confidence interval lies above 1.
+    Improvements are judged the same way in the other direction.
+    """
+    ratio, low, high = bootstrap_ratio_ci(
+        current,
+        baseline,
+        confidence=policy.confidence,
+        resamples=policy.resamples,
+    )
+    p_slower = mann_whitney_u(current, baseline, alternative="greater").p_value
+    p_faster = mann_whitney_u(current, baseline, alternative="less").p_value
+
+    if p_slower < policy.alpha and ratio > 1 + policy.threshold and low > 1:
+        verdict = "regression"
+    elif p_faster < policy.alpha and ratio < 1 - policy.threshold and high < 1:
+        verdict = "improvement"
+    else:
+        verdict = "unchanged"
+    return {
+        "verdict": verdict,
+        "median_ratio": ratio,
+        "ratio_ci": [low, high],
+        "p_value": p_slower if ratio >= 1 else p_faster,
+        "current_median": float(np.median(current)),
+        "baseline_median": float(np.median(baseline)),
+        "samples": [len(current), len(baseline)],
+    }
+
+
+def check_regressions(
+    store: ResultsStore,
+    current_runs: Dict[str, Dict[str, Any]],
+    baseline_runs: Dict[str, Dict[str, Any]],
+    policy: RegressionPolicy,
+) -> Dict[str, Any]:
+    """
+    Compare every current run with the baseline run of the same label.
+
+    Args:
+        store (ResultsStore): Store holding the raw samples of both sides.
+        current_runs (dict): Runs under test, keyed by label.
+        baseline_runs (dict): Baseline runs, keyed by label.
+        policy (RegressionPolicy): Thresholds of the gate.
+
+    Returns:
+        dict: The verdict, its status is 'fail' if any task regressed.
+    """
+    tasks = []
+    for label, run in sorted(current_runs.items()):
+        entry = {"label": label, "current_run": run["run_id"]}
+        baseline = baseline_runs.get(label)
+        if baseline is None:
+            entry["verdict"] = "no_baseline"
+        else:
+            entry["baseline_run"] = baseline["run_id"]
+            current = store.samples(run["run_id"])
+            reference = store.samples(baseline["run_id"])
+            if len(current) == 0 or len(reference) == 0:
+                entry["verdict"] = "no_samples"
+            else:
+                entry.update(compare_samples(current, reference, policy))
+        tasks.append(entry)
+
+    regressions = [task["label"] for task in tasks if task["verdict"] == "regression"]
+    return {
+        "status": "fail" if regressions else "pass",
+        "created": time.time(),
+        "policy": asdict(policy),
+        "regressions": regressions,
+        "tasks": tasks,
+    }
+
+
+def write_verdict(verdict: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(verdict, file, indent=4, ensure_ascii=False)
@@ -0,0 +1,351 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .config import BenchmarkConfig, Record
+from .serialise import *
+from .trace import *
+
+__all__ = [
+    "ResultsStore",
+    "new_run_id",
+    "new_sweep_id",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    label TEXT NOT NULL,
+    framework TEXT,
+    model TEXT,
+    device TEXT,
+    run_mode TEXT,
+    sweep_id TEXT,
+    fingerprint TEXT,
+    config TEXT NOT NULL,
+    environment TEXT,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id TEXT PRIMARY KEY REFERENCES runs(run_id),
+    count INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    PRIMARY KEY (tag, run_id)
+);
+CREATE INDEX IF NOT EXISTS runs_by_label ON runs(label, timestamp);
+CREATE INDEX IF NOT EXISTS runs_by_framework ON runs(framework, timestamp);
+CREATE INDEX IF NOT EXISTS runs_by_model ON runs(model, timestamp);
+CREATE INDEX IF NOT EXISTS runs_by_device ON runs(device, timestamp);
+CREATE INDEX IF NOT EXISTS runs_by_sweep ON runs(sweep_id);
+CREATE INDEX IF NOT EXISTS runs_by_fingerprint ON runs(fingerprint);
+CREATE INDEX IF NOT EXISTS runs_by_timestamp ON runs(timestamp);
+"""
+
+# Columns that can be filtered on directly in ResultsStore.query
+_FILTER_COLUMNS = [
+    "label",
+    "framework",
+    "model",
+    "device",
+    "run_mode",
+    "sweep_id",
+    "fingerprint",
+]
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex
+
+
+def new_sweep_id() -> str:
+    """Id of one bench invocation, sortable by start time."""
+    return "{}-{}".format(time.strftime("%Y%m%d-%H%M%S"), uuid.uuid4().hex[:6])
+
+
+def _workload_name(workload) -> Optional[str]:
+    """Model or operator name of a workload, fused operators are joined with '+'."""
+    if hasattr(workload, "operators"):
+        return "+".join(operator.value for operator in workload.operators)
+    name = getattr(workload, "model", None) or getattr(workload, "operator", None)
+    return name.value if name is not None else None
+
+
+def _to_json(value: Any) -> str:
+    def default(obj):
+        try:
+            return enum_serializer(obj)
+        except TypeError:
+            return numpy_serializer(obj)
+
+    return json.dumps(value, default=default, ensure_ascii=False)
+
+
+class ResultsStore:
+    """
+    Append-only SQLite store of benchmark runs.
+
+    Every run keeps its full config, environment, summary and the raw samples,
+    stored as one float64 blob per run. The database runs in WAL mode, so
+    concurrent workers can append while others query.
+    """
+
+    DEFAULT_NAME = "results.db"
+
+    def __init__(self, path: str, timeout: float = 60.0):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Writers wait up to `timeout` seconds for the lock instead of failing
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(
+        self,
+        record: Record,
+        samples: Sequence[float],
+        environment: Optional[Dict[str, Any]] = None,
+        run_info: Optional[Dict[str, Any]] = None,
+        run_id: Optional[str] = None,
+    ) -> str:
+        """
+        Append one run and its raw samples.
+
+        Args:
+            record (Record): Config and summary of the run.
+            samples (Sequence[float]): Raw per-iteration samples in seconds.
+            environment (dict): Runtime environment, see collect_environment.
+            run_info (dict): Coordinator metadata such as sweep_id and fingerprint.
+
+        Returns:
+            str: The id of the new run.
+        """
+        run_id = run_id or new_run_id()
+        run_info = run_info or {}
+        config: BenchmarkConfig = record.config
+        data = np.asarray(samples, dtype=np.float64)
+
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    time.time(),
+                    config.label,
+                    config.workload.framework.value,
+                    _workload_name(config.workload),
+                    config.experiment.executor.device.value,
+                    config.experiment.run_mode.value,
+                    run_info.get("sweep_id"),
+                    run_info.get("fingerprint"),
+                    _to_json(config.model_dump()),
+                    _to_json(environment or {}),
+                    _to_json(record.summary),
+                ),
+            )
+            cursor.execute(
+                "INSERT INTO samples VALUES (?, ?, ?)",
+                (run_id, len(data), data.tobytes()),
+            )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        TRACE(f"Stored run {run_id} of {config.label} in {self.path}")
+        return run_id
+
+    def export_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """A run with its samples as plain JSON-compatible data, see import_run."""
+        run = self.get(run_id)
+        if run is not None:
+            run["samples"] = self.samples(run_id).tolist()
+        return run
+
+    def import_run(self, run: Dict[str, Any]) -> bool:
+        """
+        Insert a run exported from another store, e.g. by a farm worker.
+
+        Returns:
+            bool: False if the run id was already present and nothing changed.
+        """
+        data = np.asarray(run["samples"], dtype=np.float64)
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute(
+                "INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run["run_id"],
+                    run["timestamp"],
+                    run["label"],
+                    run["framework"],
+                    run["model"],
+                    run["device"],
+                    run["run_mode"],
+                    run["sweep_id"],
+                    run["fingerprint"],
+                    _to_json(run["config"]),
+                    _to_json(run["environment"]),
+                    _to_json(run["summary"]),
+                ),
+            )
+            inserted = cursor.rowcount > 0
+            if inserted:
+                cursor.execute(
+                    "INSERT INTO samples VALUES (?, ?, ?)",
+                    (run["run_id"], len(data), data.tobytes()),
+                )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        return inserted
+
+    def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        run = dict(row)
+        for key in ("config", "environment", "summary"):
+            if run.get(key) is not None:
+                run[key] = json.loads(run[key])
+        return run
+
+    def query(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+        **filters,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return runs matching all filters, newest first.
+
+        Args:
+            since (float): Only runs at or after this UNIX timestamp.
+            until (float): Only runs before this UNIX timestamp.
+            limit (int): Maximum number of runs to return.
+            **filters: Equality filters on label, framework, model, device,
+                run_mode, sweep_id or fingerprint.
+        """
+        clauses, params = [], []
+        for column, value in filters.items():
+            if column not in _FILTER_COLUMNS:
+                raise ValueError(f"Cannot filter runs by {column}")
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC, rowid DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [self._row_to_dict(row) for row in self.connection.execute(sql, params)]
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        row = self.connection.execute(
+            "SELECT * FROM runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        return self._row_to_dict(row) if row is not None else None
+
+    def latest(self, label: str) -> Optional[Dict[str, Any]]:
+        runs = self.query(label=label, limit=1)
+        return runs[0] if runs else None
+
+    def latest_per_label(self, runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Keep the newest of `runs` (given newest first) for every label."""
+        latest = {}
+        for run in runs:
+            latest.setdefault(run["label"], run)
+        return latest
+
+    def tag(self, tag: str, run_ids: Sequence[str]):
+        """Point `tag` at exactly `run_ids`, replacing what it pointed at before."""
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute("DELETE FROM tags WHERE tag = ?", (tag,))
+            cursor.executemany(
+                "INSERT INTO tags VALUES (?, ?)", [(tag, run_id) for run_id in run_ids]
+            )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+    def resolve(self, ref: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve a tag, sweep id, run id or unique run id prefix to runs by label.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The newest matching run of every label.
+        """
+        rows = self.connection.execute(
+            "SELECT runs.* FROM runs JOIN tags ON runs.run_id = tags.run_id "
+            "WHERE tags.tag = ? ORDER BY timestamp DESC, runs.rowid DESC",
+            (ref,),
+        ).fetchall()
+        if rows:
+            return self.latest_per_label([self._row_to_dict(row) for row in rows])
+
+        runs = self.query(sweep_id=ref)
+        if runs:
+            return self.latest_per_label(runs)
+
+        rows = self.connection.execute(
+            "SELECT * FROM runs WHERE substr(run_id, 1, ?) = ? LIMIT 2",
+            (len(ref), ref),
+        ).fetchall()
+        if len(rows) > 1:
+            raise ValueError(f"Run id prefix {ref} is ambiguous")
+        if not rows:
+            raise ValueError(f"No tag, sweep or run matches {ref}")
+        run = self._row_to_dict(rows[0])
+        return {run["label"]: run}
+
+    def samples(self, run_id: str) -> np.ndarray:
+        """Return the raw samples of a run in seconds."""
+        row = self.connection.execute(
+            "SELECT data FROM samples WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            return np.empty(0, dtype=np.float64)
+        return np.frombuffer(row["data"], dtype=np.float64)
+
+    def export_json(self, path: str, **filters) -> Dict[str, Any]:
+        """Write the latest summary per label among the matching runs as JSON."""
+        view = {
+            label: dict(run["summary"], run_id=run["run_id"])
+            for label, run in self.latest_per_label(self.query(**filters)).items()
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(view, file, indent=4, ensure_ascii=False)
+        return view
@@ -0,0 +1,184 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import BenchmarkConfig
+from .enum import *
+from .results_store import ResultsStore, _workload_name
+
+__all__ = [
+    "TaskEstimate",
+    "DurationModel",
+    "ScheduledTask",
+    "schedule_tasks",
+]
+
+
+@dataclass
+class TaskEstimate:
+    seconds: float
+    # "history" for the same fingerprint, "model" for similar configs, else "default"
+    source: str
+
+
+def _batch_size(config: Dict[str, Any]) -> int:
+    return (config.get("dataset") or {}).get("batch_size") or 1
+
+
+class DurationModel:
+    """
+    Predict the wall time of a task from the runs in the results store.
+
+    Tasks that ran before with the same fingerprint take the median wall time of
+    their recent runs. New configs fall back to a linear fit of wall time over
+    batch size, across past runs of the same framework, model, device and run
+    mode, and to DEFAULT_SECONDS when there is nothing to fit.
+    """
+
+    DEFAULT_SECONDS = 60.0
+
+    def __init__(self, store: Optional[ResultsStore], history: int = 20):
+        self.store = store
+        self.history = history
+        self._fits: Dict[Tuple[str, ...], Optional[Tuple[float, float]]] = {}
+
+    def history_seconds(self, fingerprint: str) -> Optional[float]:
+        """Median wall time of past runs with this fingerprint, summed per sweep."""
+        if self.store is None or not fingerprint:
+            return None
+        per_sweep = defaultdict(float)
+        for run in self.store.query(fingerprint=fingerprint, limit=self.history * 16):
+            wall_time = (run["summary"] or {}).get("wall_time")
+            if wall_time is not None:
+                per_sweep[run["sweep_id"]] += wall_time
+        if not per_sweep:
+            return None
+        return float(np.median(list(per_sweep.values())[: self.history]))
+
+    def _fit(self, config: BenchmarkConfig) -> Optional[Tuple[float, float]]:
+        """Least-squares (intercept, slope) of wall time over batch size."""
+        key = (
+            config.workload.framework.value,
+            _workload_name(config.workload),
+            config.experiment.executor.device.value,
+            config.experiment.run_mode.value,
+        )
+        if key in self._fits:
+            return self._fits[key]
+
+        points = []
+        runs = self.store.query(
+            framework=key[0],
+            model=key[1],
+            device=key[2],
+            run_mode=key[3],
+            limit=self.history * 10,
+        )
+        for run in runs:
+            wall_time = (run["summary"] or {}).get("wall_time")
+            if wall_time is not None:
+                points.append((_batch_size(run["config"]), wall_time))
+
+        fit = None
+        if points:
+            sizes, times = np.array(points, dtype=np.float64).T
+            if len(set(sizes)) > 1:
+                slope, intercept = np.polyfit(sizes, times, 1)
+                fit = (float(intercept), float(max(slope, 0.0)))
+            else:
+                # One batch size seen, assume time proportional to the batch
+                fit = (0.0, float(np.median(times) / sizes[0]))
+        self._fits[key] = fit
+        return fit
+
+    def model_seconds(self, config: BenchmarkConfig) -> Optional[float]:
+        """Fitted wall time of a config, summed over its sweep points."""
+        if self.store is None:
+            return None
+        total = 0.0
+        for _, point_config in config.expand():
+            fit = self._fit(point_config)
+            if fit is None:
+                return None
+            batch_size = point_config.dataset.batch_size or 1
+            total += max(fit[0] + fit[1] * batch_size, 0.0)
+        return total
+
+    def estimate(self, config: BenchmarkConfig, fingerprint: str = "") -> TaskEstimate:
+        seconds = self.history_seconds(fingerprint)
+        if seconds is not None:
+            return TaskEstimate(seconds, "history")
+        seconds = self.model_seconds(config)
+        if seconds is not None:
+            return TaskEstimate(seconds, "model")
+        return TaskEstimate(self.DEFAULT_SECONDS * len(config.expand()), "default")
+
+
+@dataclass
+class ScheduledTask:
+    key: str
+    label: str
+    estimate: TaskEstimate
+    tags: List[str] = field(default_factory=list)
+
+
+def _priority_rank(task: ScheduledTask, priority_tags: Sequence[str]) -> int:
+    ranks = [priority_tags.index(tag) for tag in task.tags if tag in priority_tags]
+    return min(ranks) if ranks else len(priority_tags)
+
+
+def schedule_tasks(
+    tasks: List[ScheduledTask],
+    policy: SchedulePolicyEnum = SchedulePolicyEnum.SHORTEST,
+    priority_tags: Sequence[str] = (),
+    time_budget: Optional[float] = None,
+    workers: int = 1,
+) -> Tuple[List[ScheduledTask], List[ScheduledTask]]:
+    """
+    Order tasks by `policy` and fit them into an optional wall-clock budget.
+
+    Args:
+        tasks (List[ScheduledTask]): Tasks in their discovery order.
+        policy (SchedulePolicyEnum): FIFO keeps the order, SHORTEST runs the
+            quickest first, PRIORITY orders by the first matching priority tag
+            and then shortest first.
+        priority_tags (Sequence[str]): Tags from most to least urgent.
+        time_budget (float): Seconds available, None for no limit.
+        workers (int): Tasks running concurrently, each worker has the whole
+            budget to itself.
+
+    Returns:
+        Tuple of the planned tasks in run order and the deferred tasks.
+    """
+    if policy == SchedulePolicyEnum.SHORTEST:
+        ordered = sorted(tasks, key=lambda task: task.estimate.seconds)
+    elif policy == SchedulePolicyEnum.PRIORITY:
+        ordered = sorted(
+            tasks,
+            key=lambda task: (
+                _priority_rank(task, priority_tags),
+                task.estimate.seconds,
+            ),
+        )
+    elif policy == SchedulePolicyEnum.FIFO:
+        ordered = list(tasks)
+    else:
+        raise ValueError(f"Unknown schedule policy: {policy}")
+
+    if time_budget is None:
+        return ordered, []
+
+    # Greedy in policy order onto the least loaded worker, a task that does not
+    # fit there fits nowhere and leaves room for later ones
+    loads = [0.0] * max(workers, 1)
+    planned, deferred = [], []
+    for task in ordered:
+        worker = min(range(len(loads)), key=loads.__getitem__)
+        if loads[worker] + task.estimate.seconds <= time_budget:
+            planned.append(task)
+            loads[worker] += task.estimate.seconds
+        else:
+            deferred.append(task)
+    return planned, deferred
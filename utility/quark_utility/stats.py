@@ -0,0 +1,399 @@
+import math
+import statistics
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Sequence, Tuple
+
+import numpy as np
+
+__all__ = [
+    "rank_data",
+    "MannWhitneyResult",
+    "mann_whitney_u",
+    "bootstrap_ratio_ci",
+    "median_ci",
+    "median_rank_bounds",
+    "relative_half_width",
+    "is_steady",
+    "t_quantile",
+    "t_ci",
+    "bootstrap_ci",
+    "median_abs_deviation",
+    "trimmed_mean",
+    "OutlierClassification",
+    "classify_outliers",
+]
+
+# Upper bound on resampled values held in memory at once by the bootstrap
+_BOOTSTRAP_CHUNK_VALUES = 1 << 22
+
+
+def rank_data(values: Sequence[float]) -> np.ndarray:
+    """Return 1-based ranks of `values`, tied values share their average rank."""
+    values = np.asarray(values, dtype=np.float64)
+    order = np.argsort(values, kind="mergesort")
+    _, first, counts = np.unique(values[order], return_index=True, return_counts=True)
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.repeat(first + (counts + 1) / 2.0, counts)
+    return ranks
+
+
+@dataclass
+class MannWhitneyResult:
+    u: float
+    p_value: float
+
+
+def _normal_sf(z: float) -> float:
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+def mann_whitney_u(
+    x: Sequence[float], y: Sequence[float], alternative: str = "two-sided"
+) -> MannWhitneyResult:
+    """
+    Mann-Whitney U test of `x` against `y`.
+
+    Uses the normal approximation with tie and continuity correction, which is
+    accurate for the sample counts timers produce (tens of samples or more).
+
+    Args:
+        x (Sequence[float]): First sample, e.g. the current timings.
+        y (Sequence[float]): Second sample, e.g. the baseline timings.
+        alternative (str): 'greater' tests whether x tends to be larger than y,
+            'less' whether it tends to be smaller, 'two-sided' either.
+
+    Returns:
+        MannWhitneyResult: U statistic of `x` and the p-value.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n1, n2 = len(x), len(y)
+    if n1 == 0 or n2 == 0:
+        raise ValueError("Mann-Whitney U needs at least one sample on each side")
+    if alternative not in ("two-sided", "greater", "less"):
+        raise ValueError(f"Unknown alternative: {alternative}")
+
+    combined = np.concatenate([x, y])
+    ranks = rank_data(combined)
+    u = float(ranks[:n1].sum() - n1 * (n1 + 1) / 2.0)
+
+    n = n1 + n2
+    _, ties = np.unique(combined, return_counts=True)
+    tie_term = float((ties**3 - ties).sum()) / (n * (n - 1)) if n > 1 else 0.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term)
+    if variance <= 0:
+        # Every value is identical, there is no evidence either way
+        return MannWhitneyResult(u=u, p_value=1.0)
+
+    mean = n1 * n2 / 2.0
+    sigma = math.sqrt(variance)
+    p_greater = _normal_sf((u - mean - 0.5) / sigma)
+    p_less = _normal_sf((mean - u - 0.5) / sigma)
+    if alternative == "greater":
+        p_value = p_greater
+    elif alternative == "less":
+        p_value = p_less
+    else:
+        p_value = min(1.0, 2.0 * min(p_greater, p_less))
+    return MannWhitneyResult(u=u, p_value=p_value)
+
+
+def _resampled_statistic(
+    rng: np.random.Generator,
+    values: np.ndarray,
+    resamples: int,
+    statistic: Callable[..., np.ndarray],
+) -> np.ndarray:
+    """Apply `statistic` to `resamples` bootstrap resamples of `values`."""
+    chunk = max(1, _BOOTSTRAP_CHUNK_VALUES // len(values))
+    out = np.empty(resamples, dtype=np.float64)
+    for start in range(0, resamples, chunk):
+        stop = min(resamples, start + chunk)
+        idx = rng.integers(0, len(values), size=(stop - start, len(values)))
+        out[start:stop] = statistic(values[idx], axis=1)
+    return out
+
+
+def bootstrap_ratio_ci(
+    x: Sequence[float],
+    y: Sequence[float],
+    statistic: Callable[..., np.ndarray] = np.median,
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0,
+) -> Tuple[float, float, float]:
+    """
+    Percentile bootstrap confidence interval of statistic(x) / statistic(y).
+
+    Args:
+        x (Sequence[float]): Numerator sample, e.g. the current timings.
+        y (Sequence[float]): Denominator sample, e.g. the baseline timings.
+        statistic (Callable): Reduction taking an `axis` argument, the median by default.
+        confidence (float): Coverage of the interval.
+        resamples (int): Number of bootstrap resamples.
+        seed (int): Seed of the resampling, fixed so verdicts are reproducible.
+
+    Returns:
+        Tuple[float, float, float]: The observed ratio and the interval bounds.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) == 0 or len(y) == 0:
+        raise ValueError("Bootstrap needs at least one sample on each side")
+
+    rng = np.random.default_rng(seed)
+    ratios = _resampled_statistic(rng, x, resamples, statistic) / _resampled_statistic(
+        rng, y, resamples, statistic
+    )
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    low, high = np.percentile(ratios, [tail, 100.0 - tail])
+    ratio = float(statistic(x) / statistic(y))
+    return ratio, float(low), float(high)
+
+
+def median_ci(values: Sequence[float], confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    Distribution-free confidence interval of the median from order statistics.
+
+    The bounds are the order statistics whose ranks bracket n/2 by z*sqrt(n)/2,
+    the normal approximation of the binomial distribution of ranks below the
+    median. Timings are skewed, so this holds where a mean-based interval does not.
+    """
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    low, high = median_rank_bounds(len(values), confidence)
+    return float(values[low]), float(values[high])
+
+
+def median_rank_bounds(n: int, confidence: float = 0.95) -> Tuple[int, int]:
+    """0-based ranks of the order statistics bounding the median's interval."""
+    if n == 0:
+        raise ValueError("Median confidence interval needs at least one sample")
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    half_width = z * math.sqrt(n) / 2.0
+    low = max(int(math.floor(n / 2.0 - half_width)), 0)
+    high = min(int(math.ceil(n / 2.0 + half_width)), n - 1)
+    return low, high
+
+
+def relative_half_width(values: Sequence[float], confidence: float = 0.95) -> float:
+    """Half-width of the median confidence interval relative to the median."""
+    if len(values) < 2:
+        return math.inf
+    median = float(np.median(values))
+    if median == 0:
+        return math.inf
+    low, high = median_ci(values, confidence)
+    return (high - low) / 2.0 / abs(median)
+
+
+def is_steady(
+    values: Sequence[float], window: int, tolerance: float, alpha: float = 0.05
+) -> bool:
+    """
+    Whether the last two windows of a latency series come from the same level.
+
+    The windows are steady when their medians differ by at most `tolerance`
+    relative to the earlier one, or a Mann-Whitney U test finds no shift
+    between them at level `alpha`. The first catches tight series settling on a
+    level, the second noisy series without a trend.
+    """
+    if len(values) < 2 * window:
+        return False
+    previous = np.asarray(values[-2 * window : -window], dtype=np.float64)
+    last = np.asarray(values[-window:], dtype=np.float64)
+    reference = float(np.median(previous))
+    if reference > 0:
+        shift = abs(float(np.median(last)) - reference) / reference
+        if shift <= tolerance:
+            return True
+    return mann_whitney_u(last, previous).p_value >= alpha
+
+
+def _beta_continued_fraction(a: float, b: float, x: float) -> float:
+    # Lentz's evaluation of the continued fraction of the incomplete beta function
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-14:
+            break
+    return h
+
+
+def _incomplete_beta(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(
+        math.lgamma(a + b)
+        - math.lgamma(a)
+        - math.lgamma(b)
+        + a * math.log(x)
+        + b * math.log1p(-x)
+    )
+    # The continued fraction converges fast on the side below the mean
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - front * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+
+def _t_sf(t: float, df: float) -> float:
+    """Upper tail probability of Student's t distribution for t >= 0."""
+    return 0.5 * _incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+
+
+@lru_cache(maxsize=256)
+def t_quantile(p: float, df: float) -> float:
+    """
+    Quantile of Student's t distribution with `df` degrees of freedom.
+
+    Solved by bisection on the tail probability, cached since timers ask for
+    the same few confidence levels and sample counts over and over.
+    """
+    if not 0 < p < 1:
+        raise ValueError(f"Probability must be within (0, 1), got {p}")
+    if df <= 0:
+        raise ValueError("Degrees of freedom must be positive")
+    if p < 0.5:
+        return -t_quantile(1.0 - p, df)
+    if p == 0.5:
+        return 0.0
+    tail = 1.0 - p
+    low, high = 0.0, 1.0
+    while _t_sf(high, df) > tail:
+        low, high = high, high * 2.0
+    for _ in range(100):
+        middle = (low + high) / 2.0
+        if _t_sf(middle, df) > tail:
+            low = middle
+        else:
+            high = middle
+        if high - low < 1e-12 * high:
+            break
+    return (low + high) / 2.0
+
+
+def t_ci(values: Sequence[float], confidence: float = 0.95) -> Tuple[float, float]:
+    """Student-t confidence interval of the mean, a point interval below 2 samples."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        raise ValueError("Confidence interval needs at least one sample")
+    mean = float(values.mean())
+    if len(values) < 2:
+        return mean, mean
+    half_width = t_quantile(0.5 + confidence / 2.0, len(values) - 1) * float(
+        values.std(ddof=1) / math.sqrt(len(values))
+    )
+    return mean - half_width, mean + half_width
+
+
+def bootstrap_ci(
+    values: Sequence[float],
+    statistic: Callable[..., np.ndarray] = np.median,
+    confidence: float = 0.95,
+    resamples: int = 1000,
+    seed: int = 0,
+) -> Tuple[float, float]:
+    """
+    Percentile bootstrap confidence interval of statistic(values).
+
+    Resamples are drawn and reduced in chunks of whole arrays, so the cost is
+    a few vectorized passes rather than a Python loop per resample.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        raise ValueError("Bootstrap needs at least one sample")
+    rng = np.random.default_rng(seed)
+    estimates = _resampled_statistic(rng, values, resamples, statistic)
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    low, high = np.percentile(estimates, [tail, 100.0 - tail])
+    return float(low), float(high)
+
+
+def median_abs_deviation(values: Sequence[float], scale: float = 1.0) -> float:
+    """
+    Median absolute deviation from the median, times `scale`.
+
+    A scale of 1.4826 makes it estimate the standard deviation of normal data,
+    without the pull a few preempted samples have on the standard deviation.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        raise ValueError("Median absolute deviation needs at least one sample")
+    return scale * float(np.median(np.abs(values - np.median(values))))
+
+
+def trimmed_mean(values: Sequence[float], proportion: float = 0.1) -> float:
+    """Mean after dropping `proportion` of the samples at each end."""
+    if not 0 <= proportion < 0.5:
+        raise ValueError("Trimmed proportion must be within [0, 0.5)")
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        raise ValueError("Trimmed mean needs at least one sample")
+    cut = int(proportion * len(values))
+    # Only the cut points need to be in place, not a full sort
+    if cut:
+        values = np.partition(values, (cut, len(values) - cut - 1))
+    return float(values[cut : len(values) - cut].mean())
+
+
+@dataclass
+class OutlierClassification:
+    """Tukey fences of a sample and the count of samples beyond each."""
+
+    q1: float
+    q3: float
+    low_severe: int
+    low_mild: int
+    high_mild: int
+    high_severe: int
+
+    @property
+    def total(self) -> int:
+        return self.low_severe + self.low_mild + self.high_mild + self.high_severe
+
+
+def classify_outliers(
+    values: Sequence[float], mild: float = 1.5, severe: float = 3.0
+) -> OutlierClassification:
+    """
+    Classify samples by how many interquartile ranges they lie outside the quartiles.
+
+    Samples beyond `mild` IQRs are mild outliers and beyond `severe` IQRs
+    severe ones, on the low or the high side. High outliers on a timer are
+    typically interference such as preemption or a noisy neighbour.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        raise ValueError("Outlier classification needs at least one sample")
+    q1, q3 = np.percentile(values, [25, 75])
+    iqr = q3 - q1
+    fences = np.array(
+        [q1 - severe * iqr, q1 - mild * iqr, q3 + mild * iqr, q3 + severe * iqr]
+    )
+    # Bin 0 to 4 from low severe to high severe, samples on a fence stay inside it
+    bins = np.searchsorted(fences[:2], values, side="right") + np.searchsorted(
+        fences[2:], values, side="left"
+    )
+    low_severe, low_mild, _, high_mild, high_severe = np.bincount(bins, minlength=5)
+    return OutlierClassification(
+        q1=float(q1),
+        q3=float(q3),
+        low_severe=int(low_severe),
+        low_mild=int(low_mild),
+        high_mild=int(high_mild),
+        high_severe=int(high_severe),
+    )
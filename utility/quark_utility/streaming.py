@@ -0,0 +1,190 @@
+import math
+import random
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .stats import median_rank_bounds
+
+__all__ = [
+    "StreamingStats",
+]
+
+
+class StreamingStats:
+    """
+    Constant-memory accumulator of timing samples.
+
+    Keeps the exact count, mean, variance (Welford), min and max, a log-bucketed
+    histogram for quantiles and optionally a uniform reservoir of raw values.
+    A value lands in bucket floor(log_gamma(value)) with gamma chosen so that
+    every quantile is within `relative_accuracy` of a true sample value. Timings
+    spanning 1ns to 1000s fit in a few thousand buckets, however many samples
+    are added. Accumulators of different processes merge exactly, apart from
+    the reservoir which is resampled.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.001,
+        reservoir_size: int = 0,
+        seed: Optional[int] = None,
+    ):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be within (0, 1)")
+        if reservoir_size < 0:
+            raise ValueError("reservoir_size must not be negative")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # Values <= 0 have no logarithm, they are counted apart
+        self.zero_count = 0
+        self.buckets: Dict[int, int] = {}
+        self.reservoir_size = reservoir_size
+        self.reservoir: List[float] = []
+        self._rng = random.Random(seed)
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        if value > 0:
+            key = math.floor(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+        else:
+            self.zero_count += 1
+
+        if self.reservoir_size:
+            # Algorithm R, every value seen is kept with equal probability
+            if len(self.reservoir) < self.reservoir_size:
+                self.reservoir.append(value)
+            else:
+                slot = self._rng.randrange(self.count)
+                if slot < self.reservoir_size:
+                    self.reservoir[slot] = value
+
+    def extend(self, values: Iterable[float]):
+        for value in values:
+            self.add(value)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def _bucket_value(self, key: int) -> float:
+        # Midpoint of [gamma^key, gamma^(key+1)) in relative terms
+        return 2.0 * self.gamma ** (key + 1) / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile `q` in [0, 1], within relative_accuracy of a sample."""
+        if self.count == 0:
+            raise ValueError("Quantile of an empty accumulator")
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be within [0, 1], got {q}")
+        # The extremes are tracked exactly
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return min(max(0.0, self.min), self.max)
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return min(max(self._bucket_value(key), self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        return [self.quantile(q) for q in qs]
+
+    def median_ci(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """Order-statistic confidence interval of the median, see stats.median_ci."""
+        low, high = median_rank_bounds(self.count, confidence)
+        last = max(self.count - 1, 1)
+        return self.quantile(low / last), self.quantile(high / last)
+
+    def merge(self, other: "StreamingStats") -> "StreamingStats":
+        """Fold `other` into this accumulator, e.g. the sketch of another worker."""
+        if not math.isclose(self.relative_accuracy, other.relative_accuracy):
+            raise ValueError("Cannot merge accumulators of different accuracy")
+        if other.count == 0:
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        # Chan et al. pairwise update of the mean and the sum of squares
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zero_count += other.zero_count
+        for key, bucket_count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + bucket_count
+
+        if self.reservoir_size:
+            # Draw from each reservoir in proportion to the values it stands for
+            take = round(self.reservoir_size * other.count / count)
+            take = min(take, len(other.reservoir))
+            keep = min(self.reservoir_size - take, len(self.reservoir))
+            self.reservoir = self._rng.sample(self.reservoir, keep) + self._rng.sample(
+                other.reservoir, take
+            )
+        self.count = count
+        return self
+
+    def to_dict(self, include_reservoir: bool = False) -> Dict[str, Any]:
+        """Plain JSON-compatible state, used to ship a sketch between processes."""
+        keys = sorted(self.buckets)
+        state = {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero_count": self.zero_count,
+            "bucket_keys": keys,
+            "bucket_counts": [self.buckets[key] for key in keys],
+        }
+        if include_reservoir:
+            state["reservoir_size"] = self.reservoir_size
+            state["reservoir"] = list(self.reservoir)
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "StreamingStats":
+        stats = cls(
+            relative_accuracy=state["relative_accuracy"],
+            reservoir_size=state.get("reservoir_size", 0),
+        )
+        stats.count = state["count"]
+        stats.mean = state["mean"]
+        stats.m2 = state["m2"]
+        if stats.count:
+            stats.min = state["min"]
+            stats.max = state["max"]
+        stats.zero_count = state["zero_count"]
+        stats.buckets = dict(zip(state["bucket_keys"], state["bucket_counts"]))
+        stats.reservoir = list(state.get("reservoir", []))
+        return stats
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], **kwargs) -> "StreamingStats":
+        stats = cls(**kwargs)
+        stats.extend(values)
+        return stats
@@ -1,6 +1,13 @@
+import re
 from pathlib import Path
 
-__all__ = ["stringify", "destringify", "stringify_tensor", "change_mlir_suffix"]
+__all__ = [
+    "stringify",
+    "destringify",
+    "stringify_tensor",
+    "change_mlir_suffix",
+    "parse_duration",
+]
 
 
 def stringify():
@@ -43,3 +50,17 @@ def change_mlir_suffix(filename):
     elif path.suffixes and path.suffixes[-2].endswith(".mlir"):
         return str(path.with_name(path.stem.rsplit(".mlir", 1)[0] + ".vmfb"))
     return filename
+
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(duration_str):
+    """Parse a human duration such as "90s", "2h", "1h30m" or "7d" into seconds."""
+    duration_str = duration_str.strip().lower()
+    if re.fullmatch(r"\d+(\.\d+)?", duration_str):
+        return float(duration_str)
+    if not re.fullmatch(r"(\d+(\.\d+)?[smhdw])+", duration_str):
+        raise ValueError(f"Invalid duration: {duration_str}")
+    parts = re.findall(r"(\d+(?:\.\d+)?)([smhdw])", duration_str)
+    return sum(float(value) * _DURATION_UNITS[unit] for value, unit in parts)
@@ -0,0 +1,220 @@
+import ctypes
+import ctypes.util
+import glob
+import os
+import platform
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .affinity import *
+from .trace import *
+
+__all__ = [
+    "NumaNode",
+    "Placement",
+    "read_numa_nodes",
+    "read_core_ids",
+    "place_jobs",
+    "bind_memory_to_node",
+    "place_on_node",
+    "current_placement",
+]
+
+NODE_SYSFS = "/sys/devices/system/node"
+CPUINFO = "/proc/cpuinfo"
+
+# set_mempolicy(2) modes and syscall numbers, used when libnuma is missing
+_MPOL_BIND = 2
+_SET_MEMPOLICY_SYSCALL = {"x86_64": 238, "aarch64": 237}
+
+
+@dataclass
+class NumaNode:
+    id: int
+    cpus: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Placement:
+    """CPU set a task runs on and the NUMA node its memory is bound to."""
+
+    node: int
+    cpus: List[int]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"numa_node": self.node, "cpus": format_cpu_list(self.cpus)}
+
+
+def read_numa_nodes(
+    sysfs: str = NODE_SYSFS, allowed: Optional[Sequence[int]] = None
+) -> List[NumaNode]:
+    """
+    Read the NUMA nodes and their CPUs, restricted to the allowed CPUs.
+
+    Machines or containers without NUMA information are reported as one node 0
+    holding every allowed CPU. Nodes without allowed CPUs are left out.
+
+    Args:
+        sysfs (str): Node directory of sysfs.
+        allowed (Sequence[int]): Usable CPUs, the current affinity mask by default.
+    """
+    allowed = set(allowed if allowed is not None else available_cpus())
+    nodes = []
+    for path in glob.glob(os.path.join(sysfs, "node[0-9]*")):
+        match = re.search(r"node(\d+)$", path)
+        try:
+            with open(os.path.join(path, "cpulist"), "r") as file:
+                cpus = [cpu for cpu in parse_cpu_list(file.read()) if cpu in allowed]
+        except OSError:
+            continue
+        if match and cpus:
+            nodes.append(NumaNode(id=int(match.group(1)), cpus=cpus))
+
+    if not nodes:
+        return [NumaNode(id=0, cpus=sorted(allowed))]
+    return sorted(nodes, key=lambda node: node.id)
+
+
+def read_core_ids(cpuinfo: str = CPUINFO) -> Dict[int, Tuple[int, int]]:
+    """Map each logical CPU to its (physical id, core id) pair from /proc/cpuinfo."""
+    core_ids = {}
+    try:
+        with open(cpuinfo, "r") as file:
+            text = file.read()
+    except OSError:
+        return core_ids
+
+    for block in text.split("\n\n"):
+        fields = {}
+        for line in block.splitlines():
+            key, _, value = line.partition(":")
+            fields[key.strip()] = value.strip()
+        if "processor" not in fields:
+            continue
+        cpu = int(fields["processor"])
+        core_ids[cpu] = (
+            int(fields.get("physical id", 0)),
+            int(fields.get("core id", cpu)),
+        )
+    return core_ids
+
+
+def place_jobs(
+    jobs: int,
+    nodes: Optional[Sequence[NumaNode]] = None,
+    core_ids: Optional[Dict[int, Tuple[int, int]]] = None,
+) -> List[Placement]:
+    """
+    Split the machine into `jobs` equally sized placements that never span nodes.
+
+    Slots hold as many whole physical cores, with all their hyperthread
+    siblings, as still fits `jobs` of them, and are handed out round-robin
+    across nodes. Concurrent tasks therefore never share a physical core.
+
+    Args:
+        jobs (int): Number of concurrent tasks.
+        nodes (Sequence[NumaNode]): Topology to place on, read from sysfs by default.
+        core_ids (dict): CPU to (physical id, core id), read from /proc/cpuinfo by default.
+
+    Returns:
+        List[Placement]: One placement per job.
+    """
+    if jobs < 1:
+        raise ValueError(f"Number of jobs must be positive, got {jobs}")
+    nodes = list(nodes) if nodes is not None else read_numa_nodes()
+    core_ids = core_ids if core_ids is not None else read_core_ids()
+
+    cores_per_node = []
+    for node in nodes:
+        # CPUs missing from cpuinfo count as cores of their own
+        cores: Dict[Tuple[int, int], List[int]] = {}
+        for cpu in node.cpus:
+            cores.setdefault(core_ids.get(cpu, (-1, cpu)), []).append(cpu)
+        cores_per_node.append([cores[key] for key in sorted(cores)])
+
+    slot_size = max(len(cores) for cores in cores_per_node)
+    while slot_size > 0 and sum(len(c) // slot_size for c in cores_per_node) < jobs:
+        slot_size -= 1
+    if slot_size == 0:
+        total = sum(len(cores) for cores in cores_per_node)
+        raise ValueError(
+            f"Cannot run {jobs} jobs on {total} physical cores without sharing one"
+        )
+
+    slots_per_node = []
+    for node, cores in zip(nodes, cores_per_node):
+        slots_per_node.append(
+            [
+                Placement(
+                    node=node.id,
+                    cpus=sorted(
+                        cpu for core in cores[idx : idx + slot_size] for cpu in core
+                    ),
+                )
+                for idx in range(0, len(cores) - slot_size + 1, slot_size)
+            ]
+        )
+
+    placements = []
+    while len(placements) < jobs:
+        for slots in slots_per_node:
+            if slots and len(placements) < jobs:
+                placements.append(slots.pop(0))
+    return placements
+
+
+def _set_mempolicy():
+    """Return a callable set_mempolicy(mode, nodemask, maxnode), or None."""
+    libnuma = ctypes.util.find_library("numa")
+    if libnuma:
+        try:
+            return ctypes.CDLL(libnuma, use_errno=True).set_mempolicy
+        except (OSError, AttributeError):
+            pass
+
+    number = _SET_MEMPOLICY_SYSCALL.get(platform.machine())
+    if number is None:
+        return None
+    libc = ctypes.CDLL(None, use_errno=True)
+    return lambda mode, nodemask, maxnode: libc.syscall(number, mode, nodemask, maxnode)
+
+
+def bind_memory_to_node(node: int) -> bool:
+    """
+    Bind future allocations of the current process to `node`, like `numactl --membind`.
+
+    Returns:
+        bool: Whether the policy was applied, it is skipped where unsupported.
+    """
+    set_mempolicy = _set_mempolicy()
+    if set_mempolicy is None:
+        TRACE("set_mempolicy is unavailable, memory placement is left to the kernel")
+        return False
+
+    bits = ctypes.sizeof(ctypes.c_ulong) * 8
+    mask = (ctypes.c_ulong * (node // bits + 1))()
+    mask[node // bits] = 1 << (node % bits)
+    if set_mempolicy(_MPOL_BIND, mask, len(mask) * bits + 1) != 0:
+        TRACE(f"set_mempolicy on node {node} failed: {os.strerror(ctypes.get_errno())}")
+        return False
+    return True
+
+
+def place_on_node(placement: Placement):
+    """
+    Pin the current process to a placement and bind its memory to the node.
+
+    Buffers allocated afterwards, e.g. by the data provider, are first touched
+    by threads on the node and therefore land in its local memory.
+    """
+    TRACE(f"Place process {os.getpid()} on NUMA node {placement.node}")
+    pin_to_cpus(placement.cpus)
+    bind_memory_to_node(placement.node)
+
+
+def current_placement() -> Dict[str, object]:
+    """NUMA nodes and CPUs the current process can run on, recorded with results."""
+    cpus = set(available_cpus())
+    nodes = [node.id for node in read_numa_nodes() if cpus & set(node.cpus)]
+    return {"numa_nodes": nodes, "cpus": format_cpu_list(cpus)}
@@ -19,6 +19,11 @@ def disable_trace():
     TRACE_ENABLED = False
 
 
+def is_trace_enabled() -> bool:
+    """Return the live trace flag, star-imported copies of TRACE_ENABLED go stale"""
+    return TRACE_ENABLED
+
+
 def enable_debug():
     """Enable trace mode"""
     global DEBUG_ENABLED
@@ -31,6 +36,11 @@ def disable_debug():
     DEBUG_ENABLED = False
 
 
+def is_debug_enabled() -> bool:
+    """Return the live debug flag"""
+    return DEBUG_ENABLED
+
+
 def TRACE(message: str):
     """Output TRACE information to stdout"""
     if TRACE_ENABLED: